@@ -26,7 +26,7 @@ def get_password_hash(password):
 def authenticate_user(db: Session, username: str, password: str):
     user = db.query(models.User).filter(
         models.User.username == username,
-        (models.User.is_deleted == False) | (models.User.is_deleted.is_(None))
+        models.User.is_deleted == False
     ).first()
     if not user:
         return False
@@ -60,7 +60,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         raise credentials_exception
     user = db.query(models.User).filter(
         models.User.username == token_data.username,
-        (models.User.is_deleted == False) | (models.User.is_deleted.is_(None))
+        models.User.is_deleted == False
     ).first()
     if user is None:
         raise credentials_exception
@@ -0,0 +1,262 @@
+"""
+考点批量导出
+通过服务端游标逐批读取查询结果，边读边生成CSV或XLSX内容，内存占用与导出行数无关
+"""
+
+import csv
+import io
+import itertools
+import zipfile
+from typing import Iterable, Iterator, List, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from sqlalchemy.orm import Session
+
+from models import ExamPaper, ExamQuestion
+from schemas import ExamPaperWithQuestions
+
+# 导出列：(表头, 列宽)，表头与导入模板一致，导出的文件可以直接重新导入
+EXAM_POINT_COLUMNS: List[Tuple[str, int]] = [
+    ("省份", 10),
+    ("科目", 8),
+    ("年级", 8),
+    ("学期", 8),
+    ("一级考点", 15),
+    ("二级考点", 15),
+    ("三级考点", 15),
+    ("考点描述", 30),
+    ("历年高考覆盖率", 12),
+    ("添加人", 10),
+    ("添加日期", 12),
+    ("有效状态", 8),
+]
+# 每次写出的行数，达到后把缓冲区中的内容交给响应
+FLUSH_ROWS = 500
+
+def stream_rows(bind, statement, batch_size: int = 1000) -> Iterator[Sequence]:
+    """用独立会话和服务端游标逐批读取查询结果
+
+    StreamingResponse 在请求依赖清理之后才读取数据，不能复用请求的会话。
+    """
+    with Session(bind=bind) as db:
+        result = db.execute(statement.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            yield from partition
+
+def exam_point_row(row) -> list:
+    """考点查询行 -> 导出单元格
+
+    覆盖率带百分号输出，导入时不会把 1% 这样不大于1的值当作比例。
+    """
+    return [
+        row.province_name or "",
+        row.subject,
+        row.grade,
+        row.semester,
+        row.level1_point,
+        row.level2_point or "",
+        row.level3_point or "",
+        row.description,
+        f"{row.coverage_rate}%",
+        row.added_by,
+        row.added_date.strftime("%Y-%m-%d") if row.added_date else "",
+        "是" if row.is_active else "否",
+    ]
+
+# 试卷与试题联表导出的列，试题列加前缀避免与试卷列重名
+PAPER_EXPORT_FIELDS = [
+    "id", "year", "province_id", "subject", "paper_name", "file_path", "file_type",
+    "total_score", "exam_time", "added_by", "is_active", "created_at", "updated_at",
+]
+QUESTION_EXPORT_FIELDS = [
+    "id", "exam_paper_id", "question_number", "question_type", "question_content", "score",
+    "difficulty_level", "exam_points", "answer_content", "answer_explanation",
+    "added_by", "is_active", "created_at", "updated_at",
+]
+QUESTION_PREFIX = "question_"
+NDJSON_CHUNK_SIZE = 64 * 1024
+
+def paper_export_columns() -> list:
+    """试卷联表查询的列，配合 iter_paper_ndjson 使用"""
+    return (
+        [getattr(ExamPaper, name) for name in PAPER_EXPORT_FIELDS]
+        + [getattr(ExamQuestion, name).label(QUESTION_PREFIX + name) for name in QUESTION_EXPORT_FIELDS]
+    )
+
+def iter_paper_ndjson(rows: Iterable) -> Iterator[bytes]:
+    """把按试卷id排序的 试卷×试题 联表行合并为每份试卷一行JSON，格式与试卷详情接口一致
+
+    同一时刻只保留一份试卷的试题，输出按约64KB合并为一块。
+    """
+    buffer, size = [], 0
+    for _, paper_rows in itertools.groupby(rows, key=lambda row: row.id):
+        paper_rows = list(paper_rows)
+        first = paper_rows[0]._mapping
+        paper = {name: first[name] for name in PAPER_EXPORT_FIELDS}
+        paper["province_name"] = first["province_name"]
+        paper["questions"] = [
+            {name: row._mapping[QUESTION_PREFIX + name] for name in QUESTION_EXPORT_FIELDS}
+            for row in paper_rows
+            # 没有试题的试卷外连接得到一行空试题
+            if row._mapping[QUESTION_PREFIX + "id"] is not None
+        ]
+        line = ExamPaperWithQuestions.model_validate(paper).model_dump_json().encode("utf-8") + b"\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= NDJSON_CHUNK_SIZE:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+def iter_csv(headers: List[str], rows: Iterable[list]) -> Iterator[bytes]:
+    """逐批生成CSV内容，带BOM以便Excel识别UTF-8编码"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(headers)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % FLUSH_ROWS == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+class _ChunkSink(io.RawIOBase):
+    """只能追加写入的输出流，zipfile 写入的数据暂存在这里，由生成器取走"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+# 转义XML特殊字符，同时去掉 XML 1.0 不允许的控制字符，一次 translate 完成
+_XML_TEXT = str.maketrans({
+    "&": "&amp;", "<": "&lt;", ">": "&gt;",
+    **{chr(code): None for code in range(32) if chr(code) not in "\t\n\r"},
+})
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+def _xlsx_row(row_number: int, values: list, letters: List[str], style: int = 0) -> str:
+    style_attr = f' s="{style}"' if style else ""
+    cells = []
+    for letter, value in zip(letters, values):
+        ref = f"{letter}{row_number}"
+        if value is None or value == "":
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f'<c r="{ref}"{style_attr}><v>{value}</v></c>')
+        else:
+            text = str(value).translate(_XML_TEXT)
+            cells.append(f'<c r="{ref}" t="inlineStr"{style_attr}><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row r="{row_number}">{"".join(cells)}</row>'
+
+def iter_xlsx(columns: List[Tuple[str, int]], rows: Iterable[list], sheet_name: str = "Sheet1") -> Iterator[bytes]:
+    """逐批生成XLSX文件内容
+
+    单元格使用内联字符串，不需要预先收集共享字符串表；zip 以流式方式写出，
+    工作表XML边生成边压缩，不需要先在内存或临时文件中生成完整文件。
+    """
+    sink = _ChunkSink()
+    letters = [_column_letter(index) for index in range(len(columns))]
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", XLSX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", XLSX_ROOT_RELS)
+        archive.writestr("xl/_rels/workbook.xml.rels", XLSX_WORKBOOK_RELS)
+        archive.writestr("xl/styles.xml", XLSX_STYLES)
+        archive.writestr(
+            "xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(sheet_name)}" sheetId="1" r:id="rId1"/></sheets></workbook>',
+        )
+        yield sink.drain()
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            widths = "".join(
+                f'<col min="{index}" max="{index}" width="{width}" customWidth="1"/>'
+                for index, (_, width) in enumerate(columns, start=1)
+            )
+            header = _xlsx_row(1, [name for name, _ in columns], letters, style=1)
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" '
+                'activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>'
+                f'<cols>{widths}</cols><sheetData>{header}'
+            ).encode("utf-8"))
+            parts = []
+            for row_number, row in enumerate(rows, start=2):
+                parts.append(_xlsx_row(row_number, row, letters))
+                if len(parts) >= FLUSH_ROWS:
+                    sheet.write("".join(parts).encode("utf-8"))
+                    parts = []
+                    yield sink.drain()
+            sheet.write(("".join(parts) + "</sheetData></worksheet>").encode("utf-8"))
+    yield sink.drain()
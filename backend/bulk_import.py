@@ -0,0 +1,440 @@
+"""
+考点批量导入
+按批次用多行INSERT写入考点，每批单独提交，失败的批次回滚并记录错误后继续
+"""
+
+import codecs
+import csv
+import json
+import re
+import zipfile
+from datetime import datetime
+from types import SimpleNamespace
+from typing import AsyncIterator, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+from pydantic import ValidationError
+from sqlalchemy import insert, select, text, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from models import ExamPoint
+from schemas import ExamPointCreate
+import coverage_rollup
+import search_index
+import versioning
+from exam_point_tree import TreeEntry, tree_entry
+from exam_point_hash import add_hashes
+from coverage_analysis import add_complexity
+from region_resolver import RegionResolver, get_resolver
+
+# 错误明细最多保留的条数，避免大文件导入时错误列表本身占用过多内存
+MAX_REPORTED_ERRORS = 100
+# CSV单条记录（含引号内换行）的最大字符数，引号未闭合时不会把后续全部内容缓存在内存中
+MAX_CSV_RECORD_CHARS = 1024 * 1024
+
+# Excel表头 -> 字段名，与前端 EXCEL_COLUMNS 及导出模板的列一致，也可以直接使用字段名作表头
+EXCEL_HEADERS = {
+    "省份": "province",
+    "科目": "subject",
+    "年级": "grade",
+    "学期": "semester",
+    "一级考点": "level1_point",
+    "二级考点": "level2_point",
+    "三级考点": "level3_point",
+    "考点描述": "description",
+    "历年高考覆盖率": "coverage_rate",
+    "添加人": "added_by",
+    "有效状态": "is_active",
+}
+EXCEL_REQUIRED = ["subject", "grade", "semester", "level1_point", "description", "coverage_rate"]
+
+# 与前端 autoFormatDescription 一致：补全LaTeX命令的反斜杠，含公式的行用$包裹
+LATEX_COMMANDS = ["frac", "sqrt", "leq", "geq", "sum", "int", "log", "sin", "cos", "tan",
+                  "cdot", "times", "div", "left", "right"]
+_LATEX_LINE = re.compile(r"\\(?:" + "|".join(LATEX_COMMANDS) + r")|\^|_")
+
+def exam_point_values(data: ExamPointCreate) -> dict:
+    """把导入数据转换为 exam_points 表的列值"""
+    return {
+        "province_id": data.province_id,
+        "subject": data.subject,
+        "grade": data.grade,
+        "semester": data.semester,
+        "level1_point": data.level1_point,
+        "level2_point": data.level2_point,
+        "level3_point": data.level3_point,
+        "description": data.description,
+        # 先消除浮点误差再取整，避免 0.29 * 100 = 28.999... 截断为28
+        "coverage_rate": int(round(data.coverage_rate * 100, 6)),
+        "added_by": data.added_by,
+        "is_active": data.is_active,
+    }
+
+def parse_exam_point(record: dict, defaults: Optional[dict] = None) -> dict:
+    """校验一条导入记录并转换为列值，校验失败抛出ValueError"""
+    try:
+        data = ExamPointCreate.model_validate({**(defaults or {}), **record})
+    except ValidationError as e:
+        error = e.errors()[0]
+        field = ".".join(str(part) for part in error["loc"])
+        raise ValueError(f"{field}: {error['msg']}")
+    return exam_point_values(data)
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """把字节流逐块解码并切分为行，只保留未结束的最后一行在内存中"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """逐条解析NDJSON或CSV（首行为表头），产出 (记录序号, 记录, 解析错误)
+
+    CSV与Excel一样是人工填写或导出的表格，记录应使用 parse_exam_point_row 转换。
+    """
+    row_number = 0
+    if fmt == "ndjson":
+        async for line in iter_lines(chunks):
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield row_number, None, f"JSON格式错误: {e}"
+                continue
+            if isinstance(record, dict):
+                yield row_number, record, None
+            else:
+                yield row_number, None, "每行必须是一个JSON对象"
+        return
+
+    header = None
+    text, quotes = "", 0
+    async for line in iter_lines(chunks):
+        # 引号内的换行属于字段内容，引号未闭合时继续拼接下一行
+        text = f"{text}\n{line}" if text else line
+        quotes += line.count('"')
+        if quotes % 2:
+            if len(text) > MAX_CSV_RECORD_CHARS:
+                # 无法确定记录边界，后续内容无法可靠解析
+                yield row_number + 1, None, f"CSV记录超过 {MAX_CSV_RECORD_CHARS} 个字符，可能有未闭合的引号，后续内容未导入"
+                return
+            continue
+        fields = next(csv.reader([text])) if text else []
+        text, quotes = "", 0
+        if not any(field.strip() for field in fields):
+            continue
+        if header is None:
+            # 表头可以是字段名或导出文件中的中文标题
+            header = [EXCEL_HEADERS.get(field.strip(), field.strip()) for field in fields]
+            continue
+        row_number += 1
+        if len(fields) > len(header):
+            yield row_number, None, f"列数 {len(fields)} 超过表头列数 {len(header)}"
+            continue
+        # 空单元格视为未填写，交给模型默认值和必填校验处理
+        yield row_number, {name: value for name, value in zip(header, fields) if value != ""}, None
+    if text:
+        yield row_number + 1, None, "CSV引号未闭合"
+
+def format_description(description: str) -> str:
+    """格式化考点描述中的数学公式"""
+    for command in LATEX_COMMANDS:
+        description = re.sub(r"([^\\])" + command, r"\1\\" + command, description)
+    lines = re.split(r"\n|<br\s*/?>", description)
+    return "\n".join(
+        f"${line}$" if _LATEX_LINE.search(line) and not line.strip().startswith("$") else line
+        for line in lines
+    )
+
+def iter_excel_records(file: BinaryIO, sheet_name: Optional[str] = None) -> Iterator[Tuple[int, dict]]:
+    """以只读模式逐行读取工作表，产出 (Excel行号, 记录)，首个非空行为表头
+
+    文件无法读取、工作表不存在或缺少必需列时抛出ValueError。
+    """
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, OSError) as e:
+        raise ValueError(f"Excel文件无法读取: {e}")
+    try:
+        if sheet_name and sheet_name not in workbook.sheetnames:
+            raise ValueError(f"工作表不存在: {sheet_name}")
+        worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        header = None
+        for row_number, row in enumerate(worksheet.iter_rows(values_only=True), start=1):
+            if all(cell is None or str(cell).strip() == "" for cell in row):
+                continue
+            if header is None:
+                header = [EXCEL_HEADERS.get(str(cell).strip(), str(cell).strip()) if cell is not None else None for cell in row]
+                missing = [name for name in EXCEL_REQUIRED if name not in header]
+                if "province" not in header and "province_id" not in header:
+                    missing.insert(0, "province")
+                if missing:
+                    raise ValueError(f"缺少必需列: {', '.join(missing)}")
+                continue
+            yield row_number, {
+                name: value for name, value in zip(header, row)
+                if name and value is not None and str(value).strip() != ""
+            }
+    finally:
+        workbook.close()
+
+def parse_exam_point_row(record: dict, resolver: RegionResolver, defaults: Optional[dict] = None) -> dict:
+    """把人工填写的表格行转换为列值：省份名称/简称/代码转为ID，覆盖率带%或大于1时按百分数处理，有效状态支持 是/否"""
+    record = dict(record)
+    province = record.pop("province", None)
+    if "province_id" not in record and province is not None:
+        province_id = resolver.province_id(province)
+        if province_id is None:
+            raise ValueError(f"省份不存在: {province}")
+        record["province_id"] = province_id
+
+    rate = record.get("coverage_rate")
+    percent = False
+    if isinstance(rate, str):
+        text = rate.strip()
+        # 带百分号的值一律按百分数处理，如导出文件中的 1%
+        percent = text.endswith("%")
+        try:
+            rate = float(text.rstrip("%"))
+        except ValueError:
+            percent = False
+    if isinstance(rate, (int, float)) and (percent or rate > 1):
+        rate = rate / 100
+    if rate is not None:
+        record["coverage_rate"] = rate
+
+    active = record.get("is_active")
+    if isinstance(active, str):
+        record["is_active"] = active.strip().lower() in ("是", "true", "1", "有效")
+
+    # 单元格可能是数字或日期，文本字段统一转为字符串
+    for name in ("subject", "grade", "semester", "level1_point", "level2_point", "level3_point", "description", "added_by"):
+        if record.get(name) is not None:
+            record[name] = str(record[name]).strip()
+    if "description" in record:
+        record["description"] = format_description(record["description"])
+    return parse_exam_point(record, defaults)
+
+# 数据库连接 -> 多行INSERT是否分配连续的自增id
+_consecutive_autoinc: Dict[object, bool] = {}
+
+def consecutive_autoinc(db: Session) -> bool:
+    """InnoDB 的 innodb_autoinc_lock_mode 为 0 或 1 时，一条多行INSERT分配的自增id是连续的
+
+    MySQL 8 默认的 2（interleaved）下并发插入的id可能交错，其他数据库一律按不连续处理。
+    该参数只能在启动时设置，每个连接只查询一次。
+    """
+    bind = db.get_bind()
+    if bind not in _consecutive_autoinc:
+        lock_mode = None
+        if bind.dialect.name in ("mysql", "mariadb"):
+            lock_mode = db.execute(text("SELECT @@innodb_autoinc_lock_mode")).scalar()
+        _consecutive_autoinc[bind] = lock_mode is not None and int(lock_mode) in (0, 1)
+    return _consecutive_autoinc[bind]
+
+def insert_rows(db: Session, model, rows: List[dict]) -> List[int]:
+    """多行插入自增主键的数据，按输入顺序返回新记录的id"""
+    if db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+        return list(db.execute(stmt, rows).scalars())
+    if consecutive_autoinc(db):
+        # MySQL不支持RETURNING：整批作为一条多行INSERT执行，LAST_INSERT_ID 是第一行的id
+        result = db.execute(insert(model).values(rows))
+        return list(range(result.lastrowid, result.lastrowid + len(rows)))
+    # 无法确认id连续时逐行插入，每行取各自的 LAST_INSERT_ID
+    return [db.execute(insert(model).values(row)).lastrowid for row in rows]
+
+def insert_exam_points(db: Session, rows: List[dict]) -> List[int]:
+    """多行插入考点，按输入顺序返回新考点的id"""
+    return insert_rows(db, ExamPoint, rows)
+
+class BulkImporter:
+    """按批次写入考点的导入器
+
+    调用 add() 逐条加入待导入的列值，攒满 batch_size 条自动写入一批，最后调用 finish()。
+    mode 为 append 时全部新增；为 upsert 时按自然键哈希匹配已有考点，
+    内容哈希相同的跳过，不同的批量更新，其余新增。
+    on_commit 在每批提交后以 (新增/更新后的 TreeEntry 列表, 被覆盖的旧 TreeEntry 列表, 提交时的考点表版本号) 调用，
+    用于刷新缓存。
+    checkpoint 在每批提交前以导入器本身调用，可在同一事务中记录进度。
+    upsert 先查询再写入，同一自然键不能由多个导入器并行写入，否则会重复新增。
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        batch_size: int = 1000,
+        on_commit: Optional[Callable[[List[TreeEntry], List[TreeEntry], int], None]] = None,
+        mode: str = "append",
+        checkpoint: Optional[Callable[["BulkImporter"], None]] = None,
+    ):
+        self.db = db
+        self.batch_size = batch_size
+        self.on_commit = on_commit
+        self.mode = mode
+        self.checkpoint = checkpoint
+        # 省份只有几十条，使用缓存的省份数据校验外键
+        self.province_ids = get_resolver(db).valid_province_ids
+        self.rows: List[dict] = []
+        self.row_numbers: List[int] = []
+        self.received = 0
+        self.imported = 0
+        self.updated = 0
+        self.skipped = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors: List[Dict] = []
+        # 数据库写入失败的批次说明，不计入导入报告，供调用方判断是否可以记为完成
+        self.batch_failures: List[str] = []
+
+    def add(self, values: dict, row_number: Optional[int] = None):
+        """加入一条待导入的考点列值，row_number 用于错误报告，默认按接收顺序编号"""
+        if values["province_id"] not in self.province_ids:
+            self.reject(row_number, f"省份ID不存在: {values['province_id']}")
+            return
+        self.received += 1
+        row_number = row_number or self.received
+        self.rows.append(values)
+        self.row_numbers.append(row_number)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def reject(self, row_number: Optional[int], message: str):
+        """记录一条解析或校验失败、不会写入的记录"""
+        self.received += 1
+        self.add_error(row_number or self.received, message)
+
+    def add_error(self, row_number: int, message: str, count: int = 1):
+        """记录未能导入的行"""
+        self.failed += count
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "error": message})
+
+    def flush(self):
+        """写入当前批次并提交，失败时回滚本批"""
+        if not self.rows:
+            return
+        rows, row_numbers = self.rows, self.row_numbers
+        self.rows, self.row_numbers = [], []
+        self.batches += 1
+        for values in rows:
+            add_hashes(values)
+        add_complexity(rows)
+        saved = (self.imported, self.updated, self.skipped)
+        try:
+            updated, removed, skipped = [], [], 0
+            new_rows = rows
+            if self.mode == "upsert":
+                new_rows, updated, removed = self._match_existing(rows)
+                skipped = len(rows) - len(new_rows) - len({point.natural_key_hash for point in updated})
+                self._update_existing(updated)
+            ids = insert_exam_points(self.db, new_rows) if new_rows else []
+            inserted = [SimpleNamespace(id=point_id, **values) for point_id, values in zip(ids, new_rows)]
+            search_index.index_exam_points(self.db, inserted, replace=False)
+            entries = [tree_entry(point) for point in inserted + updated]
+            # Core 写入不经过ORM flush，需要手动递增版本号并更新覆盖率汇总
+            version = None
+            if inserted or updated:
+                versioning.bump_versions(self.db.connection(), ["exam_points"])
+                coverage_rollup.apply_changes(self.db.connection(), entries, removed)
+                version = versioning.get_versions(self.db, ["exam_points"])["exam_points"]
+            self.imported += len(inserted) + len(updated)
+            self.updated += len(updated)
+            self.skipped += skipped
+            if self.checkpoint:
+                self.checkpoint(self)
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            self.imported, self.updated, self.skipped = saved
+            message = f"第 {self.batches} 批（第 {row_numbers[0]}-{row_numbers[-1]} 行）写入失败: {e.__class__.__name__}"
+            self.add_error(row_numbers[0], message, count=len(rows))
+            self.batch_failures.append(message)
+            if self.checkpoint:
+                self.checkpoint(self)
+                self.db.commit()
+            return
+        if self.on_commit and (inserted or updated):
+            self.on_commit(entries, removed, version)
+
+    def _match_existing(self, rows: List[dict]):
+        """按自然键哈希匹配已有考点，返回 (需新增的行, 需更新的考点, 更新前的 TreeEntry)"""
+        # 同一批内自然键重复时以最后一条为准
+        latest = {values["natural_key_hash"]: values for values in rows}
+        existing = self.db.execute(
+            select(ExamPoint.id, ExamPoint.natural_key_hash, ExamPoint.content_hash,
+                   *[getattr(ExamPoint, field) for field in TreeEntry._fields])
+            .where(ExamPoint.natural_key_hash.in_(list(latest)))
+        ).all()
+        matched = set()
+        updated, removed = [], []
+        for row in existing:
+            values = latest[row.natural_key_hash]
+            matched.add(row.natural_key_hash)
+            if row.content_hash == values["content_hash"]:
+                continue
+            updated.append(SimpleNamespace(id=row.id, **values))
+            removed.append(TreeEntry(*(getattr(row, field) for field in TreeEntry._fields)))
+        new_rows = [values for key, values in latest.items() if key not in matched]
+        return new_rows, updated, removed
+
+    def _update_existing(self, points: List[SimpleNamespace]):
+        """按主键批量更新内容有变化的考点，保留原录入人"""
+        if not points:
+            return
+        now = datetime.utcnow()
+        self.db.execute(update(ExamPoint), [
+            {
+                **{key: value for key, value in vars(point).items() if key != "added_by"},
+                "updated_at": now,
+            }
+            for point in points
+        ])
+        search_index.index_exam_points(self.db, points)
+
+    def finish(self) -> Dict:
+        """写入剩余数据并返回导入报告"""
+        self.flush()
+        return self.report()
+
+    def restore(self, report: Dict):
+        """从之前保存的导入报告恢复计数，用于中断后继续导入"""
+        self.received = report["received_count"]
+        self.imported = report["imported_count"]
+        self.updated = report["updated_count"]
+        self.skipped = report["skipped_count"]
+        self.failed = report["failed_count"]
+        self.batches = report["batch_count"]
+        self.errors = list(report["errors"])
+
+    def report(self) -> Dict:
+        return {
+            "received_count": self.received,
+            "imported_count": self.imported,
+            "updated_count": self.updated,
+            "skipped_count": self.skipped,
+            "failed_count": self.failed,
+            "batch_count": self.batches,
+            "errors": list(self.errors),
+        }
+
+def import_message(report: Dict) -> str:
+    """根据导入报告生成提示信息"""
+    message = f"成功导入 {report['imported_count']} 条考点数据"
+    if report["updated_count"]:
+        message += f"（其中更新 {report['updated_count']} 条）"
+    if report["skipped_count"]:
+        message += f"，{report['skipped_count']} 条无变化已跳过"
+    if report["failed_count"]:
+        message += f"，{report['failed_count']} 条导入失败"
+    return message
@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+class QueryCache:
+    """按查询条件缓存序列化后的响应，写操作通过递增代数整体失效
+
+    缓存位于进程内存中，多进程部署时每个worker各自维护一份。
+    指定 ttl（秒）时条目超时后视为未命中，用于汇总类结果的短时缓存。
+    """
+
+    def __init__(self, name: str, max_size: int = 256, ttl: Optional[float] = None):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(**params) -> tuple:
+        """把查询参数规范化为缓存键，忽略值为空的参数"""
+        return tuple(sorted((name, value) for name, value in params.items() if value not in (None, "")))
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get((self.generation, key))
+            if entry is not None and entry[0] is not None and entry[0] <= time.monotonic():
+                del self._entries[(self.generation, key)]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((self.generation, key))
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """写入缓存；generation 是计算前读取的代数，期间发生写操作则放弃写入"""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            expires_at = time.monotonic() + self.ttl if self.ttl else None
+            self._entries[(self.generation, key)] = (expires_at, value)
+            self._entries.move_to_end((self.generation, key))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """数据发生变更时调用，递增代数并清空旧条目"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按已录入试卷统计考点的实际考查情况
+统计每个考点被多少份试卷、多少个年份考查过及相关试题的分值占比，写回考点表。
+默认只重新匹配上次统计之后新增或修改过的试卷，每次录入新一年的试卷后执行即可。
+
+用法:
+    python compute_paper_coverage.py [--full] [--batch-size 500]
+"""
+
+import argparse
+import sys
+
+from database import engine
+import paper_coverage
+
+def main():
+    parser = argparse.ArgumentParser(description="按试卷统计考点考查情况")
+    parser.add_argument("--full", action="store_true", help="重新匹配全部试卷，考点名称调整后使用")
+    parser.add_argument("--batch-size", type=int, default=paper_coverage.PAPER_BATCH_SIZE, help="每批匹配的试卷数")
+    args = parser.parse_args()
+
+    print("🎯 考点试卷考查情况统计")
+    print("=" * 50)
+    try:
+        with engine.begin() as connection:
+            report = paper_coverage.refresh(connection, full=args.full, batch_size=args.batch_size)
+    except Exception as e:
+        print(f"💥 统计失败: {e}")
+        sys.exit(1)
+    if not report["paper_count"]:
+        print("⏭️  上次统计之后没有试卷变更")
+        return
+    print(f"📝 重新匹配 {report['paper_count']} 份试卷，涉及 {report['scope_count']} 个省份科目")
+    print(f"🎉 统计完成，更新 {report['point_count']} 个考点")
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,21 @@ class Settings:
     MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
     ALLOWED_EXTENSIONS: set = {'.xlsx', '.xls', '.docx', '.doc', '.pdf', '.md', '.txt'}
     
+    # 缓存配置
+    EXAM_POINT_CACHE_SIZE: int = 256  # 考点查询结果缓存的最大条目数
+    EXAM_POINT_TREE_SCOPES: int = 128  # 考点层级树最多缓存的 省份/科目/年级 范围数
+    DASHBOARD_CACHE_TTL: int = 30  # 系统概览汇总指标的缓存秒数
+    
+    # 导入配置
+    IMPORT_BATCH_SIZE: int = 1000  # 批量导入每批写入并提交的考点数
+    IMPORT_JOB_DIR: str = os.path.join("uploads", "import_jobs")  # 后台导入任务的数据文件目录
+    IMPORT_JOB_POLL_SECONDS: int = 5  # 后台导入线程检查新任务的间隔
+    IMPORT_JOB_STALE_SECONDS: int = 300  # 运行中任务超过该时间没有进度视为中断，可被重新认领
+    IMPORT_JOB_HEARTBEAT_SECONDS: int = 30  # 运行中任务刷新心跳的间隔，需小于 IMPORT_JOB_STALE_SECONDS
+    
+    # 导出配置
+    EXPORT_BATCH_SIZE: int = 1000  # 导出时服务端游标每次读取的行数
+    
     # 文件处理配置
     SUPPORTED_QUESTION_TYPES: set = {
         '选择题', '填空题', '解答题', '计算题', '简答题', 
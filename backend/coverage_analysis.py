@@ -0,0 +1,282 @@
+"""
+考点覆盖率分析
+按列批量计算考点内容复杂度和建议覆盖率，评分规则与原 analyze_coverage.py 一致。
+一批考点的描述拼接为一个字符串，每个正则只扫描一次，再按位置归属到各考点；
+权重计算在 numpy 数组上完成，不逐条调用Python函数。
+复杂度评分在新增、修改和导入考点时计算一次并保存在 exam_points 表中，
+评分规则变化时递增 SCORING_VERSION，由 rescore_exam_points 批量重算旧版本的评分。
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import bindparam, case, event, inspect, or_, select
+from sqlalchemy.orm import Session
+
+from models import ExamPoint
+
+# 预编译的计分规则
+FORMULA_PATTERN = re.compile(r"\\[a-zA-Z]+|\\[{}[\]]|\\[()]")
+SYMBOL_PATTERN = re.compile(r"[∫∑∏√∞≠≤≥±×÷]")
+KEYWORD_PATTERN = re.compile(r"定理|公式|定义|性质|证明|计算|推导|应用")
+SENTENCE_END_PATTERN = re.compile(r"[。！？]")
+# 评分规则版本，修改下面的计分规则或 score_descriptions 的公式后需要递增
+SCORING_VERSION = 1
+# 拼接描述用的分隔符，不会被以上任何规则匹配
+SEPARATOR = "\x00"
+
+# 高考科目重要性权重，未列出的科目为 DEFAULT_SUBJECT_WEIGHT
+SUBJECT_WEIGHTS = {
+    "数学": 1.0,
+    "语文": 0.9,
+    "英语": 0.9,
+    "物理": 0.8,
+    "化学": 0.8,
+    "生物": 0.7,
+    "历史": 0.6,
+    "地理": 0.6,
+    "政治": 0.6,
+}
+DEFAULT_SUBJECT_WEIGHT = 0.5
+
+# 复杂度分档，与 coverage_report.py 一致
+COMPLEXITY_BANDS = (("low", 2.0), ("medium", 5.0), ("high", float("inf")))
+# 分析查询需要的考点列，另外由 analysis_columns 按需带上考点描述
+ANALYSIS_FIELDS = (
+    "id", "subject", "level1_point", "level2_point", "level3_point", "coverage_rate",
+    "complexity_score", "complexity_version",
+)
+
+def _count_per_row(pattern: re.Pattern, text: str, starts: np.ndarray) -> np.ndarray:
+    positions = np.fromiter((match.start() for match in pattern.finditer(text)), dtype=np.int64)
+    rows = np.searchsorted(starts, positions, side="right") - 1
+    return np.bincount(rows, minlength=len(starts))
+
+def score_descriptions(descriptions: Sequence[Optional[str]]) -> Dict[str, np.ndarray]:
+    """批量计算描述的公式数、特殊符号数、关键词数、句子数和复杂度评分(1-10)"""
+    texts = [text or "" for text in descriptions]
+    lengths = np.fromiter((len(text) + 1 for text in texts), dtype=np.int64, count=len(texts))
+    starts = np.cumsum(lengths) - lengths
+    joined = SEPARATOR.join(texts)
+
+    formulas = _count_per_row(FORMULA_PATTERN, joined, starts)
+    symbols = _count_per_row(SYMBOL_PATTERN, joined, starts)
+    keywords = _count_per_row(KEYWORD_PATTERN, joined, starts)
+    # 按句末标点切分得到的段数
+    sentences = _count_per_row(SENTENCE_END_PATTERN, joined, starts) + 1
+
+    complexity = np.minimum(10, 1 + formulas * 0.5 + symbols * 0.3 + keywords * 0.2 + sentences * 0.1)
+    # 没有描述的考点复杂度为1
+    complexity = np.where(lengths > 1, np.round(complexity, 1), 1.0)
+    return {
+        "formula_count": formulas,
+        "symbol_count": symbols,
+        "keyword_count": keywords,
+        "sentence_count": sentences,
+        "complexity": complexity,
+    }
+
+def complexity_values(scores: Dict[str, np.ndarray], index: int) -> dict:
+    """score_descriptions 结果中第 index 条 -> exam_points 表的评分列值"""
+    return {
+        "complexity_score": float(scores["complexity"][index]),
+        "formula_count": int(scores["formula_count"][index]),
+        "keyword_count": int(scores["keyword_count"][index]),
+        "complexity_version": SCORING_VERSION,
+    }
+
+def add_complexity(rows: Sequence[dict]) -> Sequence[dict]:
+    """为一批考点列值补充复杂度评分列，Core批量写入前调用"""
+    if rows:
+        scores = score_descriptions([values.get("description") for values in rows])
+        for index, values in enumerate(rows):
+            values.update(complexity_values(scores, index))
+    return rows
+
+@event.listens_for(ExamPoint, "before_insert")
+@event.listens_for(ExamPoint, "before_update")
+def set_exam_point_complexity(mapper, connection, target):
+    """通过ORM新增或修改考点时，描述有变化或评分版本过期才重新计算"""
+    if target.complexity_version == SCORING_VERSION and \
+            not inspect(target).attrs.description.history.has_changes():
+        return
+    values = complexity_values(score_descriptions([target.description]), 0)
+    for name, value in values.items():
+        setattr(target, name, value)
+
+def outdated_complexity():
+    """没有评分或评分版本过期的考点"""
+    column = ExamPoint.__table__.c.complexity_version
+    return or_(column.is_(None), column != SCORING_VERSION)
+
+def rescore_exam_points(connection, batch_size: int = 1000) -> int:
+    """按id分批重算评分版本不是 SCORING_VERSION 的考点，返回重算的行数"""
+    table = ExamPoint.__table__
+    stmt = (
+        table.update()
+        .where(table.c.id == bindparam("point_id"))
+        .values(
+            complexity_score=bindparam("score"),
+            formula_count=bindparam("formulas"),
+            keyword_count=bindparam("keywords"),
+            complexity_version=SCORING_VERSION,
+        )
+    )
+    total, last_id = 0, 0
+    while True:
+        rows = connection.execute(
+            select(table.c.id, table.c.description)
+            .where(table.c.id > last_id, outdated_complexity())
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        scores = score_descriptions([row.description for row in rows])
+        connection.execute(stmt, [
+            {
+                "point_id": row.id,
+                "score": float(scores["complexity"][index]),
+                "formulas": int(scores["formula_count"][index]),
+                "keywords": int(scores["keyword_count"][index]),
+            }
+            for index, row in enumerate(rows)
+        ])
+        total += len(rows)
+        last_id = rows[-1].id
+    return total
+
+def analysis_columns() -> list:
+    """分析查询的列：已保存当前版本评分的考点不读取描述，只有评分过期的考点才带上描述用于重算"""
+    stale_description = case(
+        (ExamPoint.complexity_version == SCORING_VERSION, None), else_=ExamPoint.description
+    ).label("description")
+    return [getattr(ExamPoint, name) for name in ANALYSIS_FIELDS] + [stale_description]
+
+def _filled(values: Sequence[Optional[str]]) -> np.ndarray:
+    return np.fromiter((bool(value and value.strip()) for value in values), dtype=bool, count=len(values))
+
+def recommended_coverage(
+    complexity: np.ndarray,
+    subjects: Sequence[str],
+    level1: Sequence[Optional[str]],
+    level2: Sequence[Optional[str]],
+    level3: Sequence[Optional[str]],
+) -> np.ndarray:
+    """根据复杂度、科目和考点层级计算建议覆盖率（百分数，5-95）"""
+    subject_weight = np.fromiter(
+        (SUBJECT_WEIGHTS.get(subject, DEFAULT_SUBJECT_WEIGHT) for subject in subjects),
+        dtype=float, count=len(subjects),
+    )
+    level_weight = np.select(
+        [_filled(level1), _filled(level2), _filled(level3)], [1.0, 0.8, 0.6], default=0.4
+    )
+    rate = 30 + (complexity - 1) * 2 + (subject_weight - 0.5) * 30 + (level_weight - 0.5) * 30
+    return np.round(np.clip(rate, 5, 95)).astype(np.int64)
+
+class CoverageAnalysis:
+    """逐批累计分析结果，内存占用只与批大小和 gap_limit 有关"""
+
+    def __init__(self, gap_limit: int = 20):
+        self.gap_limit = gap_limit
+        self.total = 0
+        self.complexity_sum = 0.0
+        self.coverage_sum = 0.0
+        self.recommended_sum = 0.0
+        self.bands = {name: 0 for name, _ in COMPLEXITY_BANDS}
+        # 科目 -> [考点数, 当前覆盖率之和, 建议覆盖率之和, 复杂度之和]
+        self.subjects: Dict[str, List[float]] = {}
+        self.gaps: List[Dict] = []
+
+    def add_batch(self, rows: Sequence) -> Dict[str, np.ndarray]:
+        """分析一批考点行（analysis_columns 的各列），返回本批的复杂度和建议覆盖率"""
+        if not rows:
+            return {}
+        columns = {name: [getattr(row, name) for row in rows] for name in ANALYSIS_FIELDS + ("description",)}
+        # 优先使用保存的评分，评分缺失或版本过期的考点按描述重新计算
+        current = np.fromiter(
+            (version == SCORING_VERSION for version in columns["complexity_version"]), dtype=bool, count=len(rows)
+        )
+        complexity = np.asarray(
+            [score if ok else 0.0 for score, ok in zip(columns["complexity_score"], current)], dtype=float
+        )
+        if not current.all():
+            stale = np.flatnonzero(~current)
+            scores = score_descriptions([columns["description"][index] for index in stale])
+            complexity[stale] = scores["complexity"]
+        recommended = recommended_coverage(
+            complexity, columns["subject"],
+            columns["level1_point"], columns["level2_point"], columns["level3_point"],
+        )
+        coverage = np.asarray(columns["coverage_rate"], dtype=float)
+
+        self.total += len(rows)
+        self.complexity_sum += float(complexity.sum())
+        self.coverage_sum += float(coverage.sum())
+        self.recommended_sum += float(recommended.sum())
+        lower = -np.inf
+        for name, upper in COMPLEXITY_BANDS:
+            self.bands[name] += int(((complexity >= lower) & (complexity < upper)).sum())
+            lower = upper
+
+        subjects, inverse = np.unique(np.asarray(columns["subject"], dtype=object), return_inverse=True)
+        counts = np.bincount(inverse)
+        for index, subject in enumerate(subjects):
+            totals = self.subjects.setdefault(subject, [0, 0.0, 0.0, 0.0])
+            totals[0] += int(counts[index])
+        for position, values in enumerate((coverage, recommended, complexity), start=1):
+            sums = np.bincount(inverse, weights=values)
+            for index, subject in enumerate(subjects):
+                self.subjects[subject][position] += float(sums[index])
+
+        # 只对本批差距最大的若干条构造结果，再与已有结果合并
+        gap = np.abs(recommended - coverage)
+        if self.gap_limit:
+            top = np.argsort(-gap, kind="stable")[:self.gap_limit]
+            for index in top:
+                self.gaps.append({
+                    "id": columns["id"][index],
+                    "subject": columns["subject"][index],
+                    "level1_point": columns["level1_point"][index],
+                    "level2_point": columns["level2_point"][index],
+                    "level3_point": columns["level3_point"][index],
+                    "coverage_rate": float(coverage[index]),
+                    "recommended_rate": int(recommended[index]),
+                    "complexity": float(complexity[index]),
+                })
+            self.gaps.sort(key=lambda item: -abs(item["recommended_rate"] - item["coverage_rate"]))
+            del self.gaps[self.gap_limit:]
+        return {"complexity": complexity, "recommended_rate": recommended}
+
+    def report(self) -> Dict:
+        def average(total: float, count: int) -> float:
+            return round(total / count, 1) if count else 0.0
+
+        return {
+            "total_points": self.total,
+            "avg_coverage_rate": average(self.coverage_sum, self.total),
+            "avg_recommended_rate": average(self.recommended_sum, self.total),
+            "avg_complexity": average(self.complexity_sum, self.total),
+            "complexity_distribution": dict(self.bands),
+            "subjects": [
+                {
+                    "subject": subject,
+                    "count": count,
+                    "avg_coverage_rate": average(coverage, count),
+                    "avg_recommended_rate": average(recommended, count),
+                    "avg_complexity": average(complexity, count),
+                }
+                for subject, (count, coverage, recommended, complexity)
+                in sorted(self.subjects.items(), key=lambda item: -item[1][0])
+            ],
+            "largest_gaps": self.gaps,
+        }
+
+def analyze(db: Session, statement, batch_size: int = 20000, gap_limit: int = 20) -> Dict:
+    """对查询结果逐批分析并汇总，statement 需包含 analysis_columns 的各列"""
+    analysis = CoverageAnalysis(gap_limit)
+    result = db.execute(statement.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        analysis.add_batch(partition)
+    return analysis.report()
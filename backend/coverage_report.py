@@ -5,50 +5,33 @@
 生成科学合理的覆盖率分析报告
 """
 
-import pymysql
 from collections import defaultdict
 import json
 
-# 数据库连接配置
-DB_CONFIG = {
-    'host': 'localhost',
-    'user': 'admin',
-    'password': '111111',
-    'database': 'kaodian',
-    'charset': 'utf8mb4',
-    'port': 3306
-}
+from sqlalchemy import select
 
-def connect_db():
-    """连接数据库"""
-    try:
-        connection = pymysql.connect(**DB_CONFIG)
-        return connection
-    except Exception as e:
-        print(f"数据库连接失败: {e}")
-        return None
+from database import SessionLocal
+from models import ExamPoint, Province
 
 def get_detailed_data():
-    """获取详细数据"""
-    connection = connect_db()
-    if not connection:
-        return []
-    
+    """获取详细数据，复杂度读取考点表中保存的评分（由 migrate.py 保证为当前版本）"""
+    db = SessionLocal()
     try:
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT id, province, subject, grade, semester, 
-                       level1_point, level2_point, level3_point, 
-                       description, coverage_rate, complexity_score
-                FROM exam_points
-                ORDER BY subject, coverage_rate DESC
-            """)
-            return cursor.fetchall()
+        return db.execute(
+            select(
+                ExamPoint.id, Province.name, ExamPoint.subject, ExamPoint.grade, ExamPoint.semester,
+                ExamPoint.level1_point, ExamPoint.level2_point, ExamPoint.level3_point,
+                ExamPoint.description, ExamPoint.coverage_rate, ExamPoint.complexity_score,
+            )
+            .outerjoin(Province, Province.id == ExamPoint.province_id)
+            .where(ExamPoint.complexity_score.is_not(None))
+            .order_by(ExamPoint.subject, ExamPoint.coverage_rate.desc())
+        ).all()
     except Exception as e:
         print(f"获取数据失败: {e}")
         return []
     finally:
-        connection.close()
+        db.close()
 
 def generate_detailed_report():
     """生成详细分析报告"""
@@ -0,0 +1,176 @@
+"""
+考点覆盖率汇总
+exam_point_rollups 表按 省份/科目/年级/一级考点/覆盖率分段 保存考点数和覆盖率合计，
+考点写入时在同一事务中按差值增量更新，汇总接口只需读取少量汇总行，不再对考点表分组。
+
+ORM 写入由 after_flush 监听器自动更新；Core 批量写入由调用方使用 apply_changes。
+"""
+
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, event, func, insert, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import ExamPoint, ExamPointRollup, Province
+
+# 汇总维度，按下钻顺序排列
+ROLLUP_LEVELS = ("province_id", "subject", "grade", "level1_point")
+# 覆盖率分段数，每段10个百分点，100%归入最后一段
+BUCKET_COUNT = 10
+# 影响汇总的考点字段
+ROLLUP_FIELDS = ROLLUP_LEVELS + ("coverage_rate",)
+
+def bucket_of(coverage_rate) -> int:
+    return min(max(int(coverage_rate or 0) // 10, 0), BUCKET_COUNT - 1)
+
+def rollup_deltas(added: Iterable = (), removed: Iterable = ()) -> Dict[Tuple, List[int]]:
+    """汇总变更前后的考点快照，返回 {(省份, 科目, 年级, 一级考点, 分段): [考点数差值, 覆盖率差值]}
+
+    快照为带 ROLLUP_FIELDS 属性的对象，如 exam_point_tree.TreeEntry。
+    """
+    deltas: Dict[Tuple, List[int]] = defaultdict(lambda: [0, 0])
+    for entries, sign in ((added, 1), (removed, -1)):
+        for entry in entries:
+            rate = int(entry.coverage_rate or 0)
+            key = tuple(getattr(entry, field) for field in ROLLUP_LEVELS) + (bucket_of(rate),)
+            delta = deltas[key]
+            delta[0] += sign
+            delta[1] += sign * rate
+    return {key: delta for key, delta in deltas.items() if delta != [0, 0]}
+
+def _key_filter(key: Tuple):
+    return [getattr(ExamPointRollup, field) == value for field, value in zip(ROLLUP_LEVELS + ("bucket",), key)]
+
+def apply_changes(connection, added: Iterable = (), removed: Iterable = ()):
+    """在当前事务中把考点变更累加到汇总表
+
+    按主键顺序逐行更新，并发写入时各事务以相同顺序加锁，避免死锁；
+    汇总行不存在时插入，并发插入冲突时退回到更新。
+    """
+    for key, (count, coverage) in sorted(rollup_deltas(added, removed).items()):
+        stmt = (
+            update(ExamPointRollup)
+            .where(*_key_filter(key))
+            .values(
+                point_count=ExamPointRollup.point_count + count,
+                coverage_sum=ExamPointRollup.coverage_sum + coverage,
+            )
+        )
+        if not connection.execute(stmt).rowcount:
+            try:
+                with connection.begin_nested():
+                    connection.execute(insert(ExamPointRollup).values(
+                        **dict(zip(ROLLUP_LEVELS + ("bucket",), key)),
+                        point_count=count,
+                        coverage_sum=coverage,
+                    ))
+            except IntegrityError:
+                connection.execute(stmt)
+        if count < 0:
+            connection.execute(
+                delete(ExamPointRollup).where(*_key_filter(key), ExamPointRollup.point_count <= 0)
+            )
+
+def _bucket_expression(column):
+    return case(
+        *[(column >= bucket * 10, bucket) for bucket in range(BUCKET_COUNT - 1, 0, -1)],
+        else_=0,
+    )
+
+def rebuild(connection) -> int:
+    """清空并按考点表重新生成汇总表，返回汇总行数，用于初次建表或修复"""
+    bucket = _bucket_expression(ExamPoint.coverage_rate)
+    columns = [getattr(ExamPoint, field) for field in ROLLUP_LEVELS]
+    connection.execute(delete(ExamPointRollup))
+    connection.execute(insert(ExamPointRollup).from_select(
+        list(ROLLUP_LEVELS) + ["bucket", "point_count", "coverage_sum"],
+        select(*columns, bucket, func.count(ExamPoint.id), func.coalesce(func.sum(ExamPoint.coverage_rate), 0))
+        .group_by(*columns, bucket),
+    ))
+    return connection.execute(select(func.count()).select_from(ExamPointRollup)).scalar()
+
+def _previous(state, field):
+    """考点修改前的字段值"""
+    history = state.attrs[field].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(state.object, field)
+
+@event.listens_for(Session, "after_flush")
+def track_exam_point_rollups(session, flush_context):
+    """ORM新增、修改、删除考点flush后同步更新汇总表"""
+    added, removed = [], []
+    for obj in session.new:
+        if isinstance(obj, ExamPoint):
+            added.append(obj)
+    for obj in session.deleted:
+        if isinstance(obj, ExamPoint):
+            removed.append(obj)
+    for obj in session.dirty:
+        if not isinstance(obj, ExamPoint):
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[field].history.has_changes() for field in ROLLUP_FIELDS):
+            continue
+        removed.append(SimpleNamespace(**{field: _previous(state, field) for field in ROLLUP_FIELDS}))
+        added.append(obj)
+    if added or removed:
+        apply_changes(session.connection(), added, removed)
+
+def summarize(
+    db: Session,
+    group_by: Optional[str] = None,
+    filters: Optional[Dict] = None,
+) -> Dict:
+    """读取汇总表，返回筛选范围内的总体统计和按 group_by 分组的统计
+
+    每组包含考点数、平均覆盖率和按10%分段的考点数分布。
+    """
+    conditions = [
+        getattr(ExamPointRollup, field) == value
+        for field, value in (filters or {}).items() if value is not None
+    ]
+    group_columns = [getattr(ExamPointRollup, group_by)] if group_by else []
+    rows = db.execute(
+        select(
+            *group_columns,
+            ExamPointRollup.bucket,
+            func.sum(ExamPointRollup.point_count),
+            func.sum(ExamPointRollup.coverage_sum),
+        )
+        .where(*conditions)
+        .group_by(*group_columns, ExamPointRollup.bucket)
+    ).all()
+
+    groups: Dict = {}
+    total = _empty_group(None)
+    for row in rows:
+        value = row[0] if group_by else None
+        bucket, count, coverage = row[-3:]
+        group = groups.setdefault(value, _empty_group(value))
+        for target in (group, total):
+            target["count"] += int(count)
+            target["coverage_sum"] += int(coverage)
+            target["distribution"][bucket] += int(count)
+
+    items = sorted(groups.values(), key=lambda item: (-item["count"], str(item["value"]))) if group_by else []
+    if group_by == "province_id" and items:
+        names = dict(db.query(Province.id, Province.name).filter(Province.id.in_(list(groups))).all())
+        for item in items:
+            item["province_name"] = names.get(item["value"])
+    return {
+        "group_by": group_by,
+        "total": _finish_group(total),
+        "items": [_finish_group(item) for item in items],
+    }
+
+def _empty_group(value) -> Dict:
+    return {"value": value, "count": 0, "coverage_sum": 0, "distribution": [0] * BUCKET_COUNT}
+
+def _finish_group(group: Dict) -> Dict:
+    coverage_sum = group.pop("coverage_sum")
+    group["avg_coverage_rate"] = round(coverage_sum / group["count"], 2) if group["count"] else 0.0
+    return group
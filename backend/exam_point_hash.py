@@ -0,0 +1,41 @@
+import hashlib
+import json
+
+from sqlalchemy import event
+
+from models import ExamPoint
+
+# 自然键：同一考点在多次导入之间保持不变的字段
+NATURAL_KEY_FIELDS = (
+    "province_id", "subject", "grade", "semester",
+    "level1_point", "level2_point", "level3_point",
+)
+# 内容字段：自然键相同时用来判断考点内容是否变化，录入人不参与比较
+CONTENT_FIELDS = ("description", "coverage_rate", "is_active")
+
+def _normalize(value):
+    # 布尔值和整数值的浮点数统一按整数比较，避免 85 和 85.0 产生不同哈希
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def fields_hash(values: dict, fields) -> str:
+    payload = json.dumps([_normalize(values.get(field)) for field in fields], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def add_hashes(values: dict) -> dict:
+    """为考点列值补充自然键哈希和内容哈希"""
+    values["natural_key_hash"] = fields_hash(values, NATURAL_KEY_FIELDS)
+    values["content_hash"] = fields_hash(values, CONTENT_FIELDS)
+    return values
+
+@event.listens_for(ExamPoint, "before_insert")
+@event.listens_for(ExamPoint, "before_update")
+def set_exam_point_hashes(mapper, connection, target):
+    """通过ORM新增或修改考点时同步更新哈希，Core批量写入由调用方使用 add_hashes"""
+    values = {field: getattr(target, field) for field in NATURAL_KEY_FIELDS + CONTENT_FIELDS}
+    add_hashes(values)
+    target.natural_key_hash = values["natural_key_hash"]
+    target.content_hash = values["content_hash"]
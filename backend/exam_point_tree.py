@@ -0,0 +1,155 @@
+import json
+import threading
+from collections import OrderedDict, namedtuple
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import ExamPoint
+from versioning import get_versions
+
+# 考点在层级树中的位置和覆盖率，用于增量更新
+TreeEntry = namedtuple(
+    "TreeEntry",
+    ["province_id", "subject", "grade", "level1_point", "level2_point", "level3_point", "coverage_rate"],
+)
+
+def tree_entry(exam_point: ExamPoint) -> TreeEntry:
+    """记录考点当前的层级位置，更新和删除前调用以便从树中移除旧值"""
+    return TreeEntry(*(getattr(exam_point, field) for field in TreeEntry._fields))
+
+class TreeScope:
+    """某个 省份/科目/年级 范围内的层级树
+
+    叶子按 一级->二级->三级 嵌套存放 [考点数, 覆盖率合计]，序列化结果在变更前一直复用。
+    version 为树内容对应的 exam_points 表版本号。
+    """
+
+    def __init__(self, key: tuple, version: int):
+        self.key = key
+        self.version = version
+        self.levels: Dict = {}
+        self.body: Optional[bytes] = None
+
+    def matches(self, entry: TreeEntry) -> bool:
+        province_id, subject, grade = self.key
+        return (
+            (province_id is None or entry.province_id == province_id)
+            and (subject is None or entry.subject == subject)
+            and (grade is None or entry.grade == grade)
+        )
+
+    def apply(self, entry: TreeEntry, count: int, coverage: float):
+        level2 = self.levels.setdefault(entry.level1_point, {})
+        level3 = level2.setdefault(entry.level2_point, {})
+        leaf = level3.setdefault(entry.level3_point, [0, 0])
+        leaf[0] += count
+        leaf[1] += coverage
+        # 删除后计数归零的节点从树上摘除
+        if leaf[0] <= 0:
+            del level3[entry.level3_point]
+            if not level3:
+                del level2[entry.level2_point]
+                if not level2:
+                    del self.levels[entry.level1_point]
+        self.body = None
+
+    def serialize(self) -> bytes:
+        if self.body is None:
+            root, _ = self._node(None, self.levels)
+            province_id, subject, grade = self.key
+            root.update({"province_id": province_id, "subject": subject, "grade": grade})
+            self.body = json.dumps(root, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return self.body
+
+    def _node(self, name, value):
+        """生成节点，返回 (节点, 覆盖率合计)，平均覆盖率按合计计算避免逐级舍入误差"""
+        if isinstance(value, list):
+            count, coverage = value
+            children = []
+        else:
+            children, count, coverage = [], 0, 0
+            for child_name, sub in value.items():
+                child, child_coverage = self._node(child_name, sub)
+                children.append(child)
+                count += child["count"]
+                coverage += child_coverage
+            children.sort(key=lambda node: (node["name"] is None, node["name"] or ""))
+        node = {
+            "name": name,
+            "count": count,
+            "coverage_rate": round(coverage / count, 2) if count else 0.0,
+            "children": children,
+        }
+        return node, coverage
+
+class ExamPointTree:
+    """考点层级树的进程内缓存，按范围懒加载，考点变更时增量更新已加载的范围
+
+    每个范围记录构建时的 exam_points 表版本号。本进程的写操作提交后以提交时的版本号调用 apply，
+    只有恰好落后一个版本的范围才应用增量，已包含该变更的范围跳过；
+    其他进程写入或增量缺失时范围版本落后于数据库，下次访问时重新构建。
+    """
+
+    def __init__(self, max_scopes: int = 128):
+        self.max_scopes = max_scopes
+        self._scopes: "OrderedDict[tuple, TreeScope]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_body(self, db: Session, province_id: int = None, subject: str = None, grade: str = None) -> bytes:
+        """返回范围内层级树的JSON，首次访问或版本落后时用一次分组查询构建"""
+        key = (province_id, subject, grade)
+        # 版本号与分组查询在同一事务中读取，构建结果与版本号对应
+        version = get_versions(db, ["exam_points"])["exam_points"]
+        with self._lock:
+            scope = self._scopes.get(key)
+            if scope is not None and scope.version >= version:
+                self._scopes.move_to_end(key)
+                return scope.serialize()
+
+        scope = self._build(db, key, version)
+        with self._lock:
+            # 构建期间其他请求已加载了不旧于本次的结果时以其为准
+            existing = self._scopes.get(key)
+            if existing is not None and existing.version >= version:
+                return existing.serialize()
+            self._scopes[key] = scope
+            self._scopes.move_to_end(key)
+            while len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+            return scope.serialize()
+
+    def _build(self, db: Session, key: tuple, version: int) -> TreeScope:
+        province_id, subject, grade = key
+        columns = [ExamPoint.level1_point, ExamPoint.level2_point, ExamPoint.level3_point]
+        query = db.query(*columns, func.count(ExamPoint.id), func.sum(ExamPoint.coverage_rate))
+        if province_id:
+            query = query.filter(ExamPoint.province_id == province_id)
+        if subject:
+            query = query.filter(ExamPoint.subject == subject)
+        if grade:
+            query = query.filter(ExamPoint.grade == grade)
+
+        scope = TreeScope(key, version)
+        for level1, level2, level3, count, coverage in query.group_by(*columns).all():
+            entry = TreeEntry(province_id, subject, grade, level1, level2, level3, 0)
+            scope.apply(entry, count, float(coverage or 0))
+        return scope
+
+    def apply(self, version: int, added: Iterable[TreeEntry] = (), removed: Iterable[TreeEntry] = ()):
+        """应用一次已提交的考点变更，version 为该事务递增后的 exam_points 表版本号"""
+        added, removed = list(added), list(removed)
+        with self._lock:
+            for scope in self._scopes.values():
+                if scope.version != version - 1:
+                    continue
+                for entries, sign in ((removed, -1), (added, 1)):
+                    for entry in entries:
+                        if scope.matches(entry):
+                            scope.apply(entry, sign, sign * (entry.coverage_rate or 0))
+                scope.version = version
+
+    def clear(self):
+        with self._lock:
+            self._scopes.clear()
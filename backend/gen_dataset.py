@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成用于性能测试的模拟数据集
+按给定随机种子生成用户、考点、试卷和试题，同一种子和规模总是得到相同的数据。
+省份按城市数量加权，科目/年级/难度按高考实际比例分布，试卷题型与分值按各科真实试卷结构生成，
+考点层级取自各科真实知识体系，同一筛选范围内自然键不重复。
+数据可以批量写入数据库，也可以输出为NDJSON文件（考点文件可直接用 import_from_json.py 导入）。
+
+用法:
+    python gen_dataset.py [--points 200000] [--papers 20000] [--users 5000] [--seed 42]
+                          [--output db|ndjson] [--out-dir dataset] [--batch-size 2000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+
+from sqlalchemy import insert
+
+from auth import get_password_hash
+from database import engine, Base, SessionLocal
+from init_data import PROVINCES_AND_CITIES
+from models import ExamPaper, ExamQuestion, Province, User
+from bulk_import import BulkImporter, insert_rows
+from region_resolver import get_resolver, province_key
+import versioning
+
+# 各科知识体系：一级考点 -> 二级考点
+TAXONOMY: Dict[str, Dict[str, List[str]]] = {
+    "数学": {
+        "集合与常用逻辑用语": ["集合的概念", "集合的运算", "充分条件与必要条件", "全称量词与存在量词"],
+        "函数": ["函数的概念与表示", "函数的单调性与最值", "函数的奇偶性", "指数函数", "对数函数", "函数的零点"],
+        "导数及其应用": ["导数的运算", "导数与函数的单调性", "导数与极值最值", "导数的综合应用"],
+        "三角函数": ["三角恒等变换", "三角函数的图像与性质", "解三角形"],
+        "数列": ["等差数列", "等比数列", "数列求和", "数列的递推关系"],
+        "立体几何": ["空间几何体", "空间点线面的位置关系", "空间向量", "空间角与距离"],
+        "平面解析几何": ["直线与圆", "椭圆", "双曲线", "抛物线"],
+        "概率与统计": ["古典概型", "条件概率", "随机变量及其分布", "统计与统计案例"],
+        "平面向量与复数": ["向量的线性运算", "向量的数量积", "复数的运算"],
+    },
+    "语文": {
+        "现代文阅读": ["论述类文本阅读", "文学类文本阅读", "实用类文本阅读"],
+        "古代诗文阅读": ["文言实词", "文言虚词", "文言文翻译", "古代诗歌鉴赏", "名篇名句默写"],
+        "语言文字运用": ["成语运用", "病句辨析", "语言表达连贯", "修辞手法"],
+        "写作": ["议论文写作", "记叙文写作", "任务驱动型作文"],
+    },
+    "英语": {
+        "听力": ["短对话理解", "长对话理解", "独白理解"],
+        "阅读理解": ["细节理解", "推理判断", "主旨大意", "词义猜测"],
+        "语言运用": ["完形填空", "语法填空", "七选五"],
+        "语法": ["时态与语态", "非谓语动词", "定语从句", "名词性从句"],
+        "写作": ["应用文写作", "读后续写"],
+    },
+    "物理": {
+        "力学": ["匀变速直线运动", "牛顿运动定律", "曲线运动", "万有引力与航天", "机械能守恒", "动量守恒"],
+        "电磁学": ["静电场", "恒定电流", "磁场", "电磁感应", "交变电流"],
+        "热学": ["分子动理论", "气体实验定律", "热力学定律"],
+        "光学": ["光的折射与全反射", "光的干涉与衍射"],
+        "近代物理": ["光电效应", "原子结构", "原子核"],
+        "物理实验": ["力学实验", "电学实验"],
+    },
+    "化学": {
+        "化学基本概念": ["物质的量", "离子反应", "氧化还原反应"],
+        "物质结构与性质": ["原子结构", "元素周期律", "化学键与分子结构"],
+        "化学反应原理": ["化学反应速率", "化学平衡", "水溶液中的离子平衡", "电化学"],
+        "元素及其化合物": ["钠及其化合物", "铁及其化合物", "氮及其化合物", "硫及其化合物"],
+        "有机化学基础": ["烃", "烃的衍生物", "有机合成与推断"],
+        "化学实验": ["实验基本操作", "物质的分离与提纯", "实验方案设计"],
+    },
+    "生物": {
+        "分子与细胞": ["细胞的分子组成", "细胞的结构", "细胞代谢", "细胞的生命历程"],
+        "遗传与进化": ["遗传的基本规律", "伴性遗传", "基因的表达", "生物的变异", "生物的进化"],
+        "稳态与调节": ["神经调节", "体液调节", "免疫调节", "植物激素调节"],
+        "生物与环境": ["种群", "群落", "生态系统"],
+        "生物技术与工程": ["发酵工程", "细胞工程", "基因工程"],
+    },
+    "政治": {
+        "经济与社会": ["社会主义市场经济", "收入分配与社会保障", "新发展理念"],
+        "政治与法治": ["党的领导", "人民当家作主", "全面依法治国"],
+        "哲学与文化": ["辩证唯物论", "认识论", "唯物辩证法", "文化传承与创新"],
+        "当代国际政治与经济": ["国际关系", "经济全球化", "国际组织"],
+        "法律与生活": ["民事权利与义务", "家庭与婚姻", "就业与创业"],
+    },
+    "历史": {
+        "中国古代史": ["先秦时期", "秦汉时期", "隋唐时期", "宋元时期", "明清时期"],
+        "中国近现代史": ["鸦片战争", "辛亥革命", "新民主主义革命", "社会主义建设", "改革开放"],
+        "世界古代史": ["古代文明的产生", "中古时期的世界"],
+        "世界近现代史": ["新航路开辟", "工业革命", "两次世界大战", "冷战与世界格局"],
+    },
+    "地理": {
+        "自然地理": ["地球的运动", "大气环流", "水循环", "地貌", "自然环境的整体性"],
+        "人文地理": ["人口", "城镇化", "农业区位", "工业区位", "交通运输"],
+        "区域地理": ["区域发展", "资源跨区域调配", "产业转移"],
+        "地理信息技术": ["遥感", "地理信息系统"],
+    },
+}
+
+# 三级考点：二级考点下的考查角度，None 表示该考点只细分到二级
+ASPECTS = ["概念辨析", "基础应用", "综合应用", "情境分析", "易错点", "拓展提升", None]
+
+# 考点数量的相对权重：理科知识点更细，高三复习阶段考点更多
+SUBJECT_WEIGHTS = {"数学": 3, "物理": 2, "化学": 2, "生物": 2, "英语": 1.5, "语文": 1.5, "政治": 1, "历史": 1, "地理": 1}
+GRADE_WEIGHTS = {"高一": 1, "高二": 1, "高三": 1.5}
+SEMESTERS = ["上学期", "下学期"]
+
+# 各科试卷结构：(题型, 每题分值)，分值之和即试卷总分
+PAPER_STRUCTURES = {
+    "语文": [("选择题", [3] * 10), ("简答题", [6] * 5), ("翻译题", [4, 4]), ("默写题", [6]),
+             ("语言运用题", [4] * 4), ("作文题", [60])],
+    "数学": [("单选题", [5] * 8), ("多选题", [6] * 3), ("填空题", [5] * 3), ("解答题", [13, 15, 15, 17, 17])],
+    "英语": [("听力题", [1.5] * 20), ("阅读理解", [2.5] * 15), ("七选五", [2.5] * 5), ("完形填空", [1] * 15),
+             ("语法填空", [1.5] * 10), ("应用文写作", [15]), ("读后续写", [25])],
+    "物理": [("单选题", [4] * 7), ("多选题", [6] * 3), ("实验题", [6, 9]), ("计算题", [10, 13, 16])],
+    "化学": [("选择题", [3] * 14), ("非选择题", [14, 14, 15, 15])],
+    "生物": [("单选题", [2] * 15), ("多选题", [3] * 5), ("非选择题", [10, 11, 11, 11, 12])],
+    "政治": [("选择题", [3] * 16), ("主观题", [12, 12, 14, 14])],
+    "历史": [("选择题", [3] * 16), ("材料分析题", [12, 13, 15]), ("论述题", [12])],
+    "地理": [("选择题", [3] * 16), ("综合题", [16, 18, 18])],
+}
+EXAM_TIMES = {"语文": 150, "数学": 120, "英语": 120}
+CHOICE_TYPES = {"选择题", "单选题", "多选题", "听力题", "阅读理解", "七选五", "完形填空"}
+DIFFICULTIES = ["简单", "中等", "困难"]
+
+FORMULAS = {
+    "数学": ["$\\frac{a}{b}$", "$\\sqrt{x^2+y^2}$", "$\\sin^2x+\\cos^2x=1$", "$a_n=a_1+(n-1)d$", "$f'(x)>0$"],
+    "物理": ["$F=ma$", "$E_k=\\frac{1}{2}mv^2$", "$U=IR$", "$\\Phi=BS$"],
+    "化学": ["$c=\\frac{n}{V}$", "$K=\\frac{c^2(C)}{c(A)\\cdot c(B)}$"],
+}
+DESCRIPTION_SENTENCES = [
+    "理解{l2}的基本概念和相关术语。",
+    "掌握{l2}{aspect}的常见题型与解题思路。",
+    "能够结合具体情境运用{l1}的相关知识分析和解决问题。",
+    "近年高考常以{aspect}的形式考查，需要关注与其他知识点的综合。",
+    "注意区分{l2}中容易混淆的概念，避免审题失误。",
+    "在复习中应梳理{l1}的知识框架，形成完整的知识体系。",
+]
+
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何林罗高郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘蒋蔡余杜叶程苏魏吕丁任沈姚卢姜崔钟谭陆汪范金石廖贾夏韦付方白邹孟熊秦邱江尹薛闫段雷侯龙史陶黎贺顾毛郝龚邵万钱严覃武戴莫孔向汤"
+GIVEN_CHARS = "伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华玉萍红鹏辉晨宇浩然子涵欣怡梓轩思雨一诺俊杰"
+
+START_DATE = datetime(2022, 1, 1)
+END_DATE = datetime(2025, 7, 1)
+FIRST_YEAR, LAST_YEAR = 2010, 2025
+
+def allocate(total: int, weights: List[float], capacities: List[int]) -> List[int]:
+    """按权重把总数分配到各项，每项不超过其容量；总数超过容量之和时分配到容量上限"""
+    counts = [0] * len(weights)
+    remaining = min(total, sum(capacities))
+    while remaining > 0:
+        open_items = [i for i, capacity in enumerate(capacities) if counts[i] < capacity]
+        weight_sum = sum(weights[i] for i in open_items)
+        shares = [(remaining * weights[i] / weight_sum, i) for i in open_items]
+        given = 0
+        for share, i in shares:
+            add = min(int(share), capacities[i] - counts[i])
+            counts[i] += add
+            given += add
+        if given == 0:
+            # 剩余数量少于未满的项数，按份额从大到小逐项补一条
+            for share, i in sorted(shares, reverse=True)[:remaining]:
+                counts[i] += 1
+                given += 1
+        remaining -= given
+    return counts
+
+class DatasetGenerator:
+    """可复现的模拟数据生成器
+
+    每类数据使用由种子派生的独立随机数序列，调整试卷数量不会改变生成的考点，反之亦然。
+    生成的记录使用省份/城市名称和用户名互相引用，写入数据库时再解析为ID。
+    """
+
+    def __init__(self, seed: int = 42, points: int = 200000, papers: int = 20000,
+                 users: int = 5000, user_prefix: str = "gen"):
+        self.seed = seed
+        self.points = points
+        self.papers = papers
+        self.users = users
+        self.user_prefix = user_prefix
+        self.provinces = list(PROVINCES_AND_CITIES)
+        self.cities = PROVINCES_AND_CITIES
+        # 省份按城市数量加权，平滑后直辖市也有一定比例
+        self.province_weights = [len(PROVINCES_AND_CITIES[name]) + 5 for name in self.provinces]
+        self.combos = {
+            subject: [(l1, l2, aspect) for l1, l2s in levels.items() for l2 in l2s for aspect in ASPECTS]
+            for subject, levels in TAXONOMY.items()
+        }
+        self.level2_names = {
+            subject: [l2 for l2s in levels.values() for l2 in l2s] for subject, levels in TAXONOMY.items()
+        }
+        # 录入数据的老师/管理员占用户的2%，录入量按排名递减
+        contributor_count = max(1, users // 50) if users else 0
+        self.contributors = [self.username(i) for i in range(contributor_count)] or ["admin"]
+        self.contributor_weights = [1 / (rank + 1) for rank in range(len(self.contributors))]
+
+    def _random(self, name: str) -> random.Random:
+        return random.Random(f"{self.seed}:{name}")
+
+    def _date(self, rng: random.Random, start: datetime = START_DATE, end: datetime = END_DATE) -> datetime:
+        return start + timedelta(seconds=rng.randrange(int((end - start).total_seconds())))
+
+    def _contributor(self, rng: random.Random) -> str:
+        return rng.choices(self.contributors, self.contributor_weights)[0]
+
+    def username(self, index: int) -> str:
+        return f"{self.user_prefix}{index + 1:06d}"
+
+    def capacity(self) -> int:
+        """考点数量上限：每个筛选范围内自然键不重复"""
+        scopes = len(self.provinces) * len(GRADE_WEIGHTS) * len(SEMESTERS)
+        return scopes * sum(len(combos) for combos in self.combos.values())
+
+    def iter_users(self) -> Iterator[Dict]:
+        rng = self._random("users")
+        for index in range(self.users):
+            province = rng.choices(self.provinces, self.province_weights)[0]
+            username = self.username(index)
+            yield {
+                "username": username,
+                "email": f"{username}@example.com",
+                "real_name": rng.choice(SURNAMES) + "".join(rng.choices(GIVEN_CHARS, k=rng.choice([1, 2]))),
+                "phone": f"1{rng.choice('3456789')}{rng.randrange(10 ** 9):09d}",
+                "age": rng.choice([15, 16, 16, 17, 17, 18, 18, 19]),
+                "grade": rng.choices(list(GRADE_WEIGHTS), [1, 1, 1.2])[0],
+                "province": province,
+                "city": rng.choice(self.cities[province]),
+                "is_active": rng.random() < 0.98,
+                "is_approved": rng.random() < 0.85,
+                "created_at": self._date(rng),
+            }
+
+    def iter_exam_points(self) -> Iterator[Dict]:
+        rng = self._random("exam_points")
+        scopes, weights, capacities = [], [], []
+        for province, province_weight in zip(self.provinces, self.province_weights):
+            for subject, subject_weight in SUBJECT_WEIGHTS.items():
+                for grade, grade_weight in GRADE_WEIGHTS.items():
+                    for semester in SEMESTERS:
+                        scopes.append((province, subject, grade, semester))
+                        weights.append(province_weight * subject_weight * grade_weight)
+                        capacities.append(len(self.combos[subject]))
+        for (province, subject, grade, semester), count in zip(scopes, allocate(self.points, weights, capacities)):
+            for l1, l2, aspect in rng.sample(self.combos[subject], count):
+                yield {
+                    "province": province,
+                    "subject": subject,
+                    "grade": grade,
+                    "semester": semester,
+                    "level1_point": l1,
+                    "level2_point": l2,
+                    "level3_point": f"{l2}·{aspect}" if aspect else None,
+                    "description": self._description(rng, subject, l1, l2, aspect or "基础应用"),
+                    # 覆盖率右偏分布，多数考点在20%-50%之间
+                    "coverage_rate": round(rng.betavariate(2, 4) * 100),
+                    "added_by": self._contributor(rng),
+                    "added_date": self._date(rng),
+                    "is_active": rng.random() < 0.95,
+                }
+
+    def _description(self, rng: random.Random, subject: str, l1: str, l2: str, aspect: str) -> str:
+        sentences = rng.sample(DESCRIPTION_SENTENCES, rng.choices([1, 2, 3, 4, 6], [2, 4, 3, 2, 1])[0])
+        text = "".join(sentence.format(l1=l1, l2=l2, aspect=aspect) for sentence in sentences)
+        if subject in FORMULAS and rng.random() < 0.4:
+            text += "\n常用公式：" + "，".join(rng.sample(FORMULAS[subject], rng.randint(1, 2)))
+        return text
+
+    def iter_exam_papers(self) -> Iterator[Dict]:
+        """逐份生成试卷，试题放在 questions 字段中"""
+        rng = self._random("exam_papers")
+        years = list(range(FIRST_YEAR, LAST_YEAR + 1))
+        # 近年的试卷收录得更全
+        year_weights = [year - FIRST_YEAR + 1 for year in years]
+        subjects = list(PAPER_STRUCTURES)
+        for _ in range(self.papers):
+            year = rng.choices(years, year_weights)[0]
+            province = rng.choices(self.provinces, self.province_weights)[0]
+            subject = rng.choice(subjects)
+            added_by = self._contributor(rng)
+            questions = list(self._questions(rng, subject, added_by))
+            yield {
+                "year": year,
+                "province": province,
+                "subject": subject,
+                "paper_name": f"{year}年普通高等学校招生全国统一考试（{province_key(province)}卷）{subject}",
+                "file_type": rng.choices(["pdf", "word", "excel", "md"], [6, 3, 0.5, 0.5])[0],
+                "total_score": int(sum(question["score"] for question in questions)),
+                "exam_time": EXAM_TIMES.get(subject, 75),
+                "added_by": added_by,
+                "is_active": rng.random() < 0.97,
+                "created_at": self._date(rng, datetime(year, 6, 10), datetime(year + 1, 6, 1)),
+                "questions": questions,
+            }
+
+    def _questions(self, rng: random.Random, subject: str, added_by: str) -> Iterator[Dict]:
+        structure = [(question_type, score) for question_type, scores in PAPER_STRUCTURES[subject] for score in scores]
+        for position, (question_type, score) in enumerate(structure):
+            # 越靠后的题目越难
+            progress = position / len(structure)
+            difficulty = rng.choices(DIFFICULTIES, [(1 - progress) * 4 + 0.5, 4, progress * 4 + 0.5])[0]
+            points = rng.sample(self.level2_names[subject], rng.choices([1, 2, 3], [5, 3, 1])[0])
+            if question_type in CHOICE_TYPES:
+                content = f"下列关于{points[0]}的说法中，正确的是（  ）\nA. 选项一\nB. 选项二\nC. 选项三\nD. 选项四"
+                answer = "".join(sorted(rng.sample("ABCD", 2 if question_type == "多选题" else 1)))
+            else:
+                content = f"阅读材料，结合{'、'.join(points)}的相关知识，回答下列问题。（{score}分）"
+                answer = "略"
+            yield {
+                "question_number": str(position + 1),
+                "question_type": question_type,
+                "question_content": content,
+                "score": score,
+                "difficulty_level": difficulty,
+                "exam_points": "，".join(points),
+                "answer_content": answer,
+                "answer_explanation": f"本题考查{points[0]}，难度{difficulty}。",
+                "added_by": added_by,
+                "is_active": True,
+            }
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"无法序列化 {type(value).__name__}")
+
+def write_ndjson(generator: DatasetGenerator, out_dir: str) -> Dict[str, int]:
+    """把数据集写为NDJSON文件，返回各文件的记录数"""
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {}
+    sources = {
+        "users.ndjson": generator.iter_users(),
+        "exam_points.ndjson": generator.iter_exam_points(),
+        "exam_papers.ndjson": generator.iter_exam_papers(),
+    }
+    for filename, records in sources.items():
+        count = 0
+        with open(os.path.join(out_dir, filename), "w", encoding="utf-8") as f:
+            for record in records:
+                if filename == "exam_points.ndjson":
+                    # 与接口一致，覆盖率用小数表示
+                    record["coverage_rate"] = record["coverage_rate"] / 100
+                f.write(json.dumps(record, ensure_ascii=False, default=_json_default) + "\n")
+                count += 1
+        counts[filename] = count
+        print(f"📝 {filename}: {count} 条")
+    return counts
+
+def _progress(table: str, count: int, started: float):
+    rate = count / max(time.time() - started, 1e-6)
+    print(f"📝 {table}: 已写入 {count} 条，{rate:.0f} 条/秒")
+
+def write_database(db, generator: DatasetGenerator, batch_size: int = 2000,
+                   password: str = "loadtest123") -> Dict[str, int]:
+    """把数据集批量写入数据库，每批单独提交，返回各表写入的记录数"""
+    if generator.users and db.query(User.id).filter(User.username.like(f"{generator.user_prefix}%")).first():
+        raise ValueError(f"已存在用户名以 {generator.user_prefix} 开头的用户，请使用 --user-prefix 指定其他前缀")
+    if not db.query(Province.id).first():
+        raise ValueError("数据库中没有省份数据，请先运行 init_data.py")
+    resolver = get_resolver(db, include_cities=True)
+    counts = {"users": 0, "exam_points": 0, "exam_papers": 0, "exam_questions": 0}
+
+    # 所有用户使用同一个密码，只计算一次哈希
+    hashed_password = get_password_hash(password)
+    started, users = time.time(), []
+
+    def flush_users():
+        db.execute(insert(User), users)
+        # Core 写入不经过ORM flush，需要手动递增版本号
+        versioning.bump_versions(db.connection(), ["users"])
+        db.commit()
+        counts["users"] += len(users)
+        users.clear()
+
+    for record in generator.iter_users():
+        province_id = resolver.province_id(record.pop("province"))
+        record["province_id"] = province_id
+        record["city_id"] = resolver.city_id(record.pop("city"), province_id)
+        record["hashed_password"] = hashed_password
+        users.append(record)
+        if len(users) >= batch_size:
+            flush_users()
+    if users:
+        flush_users()
+    if counts["users"]:
+        _progress("users", counts["users"], started)
+
+    started = time.time()
+
+    def point_progress(added, removed, version):
+        if importer.batches % 25 == 0:
+            _progress("exam_points", importer.imported, started)
+
+    importer = BulkImporter(db, batch_size=batch_size, on_commit=point_progress)
+    for record in generator.iter_exam_points():
+        record["province_id"] = resolver.province_id(record.pop("province"))
+        importer.add(record)
+    report = importer.finish()
+    counts["exam_points"] = report["imported_count"]
+    if report["failed_count"]:
+        print(f"⚠️  {report['failed_count']} 条考点写入失败: {report['errors'][:3]}")
+    _progress("exam_points", counts["exam_points"], started)
+
+    started, papers, questions = time.time(), [], []
+
+    def flush_papers():
+        ids = insert_rows(db, ExamPaper, papers)
+        rows = [{**question, "exam_paper_id": paper_id}
+                for paper_id, paper_questions in zip(ids, questions) for question in paper_questions]
+        db.execute(insert(ExamQuestion), rows)
+        versioning.bump_versions(db.connection(), ["exam_papers", "exam_questions"])
+        db.commit()
+        counts["exam_papers"] += len(papers)
+        counts["exam_questions"] += len(rows)
+        papers.clear()
+        questions.clear()
+
+    pending_questions = 0
+    for record in generator.iter_exam_papers():
+        record["province_id"] = resolver.province_id(record.pop("province"))
+        questions.append(record.pop("questions"))
+        papers.append(record)
+        pending_questions += len(questions[-1])
+        # 按试题数分批，每批试卷和试题在同一事务中提交
+        if pending_questions >= batch_size:
+            flush_papers()
+            pending_questions = 0
+    if papers:
+        flush_papers()
+    if counts["exam_papers"]:
+        _progress("exam_questions", counts["exam_questions"], started)
+    return counts
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="生成用于性能测试的模拟数据集")
+    parser.add_argument("--points", type=int, default=200000, help="考点数量")
+    parser.add_argument("--papers", type=int, default=20000, help="试卷数量，试题数量由各科试卷结构决定")
+    parser.add_argument("--users", type=int, default=5000, help="用户数量")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子，相同种子生成相同数据")
+    parser.add_argument("--output", choices=["db", "ndjson"], default="db", help="写入数据库或输出NDJSON文件")
+    parser.add_argument("--out-dir", default="dataset", help="NDJSON文件的输出目录")
+    parser.add_argument("--batch-size", type=int, default=2000, help="每批写入并提交的记录数")
+    parser.add_argument("--user-prefix", default="gen", help="生成的用户名前缀")
+    parser.add_argument("--password", default="loadtest123", help="生成用户的登录密码")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    generator = DatasetGenerator(args.seed, args.points, args.papers, args.users, args.user_prefix)
+    if args.points > generator.capacity():
+        print(f"⚠️  考点数量超过不重复的上限，将生成 {generator.capacity()} 条")
+    print(f"🚀 开始生成数据集（种子 {args.seed}）...")
+    started = time.time()
+    try:
+        if args.output == "ndjson":
+            write_ndjson(generator, args.out_dir)
+        else:
+            # 创建数据库表
+            Base.metadata.create_all(bind=engine)
+            db = SessionLocal()
+            try:
+                counts = write_database(db, generator, args.batch_size, args.password)
+            finally:
+                db.close()
+            print("✅ " + "，".join(f"{table} {count} 条" for table, count in counts.items()))
+    except Exception as e:
+        print(f"💥 数据集生成失败: {e}")
+        sys.exit(1)
+    print(f"🎉 数据集生成完成，用时 {time.time() - started:.1f} 秒")
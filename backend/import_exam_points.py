@@ -7,6 +7,8 @@ from datetime import datetime
 from sqlalchemy.orm import sessionmaker
 from database import engine, Base
 from models import ExamPoint
+from region_resolver import get_resolver
+from bulk_import import BulkImporter, import_message, parse_exam_point_row
 
 # 创建数据库表
 Base.metadata.create_all(bind=engine)
@@ -89,22 +91,20 @@ exam_points_data = [
 ]
 
 def import_exam_points():
-    """导入考点数据到数据库"""
+    """导入考点数据到数据库，已有考点按自然键比对，仅更新有变化的考点"""
     db = SessionLocal()
     try:
-        # 清空现有数据
-        db.query(ExamPoint).delete()
-        db.commit()
-        print("✅ 已清空现有考点数据")
-        
-        # 导入新数据
+        resolver = get_resolver(db)
+        importer = BulkImporter(db, mode="upsert")
         for i, data in enumerate(exam_points_data, 1):
-            exam_point = ExamPoint(**data)
-            db.add(exam_point)
-            print(f"📝 正在导入第 {i} 条考点数据: {data['province']} - {data['subject']} - {data['level1_point']}")
-        
-        db.commit()
-        print(f"✅ 成功导入 {len(exam_points_data)} 条考点数据到数据库")
+            try:
+                importer.add(parse_exam_point_row(data, resolver), i)
+            except ValueError as e:
+                importer.reject(i, str(e))
+        report = importer.finish()
+        print(f"✅ {import_message(report)}")
+        for error in report["errors"]:
+            print(f"⚠️  第 {error['row']} 条: {error['error']}")
         
         # 验证导入结果
         count = db.query(ExamPoint).count()
@@ -117,7 +117,7 @@ def import_exam_points():
     finally:
         db.close()
     
-    return True
+    return report["failed_count"] == 0
 
 if __name__ == "__main__":
     print("🚀 开始导入考点数据...")
@@ -1,59 +1,276 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+"""
+从JSON/NDJSON文件批量导入考点数据
+逐条流式读取文件，在进程池中校验，多个线程各用一个数据库连接并行写入，
+每写完一批记录一次断点，中断后重新执行同一命令会跳过已完成的批次。
 
+upsert 模式先查询已有考点再写入，每批按自然键哈希拆分给各写入线程，同一考点总由同一线程
+依次写入，不会被并行重复新增；一批的各部分都提交后才记入断点，重新执行时已提交的部分按内容哈希跳过。
+append 模式每批在一个事务中整体写入，各批轮流分给写入线程。
+
+用法:
+    python import_from_json.py [文件] [--batch-size 1000] [--workers 4] [--writers 4]
+                               [--mode upsert|append] [--restart]
+"""
+
+import argparse
 import json
+import os
 import sys
-from datetime import datetime
-from sqlalchemy.orm import sessionmaker
-from database import engine, Base
-from models import ExamPoint
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from database import engine, Base, SessionLocal
+from region_resolver import RegionResolver, get_resolver
+from bulk_import import BulkImporter, MAX_REPORTED_ERRORS, parse_exam_point_row
+from exam_point_hash import add_hashes
+
+READ_SIZE = 1024 * 1024
+# 单条记录的最大字符数，对象未闭合时不会把文件剩余内容全部读入内存
+MAX_JSON_RECORD_CHARS = 1024 * 1024
+
+def iter_json_records(path: str) -> Iterator[dict]:
+    """逐条读取JSON数组或NDJSON文件中的对象，不把整个文件读入内存"""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8-sig") as f:
+        buffer, position, eof, count = "", 0, False, 0
+        while True:
+            # 跳过空白、逗号以及数组的方括号
+            while position < len(buffer) and buffer[position] in " \t\r\n,[]":
+                position += 1
+            if position < len(buffer):
+                try:
+                    record, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    # 对象被读取块截断，读入更多内容后重试
+                    if eof:
+                        raise
+                    if len(buffer) - position > MAX_JSON_RECORD_CHARS:
+                        raise ValueError(f"第 {count + 1} 条记录超过 {MAX_JSON_RECORD_CHARS} 个字符，可能是JSON对象未闭合")
+                else:
+                    position = end
+                    count += 1
+                    yield record
+                    continue
+            elif eof:
+                return
+            chunk = f.read(READ_SIZE)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+
+def iter_chunks(path: str, chunk_size: int) -> Iterator[Tuple[int, List[Tuple[int, dict]]]]:
+    """按批次切分记录，产出 (批次序号, [(记录序号, 记录)])"""
+    chunk, index = [], 0
+    for row_number, record in enumerate(iter_json_records(path), start=1):
+        chunk.append((row_number, record))
+        if len(chunk) >= chunk_size:
+            yield index, chunk
+            chunk, index = [], index + 1
+    if chunk:
+        yield index, chunk
+
+class Checkpoint:
+    """导入断点，记录已完成的批次和累计结果，写入时先写临时文件再替换"""
 
-# 创建数据库表
-Base.metadata.create_all(bind=engine)
+    def __init__(self, path: str, source: str, chunk_size: int, restart: bool = False):
+        self.path = path
+        self.lock = threading.Lock()
+        self.state = {
+            "source": os.path.abspath(source),
+            "source_size": os.path.getsize(source),
+            "chunk_size": chunk_size,
+            "done": [],
+            "imported": 0, "updated": 0, "skipped": 0, "failed": 0,
+            "errors": [],
+        }
+        if not restart and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved["source"] != self.state["source"] or saved["source_size"] != self.state["source_size"]:
+                raise ValueError(f"断点文件 {path} 对应的数据文件已变化，请使用 --restart 重新导入")
+            # 继续导入时沿用断点中的批次大小，保证批次划分一致
+            self.state = saved
+        self.done = set(self.state["done"])
 
-# 创建会话
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    @property
+    def chunk_size(self) -> int:
+        return self.state["chunk_size"]
 
-def import_from_json():
+    def mark_done(self, index: int, report: Dict):
+        with self.lock:
+            self.done.add(index)
+            self.state["done"] = sorted(self.done)
+            for key in ("imported", "updated", "skipped", "failed"):
+                self.state[key] += report[f"{key}_count"]
+            room = MAX_REPORTED_ERRORS - len(self.state["errors"])
+            self.state["errors"].extend(report["errors"][:max(room, 0)])
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+
+# 进程池中的省份解析器，由 init_worker 设置
+_resolver: RegionResolver = None
+
+def init_worker(resolver: RegionResolver):
+    global _resolver
+    _resolver = resolver
+    # 子进程不访问数据库，丢弃从父进程继承的连接且不关闭，避免影响父进程
+    engine.dispose(close=False)
+
+def validate_chunk(chunk: List[Tuple[int, dict]], partitions: int = 1):
+    """在子进程中校验一批记录，按自然键哈希分为 partitions 份，返回 (各份列值列表, 错误列表)"""
+    parts = [[] for _ in range(partitions)]
+    errors = []
+    for row_number, record in chunk:
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("记录必须是JSON对象")
+            values = add_hashes(parse_exam_point_row(record, _resolver))
+        except ValueError as e:
+            errors.append((row_number, str(e)))
+            continue
+        parts[int(values["natural_key_hash"][:8], 16) % partitions].append((row_number, values))
+    return parts, errors
+
+def write_part(validated: Future, part: int, mode: str) -> Optional[Dict]:
+    """写入一批校验结果中的一份，在一个事务中提交，数据库写入失败时抛出异常，该批不记入断点
+
+    校验错误只随第0份报告。没有需要处理的记录时返回None。
+    """
+    parts, errors = validated.result()
+    rows = parts[part]
+    errors = errors if part == 0 else []
+    if not rows and not errors:
+        return None
+    db = SessionLocal()
+    try:
+        importer = BulkImporter(db, batch_size=max(len(rows), 1), mode=mode)
+        for row_number, message in errors:
+            importer.reject(row_number, message)
+        for row_number, values in rows:
+            importer.add(values, row_number)
+        report = importer.finish()
+    finally:
+        db.close()
+    if importer.batch_failures:
+        raise RuntimeError(importer.batch_failures[0])
+    return report
+
+def merge_reports(reports: List[Optional[Dict]]) -> Dict:
+    """合并一批各部分的导入报告"""
+    reports = [report for report in reports if report]
+    merged = {
+        key: sum(report[key] for report in reports)
+        for key in ("received_count", "imported_count", "updated_count", "skipped_count", "failed_count", "batch_count")
+    }
+    merged["errors"] = sorted((error for report in reports for error in report["errors"]), key=lambda error: error["row"])
+    return merged
+
+def import_from_json(path: str, batch_size: int, workers: int, writers: int, mode: str, restart: bool) -> bool:
     """从JSON文件导入考点数据"""
+    checkpoint = Checkpoint(f"{path}.checkpoint.json", path, batch_size, restart)
+    if checkpoint.done:
+        print(f"⏩ 从断点继续，跳过已完成的 {len(checkpoint.done)} 批")
+
+    db = SessionLocal()
     try:
-        # 读取JSON文件
-        with open('exam_points_sample.json', 'r', encoding='utf-8') as f:
-            exam_points_data = json.load(f)
-        
-        print(f"📄 从JSON文件读取到 {len(exam_points_data)} 条考点数据")
-        
-        db = SessionLocal()
-        
-        # 清空现有数据
-        db.query(ExamPoint).delete()
-        db.commit()
-        print("✅ 已清空现有考点数据")
-        
-        # 导入新数据
-        for i, data in enumerate(exam_points_data, 1):
-            exam_point = ExamPoint(**data)
-            db.add(exam_point)
-            if i % 20 == 0 or i == len(exam_points_data):
-                print(f"📝 正在导入第 {i} 条考点数据: {data['province']} - {data['subject']} - {data['level1_point']}")
-        
-        db.commit()
-        print(f"✅ 成功导入 {len(exam_points_data)} 条考点数据到数据库")
-        
-        # 验证导入结果
-        count = db.query(ExamPoint).count()
-        print(f"📊 数据库中现有 {count} 条考点记录")
-        
+        resolver = get_resolver(db)
+    finally:
         db.close()
-        return True
-        
-    except Exception as e:
-        print(f"❌ 导入失败: {e}")
+
+    # upsert 按自然键拆分给所有写入线程；append 每批整体写入，保证失败重试时不会重复新增
+    partitions = writers if mode == "upsert" else 1
+    started = time.time()
+    processed = 0
+    failed_chunks = 0
+    # 每个写入线程单独一个执行器，分给同一线程的任务按提交顺序依次执行
+    writer_pools = [ThreadPoolExecutor(1) for _ in range(writers)]
+    try:
+        with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(resolver,)) as validator:
+            # 批次序号 -> {"size": 记录数, "futures": 未完成的写入任务, "reports": 已完成部分的报告, "error": 写入错误}
+            chunks: Dict[int, Dict] = {}
+            owners: Dict[Future, int] = {}
+
+            def collect(done_futures):
+                nonlocal processed, failed_chunks
+                for future in done_futures:
+                    index = owners.pop(future)
+                    state = chunks[index]
+                    state["futures"].discard(future)
+                    try:
+                        state["reports"].append(future.result())
+                    except Exception as e:
+                        state["error"] = state["error"] or e
+                    if state["futures"]:
+                        continue
+                    del chunks[index]
+                    if state["error"]:
+                        # 该批未记入断点，重新执行时会再次导入
+                        failed_chunks += 1
+                        print(f"❌ 第 {index + 1} 批导入失败: {state['error']}")
+                        continue
+                    checkpoint.mark_done(index, merge_reports(state["reports"]))
+                    processed += state["size"]
+                    rate = processed / max(time.time() - started, 1e-6)
+                    print(f"📝 第 {index + 1} 批完成，本次已处理 {processed} 条，{rate:.0f} 条/秒")
+
+            for index, chunk in iter_chunks(path, checkpoint.chunk_size):
+                if index in checkpoint.done:
+                    continue
+                # 限制同时在途的批次数，内存占用与文件大小无关
+                while len(chunks) >= max(writers, workers) * 2:
+                    done_futures, _ = wait(list(owners), return_when=FIRST_COMPLETED)
+                    collect(done_futures)
+                validated = validator.submit(validate_chunk, chunk, partitions)
+                if partitions == 1:
+                    targets = [(writer_pools[index % writers], 0)]
+                else:
+                    targets = [(pool, part) for part, pool in enumerate(writer_pools)]
+                futures = {pool.submit(write_part, validated, part, mode) for pool, part in targets}
+                chunks[index] = {"size": len(chunk), "futures": set(futures), "reports": [], "error": None}
+                owners.update({future: index for future in futures})
+            collect(wait(list(owners)).done)
+    finally:
+        for pool in writer_pools:
+            pool.shutdown()
+
+    state = checkpoint.state
+    print(f"✅ 导入 {state['imported']} 条（其中更新 {state['updated']} 条），"
+          f"跳过 {state['skipped']} 条，失败 {state['failed']} 条")
+    for error in state["errors"]:
+        print(f"⚠️  第 {error['row']} 条: {error['error']}")
+    if failed_chunks:
+        print(f"💥 {failed_chunks} 批写入失败，修复后重新执行同一命令即可从断点继续")
         return False
+    if os.path.exists(checkpoint.path):
+        os.remove(checkpoint.path)
+    return True
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="从JSON/NDJSON文件批量导入考点数据")
+    parser.add_argument("path", nargs="?", default="exam_points_sample.json", help="JSON数组或NDJSON文件")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每批写入并提交的记录数")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="校验数据的进程数")
+    parser.add_argument("--writers", type=int, default=4, help="并行写入的数据库连接数，upsert 模式按自然键分配给各连接")
+    parser.add_argument("--mode", choices=["upsert", "append"], default="upsert",
+                        help="upsert按自然键更新已有考点，重复执行不会产生重复数据")
+    parser.add_argument("--restart", action="store_true", help="忽略断点，从头导入")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    print("🚀 开始从JSON文件导入考点数据...")
-    success = import_from_json()
+    args = parse_args()
+    # 创建数据库表
+    Base.metadata.create_all(bind=engine)
+    print(f"🚀 开始从 {args.path} 导入考点数据...")
+    try:
+        success = import_from_json(args.path, args.batch_size, args.workers, args.writers, args.mode, args.restart)
+    except Exception as e:
+        print(f"💥 考点数据导入失败: {e}")
+        sys.exit(1)
     if success:
         print("🎉 考点数据导入完成！")
     else:
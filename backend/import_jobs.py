@@ -0,0 +1,335 @@
+"""
+考点后台导入任务
+上传的数据先保存为文件并登记任务，由后台线程按批导入。每批数据与任务进度在同一事务中提交，
+服务重启或任务中断后，从最后提交的批次继续。
+"""
+
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, Dict, Iterable, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from bulk_import import BulkImporter, iter_excel_records, iter_records, parse_exam_point, parse_exam_point_row
+from config import settings
+from models import ImportJob
+from region_resolver import get_resolver
+
+# 文件扩展名 -> 任务数据格式
+JOB_FORMATS = {".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv", ".xlsx": "xlsx"}
+READ_CHUNK_SIZE = 1024 * 1024
+
+def job_format(filename: Optional[str]) -> Optional[str]:
+    """根据文件名判断任务数据格式，不支持的格式返回None"""
+    return JOB_FORMATS.get(os.path.splitext(filename or "")[1].lower())
+
+def create_job(
+    db: Session,
+    chunks: Iterable[bytes],
+    file_format: str,
+    created_by: str,
+    mode: str = "append",
+    batch_size: int = 1000,
+    original_filename: Optional[str] = None,
+) -> ImportJob:
+    """把数据写入任务文件并登记任务，同时估算记录总数"""
+    os.makedirs(settings.IMPORT_JOB_DIR, exist_ok=True)
+    job_id = uuid.uuid4().hex
+    file_path = os.path.join(settings.IMPORT_JOB_DIR, f"{job_id}.{file_format}")
+    lines = 0
+    last_byte = b"\n"
+    with open(file_path, "wb") as f:
+        for chunk in chunks:
+            if chunk:
+                f.write(chunk)
+                lines += chunk.count(b"\n")
+                last_byte = chunk[-1:]
+    if last_byte != b"\n":
+        lines += 1
+
+    total_rows = None
+    if file_format == "ndjson":
+        total_rows = lines
+    elif file_format == "csv":
+        total_rows = max(lines - 1, 0)  # 去掉表头，字段内换行会使估算偏大
+    elif file_format == "xlsx":
+        from openpyxl import load_workbook
+        try:
+            workbook = load_workbook(file_path, read_only=True)
+            max_row = workbook.worksheets[0].max_row
+            workbook.close()
+            total_rows = max(max_row - 1, 0) if max_row else None
+        except Exception:
+            # 文件损坏时由任务执行报告错误
+            total_rows = None
+
+    job = ImportJob(
+        id=job_id,
+        status="pending",
+        file_format=file_format,
+        file_path=file_path,
+        original_filename=original_filename,
+        mode=mode,
+        batch_size=batch_size,
+        total_rows=total_rows,
+        created_by=created_by,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def job_report(job: ImportJob) -> Dict:
+    """任务当前进度，格式与 BulkImporter.report() 一致"""
+    return {
+        "received_count": job.processed_rows,
+        "imported_count": job.imported_count,
+        "updated_count": job.updated_count,
+        "skipped_count": job.skipped_count,
+        "failed_count": job.failed_count,
+        "batch_count": job.batch_count,
+        "errors": json.loads(job.errors) if job.errors else [],
+    }
+
+def save_progress(job: ImportJob, report: Dict, worker_id: Optional[str] = None):
+    """把导入报告写入任务记录，由调用方提交"""
+    job.processed_rows = report["received_count"]
+    job.imported_count = report["imported_count"]
+    job.updated_count = report["updated_count"]
+    job.skipped_count = report["skipped_count"]
+    job.failed_count = report["failed_count"]
+    job.batch_count = report["batch_count"]
+    job.errors = json.dumps(report["errors"], ensure_ascii=False)
+    job.heartbeat_at = datetime.utcnow()
+    if worker_id:
+        job.worker_id = worker_id
+
+def job_status(job: ImportJob) -> Dict:
+    """任务状态，包含剩余记录数估算和本次运行的导入速度"""
+    if job.status == "completed":
+        remaining = 0
+    elif job.total_rows is not None:
+        remaining = max(job.total_rows - job.processed_rows, 0)
+    else:
+        remaining = None
+    rows_per_second = 0.0
+    if job.started_at:
+        elapsed = ((job.finished_at or datetime.utcnow()) - job.started_at).total_seconds()
+        if elapsed > 0:
+            rows_per_second = round((job.processed_rows - job.run_started_rows) / elapsed, 1)
+    report = job_report(job)
+    return {
+        "id": job.id,
+        "status": job.status,
+        "file_format": job.file_format,
+        "original_filename": job.original_filename,
+        "mode": job.mode,
+        "batch_size": job.batch_size,
+        "total_rows": job.total_rows,
+        "processed_rows": job.processed_rows,
+        "remaining_rows": remaining,
+        "imported_count": job.imported_count,
+        "updated_count": job.updated_count,
+        "skipped_count": job.skipped_count,
+        "failed_count": job.failed_count,
+        "batch_count": job.batch_count,
+        "rows_per_second": rows_per_second,
+        "errors": report["errors"],
+        "message": job.message,
+        "created_by": job.created_by,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+async def _file_chunks(file_path: str) -> AsyncIterator[bytes]:
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+class ImportJobRunner:
+    """后台导入线程，认领待执行和中断的任务并依次执行
+
+    多个进程各自运行时，通过条件更新认领任务，同一任务只会被一个进程执行。
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], on_commit: Optional[Callable] = None):
+        self.session_factory = session_factory
+        self.on_commit = on_commit
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._loop, name="import-jobs", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def notify(self):
+        """有新任务时唤醒后台线程"""
+        self._wakeup.set()
+
+    def _loop(self):
+        while not self._stopping.is_set():
+            try:
+                self.run_pending()
+            except Exception as e:
+                print(f"导入任务调度异常: {e}")
+            self._wakeup.wait(settings.IMPORT_JOB_POLL_SECONDS)
+            self._wakeup.clear()
+
+    def run_pending(self) -> int:
+        """依次执行所有可认领的任务，返回执行的任务数"""
+        count = 0
+        while not self._stopping.is_set():
+            job_id = self._claim()
+            if job_id is None:
+                break
+            self._run(job_id)
+            count += 1
+        return count
+
+    def _claimable(self):
+        stale = datetime.utcnow() - timedelta(seconds=settings.IMPORT_JOB_STALE_SECONDS)
+        return or_(
+            ImportJob.status == "pending",
+            (ImportJob.status == "running") & (ImportJob.heartbeat_at < stale),
+        )
+
+    def _claim(self) -> Optional[str]:
+        with self.session_factory() as db:
+            candidates = (
+                db.query(ImportJob.id)
+                .filter(self._claimable())
+                .order_by(ImportJob.created_at, ImportJob.id)
+                .limit(10)
+                .all()
+            )
+            for (job_id,) in candidates:
+                # 条件更新，其他进程已认领时影响行数为0
+                claimed = (
+                    db.query(ImportJob)
+                    .filter(ImportJob.id == job_id, self._claimable())
+                    .update({
+                        ImportJob.status: "running",
+                        ImportJob.worker_id: self.worker_id,
+                        ImportJob.heartbeat_at: datetime.utcnow(),
+                    }, synchronize_session=False)
+                )
+                db.commit()
+                if claimed:
+                    return job_id
+        return None
+
+    def _run(self, job_id: str):
+        with self.session_factory() as db:
+            job = db.get(ImportJob, job_id)
+            resumed = job.processed_rows
+            job.started_at = datetime.utcnow()
+            job.run_started_rows = resumed
+            job.finished_at = None
+            db.commit()
+            if resumed:
+                print(f"导入任务 {job_id} 从第 {resumed} 条记录继续")
+
+            importer = BulkImporter(
+                db,
+                batch_size=job.batch_size,
+                on_commit=self.on_commit,
+                mode=job.mode,
+                checkpoint=lambda current: save_progress(job, current.report(), self.worker_id),
+            )
+            importer.restore(job_report(job))
+            try:
+                asyncio.run(self._consume(db, job, importer, skip=resumed))
+                report = importer.finish()
+                save_progress(job, report)
+                job.status = "completed"
+                job.finished_at = datetime.utcnow()
+                db.commit()
+            except InterruptedError:
+                # 未提交的批次已回滚，任务放回队列，下次启动时从最后提交的批次继续
+                db.rollback()
+                job.status = "pending"
+                db.commit()
+                print(f"导入任务 {job_id} 已暂停，已处理 {job.processed_rows} 条")
+                return
+            except Exception as e:
+                db.rollback()
+                job.status = "failed"
+                job.message = str(e)
+                job.finished_at = datetime.utcnow()
+                db.commit()
+                print(f"导入任务 {job_id} 失败: {e}")
+                return
+            if os.path.exists(job.file_path):
+                os.remove(job.file_path)
+            print(f"导入任务 {job_id} 完成: 导入 {report['imported_count']} 条，失败 {report['failed_count']} 条")
+
+    def _heartbeat(self, db: Session, job: ImportJob):
+        """刷新任务心跳；批次之间会话中没有未提交的写入，可以直接提交"""
+        job.heartbeat_at = datetime.utcnow()
+        db.commit()
+
+    async def _records(self, db: Session, job: ImportJob) -> AsyncIterator:
+        """按任务格式逐条产出 (行号, 列值, 错误)"""
+        defaults = {"added_by": job.created_by}
+        if job.file_format == "xlsx":
+            resolver = get_resolver(db)
+            with open(job.file_path, "rb") as f:
+                for row_number, record in iter_excel_records(f):
+                    try:
+                        yield row_number, parse_exam_point_row(record, resolver, defaults), None
+                    except ValueError as e:
+                        yield row_number, None, str(e)
+            return
+        resolver = get_resolver(db) if job.file_format == "csv" else None
+        async for row_number, record, error in iter_records(_file_chunks(job.file_path), job.file_format):
+            if error is None:
+                try:
+                    if resolver is not None:
+                        yield row_number, parse_exam_point_row(record, resolver, defaults), None
+                    else:
+                        yield row_number, parse_exam_point(record, defaults), None
+                    continue
+                except ValueError as e:
+                    error = str(e)
+            yield row_number, None, error
+
+    async def _consume(self, db: Session, job: ImportJob, importer: BulkImporter, skip: int):
+        seen = 0
+        last_beat = time.monotonic()
+        async for row_number, values, error in self._records(db, job):
+            seen += 1
+            # 心跳按时间刷新，解析较慢或长时间没有批次提交时任务也不会被判定为中断
+            if time.monotonic() - last_beat >= settings.IMPORT_JOB_HEARTBEAT_SECONDS:
+                self._heartbeat(db, job)
+                last_beat = time.monotonic()
+            # 已在之前的运行中处理过的记录
+            if seen <= skip:
+                continue
+            if self._stopping.is_set():
+                raise InterruptedError("服务停止，导入任务中断")
+            if error is None:
+                importer.add(values, row_number)
+            else:
+                importer.reject(row_number, error)
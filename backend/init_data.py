@@ -5,6 +5,7 @@
 
 from database import engine, SessionLocal
 from models import Base, Province, City
+import versioning  # 注册数据表版本号维护，使省份/城市接口的ETag随初始化数据更新
 
 # 中国省份和城市数据
 PROVINCES_AND_CITIES = {
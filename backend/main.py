@@ -1,25 +1,48 @@
-from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File
+from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Query, Request, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session, joinedload
 from datetime import datetime, timedelta
-from typing import List
+from typing import Any, Dict, List, Literal, Union
+from collections import Counter
+from urllib.parse import quote
 import jwt
 import os
 from passlib.context import CryptContext
-from database import get_db
-from models import User, Province, City, ExamPoint, ExamPaper, ExamQuestion
+from database import get_db, SessionLocal
+from models import User, Province, City, ExamPoint, ExamPaper, ExamQuestion, ImportJob
 from schemas import (
     UserCreate, User as UserSchema, UserList, Token, UserLogin, UserUpdate, UserApproval, 
     Province as ProvinceSchema, City as CitySchema, 
-    ExamPointCreate, ExamPoint as ExamPointSchema, ExamPointUpdate, ExamPointImport, ExamPointQuery,
+    ExamPointCreate, ExamPoint as ExamPointSchema, ExamPointUpdate, ExamPointImport, ExamPointQuery, ExamPointPage,
+    ExamPointSearchHit, ExamPointFacets, FacetCount, ExamPointTreeNode, ImportJobStatus, CoverageAnalysisReport,
+    CoverageRollup, DashboardSubject, DashboardSummary,
     ExamPaperCreate, ExamPaper as ExamPaperSchema, ExamPaperUpdate, ExamPaperQuery,
     ExamQuestionCreate, ExamQuestion as ExamQuestionSchema, ExamQuestionUpdate, ExamQuestionQuery,
     ExamPaperWithQuestions, FileUploadResponse, OllamaExtractionResult
 )
 from auth import create_access_token, get_current_user, get_password_hash, verify_password
 from utils import save_uploaded_file, is_allowed_file
+from pagination import CURSOR_HEADER, keyset_paginate
+import search_index
+import coverage_analysis
+import coverage_rollup
+from cache import QueryCache
+from versioning import conditional_get, get_versions
+from exam_point_tree import ExamPointTree, tree_entry
+from import_jobs import ImportJobRunner, create_job, job_format, job_status
+from region_resolver import get_resolver
+from bulk_import import (
+    BulkImporter, exam_point_values, import_message, iter_records, parse_exam_point,
+    iter_excel_records, parse_exam_point_row
+)
+from bulk_export import (
+    EXAM_POINT_COLUMNS, exam_point_row, iter_csv, iter_paper_ndjson, iter_xlsx, paper_export_columns, stream_rows
+)
 from ollama_service import OllamaService
 from config import settings
 
@@ -46,9 +69,10 @@ app.add_middleware(
         "Access-Control-Request-Headers",
         "Cache-Control",
         "Pragma",
-        "Expires"
+        "Expires",
+        "If-None-Match"
     ],
-    expose_headers=["Content-Type", "Content-Length", "Content-Disposition"],
+    expose_headers=["Content-Type", "Content-Length", "Content-Disposition", "ETag", CURSOR_HEADER],
     max_age=86400,
 )
 
@@ -58,6 +82,38 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# 考点读接口的结果缓存，考点写操作后整体失效
+exam_point_cache = QueryCache("exam_points", max_size=settings.EXAM_POINT_CACHE_SIZE)
+# 考点层级树，按范围懒加载并随考点变更增量更新
+exam_point_tree = ExamPointTree(max_scopes=settings.EXAM_POINT_TREE_SCOPES)
+# 系统概览汇总指标，以数据表版本号生成的ETag为键，任一相关表变更后不再命中
+dashboard_cache = QueryCache("dashboard", max_size=16, ttl=settings.DASHBOARD_CACHE_TTL)
+
+def exam_points_changed(added=(), removed=(), version=None):
+    """考点写操作提交后调用，刷新派生的缓存结构
+
+    added/removed 为变更前后的 tree_entry 快照，version 为提交前读取的 exam_points 表版本号。
+    """
+    exam_point_cache.invalidate()
+    if version is not None:
+        exam_point_tree.apply(version, added, removed)
+
+def exam_points_version(db: Session) -> int:
+    """写入考点后、提交前调用：flush 递增版本号并读取本事务写入后的版本号"""
+    db.flush()
+    return get_versions(db, ["exam_points"])["exam_points"]
+
+# 后台导入任务线程，随服务启动，继续执行未完成的任务
+import_job_runner = ImportJobRunner(SessionLocal, on_commit=exam_points_changed)
+
+@app.on_event("startup")
+def start_import_jobs():
+    import_job_runner.start()
+
+@app.on_event("shutdown")
+def stop_import_jobs():
+    import_job_runner.stop()
+
 # 健康检查
 @app.get("/health")
 def health_check():
@@ -119,29 +175,42 @@ def get_current_user_info(current_user: User = Depends(get_current_user), db: Se
 
 # 省份和城市相关路由
 @app.get("/provinces", response_model=List[ProvinceSchema])
-def get_provinces(db: Session = Depends(get_db)):
-    """获取所有省份列表"""
+def get_provinces(request: Request, response: Response, db: Session = Depends(get_db)):
+    """获取所有省份列表，支持ETag条件请求"""
+    not_modified = conditional_get(request, response, db, ["provinces"])
+    if not_modified:
+        return not_modified
     provinces = db.query(Province).all()
     return provinces
 
 @app.get("/provinces/{province_id}/cities", response_model=List[CitySchema])
-def get_cities_by_province(province_id: int, db: Session = Depends(get_db)):
-    """根据省份ID获取城市列表"""
+def get_cities_by_province(province_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """根据省份ID获取城市列表，支持ETag条件请求"""
+    not_modified = conditional_get(request, response, db, ["cities"])
+    if not_modified:
+        return not_modified
     cities = db.query(City).filter(City.province_id == province_id).all()
     return cities
 
 # 用户管理相关路由
 @app.get("/users", response_model=List[UserList])
 def get_users(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取用户列表"""
-    users = db.query(User).filter(
-        (User.is_deleted == False) | (User.is_deleted.is_(None))
-    ).offset(skip).limit(limit).all()
+    """获取用户列表，支持skip/limit和游标分页"""
+    query = db.query(User).filter(
+        User.is_deleted == False
+    )
+    users, next_cursor = keyset_paginate(
+        query, [User.id], "id", limit, cursor=cursor, offset=skip
+    )
+    if next_cursor:
+        response.headers[CURSOR_HEADER] = next_cursor
     return users
 
 @app.get("/users/{user_id}", response_model=UserSchema)
@@ -149,7 +218,7 @@ def get_user(user_id: int, db: Session = Depends(get_db), current_user: User = D
     """获取单个用户信息"""
     user = db.query(User).filter(
         User.id == user_id,
-        (User.is_deleted == False) | (User.is_deleted.is_(None))
+        User.is_deleted == False
     ).first()
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
@@ -165,7 +234,7 @@ def update_user(
     """更新用户信息"""
     db_user = db.query(User).filter(
         User.id == user_id,
-        (User.is_deleted == False) | (User.is_deleted.is_(None))
+        User.is_deleted == False
     ).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="用户不存在")
@@ -193,7 +262,7 @@ def approve_user(
     """审核用户"""
     db_user = db.query(User).filter(
         User.id == user_id,
-        (User.is_deleted == False) | (User.is_deleted.is_(None))
+        User.is_deleted == False
     ).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="用户不存在")
@@ -217,7 +286,7 @@ def toggle_user_status(
     """切换用户状态（激活/禁用）"""
     db_user = db.query(User).filter(
         User.id == user_id,
-        (User.is_deleted == False) | (User.is_deleted.is_(None))
+        User.is_deleted == False
     ).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="用户不存在")
@@ -237,7 +306,7 @@ def delete_user(
     """删除用户（软删除）"""
     db_user = db.query(User).filter(
         User.id == user_id,
-        (User.is_deleted == False) | (User.is_deleted.is_(None))
+        User.is_deleted == False
     ).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="用户不存在")
@@ -248,9 +317,38 @@ def delete_user(
     
     return {"message": "用户已删除"}
 
+# 列表精简视图默认返回的字段，跳过大文本列
+EXAM_POINT_SUMMARY_FIELDS = [
+    "id", "province_id", "subject", "grade", "semester",
+    "level1_point", "level2_point", "level3_point", "coverage_rate", "complexity_score", "is_active",
+]
+EXAM_QUESTION_SUMMARY_FIELDS = [
+    "id", "exam_paper_id", "question_number", "question_type",
+    "score", "difficulty_level", "exam_points", "is_active",
+]
+
+def resolve_projection(model, view: str, fields: str, summary_fields: List[str], required: List[str]):
+    """解析 view/fields 参数，返回需要查询的列名，完整视图返回None"""
+    if fields:
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+    elif view == "summary":
+        names = list(summary_fields)
+    else:
+        return None
+    
+    columns = model.__table__.columns.keys()
+    unknown = [name for name in names if name not in columns]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"不支持的字段: {', '.join(unknown)}")
+    # 主键和排序列总是查询，保证游标分页可用
+    for name in required:
+        if name not in names:
+            names.append(name)
+    return names
+
 # 考点管理相关路由
-@app.get("/exam-points", response_model=List[ExamPointSchema])
-def get_exam_points(
+def filter_exam_points(
+    query,
     province_id: int = None,
     subject: str = None,
     grade: str = None,
@@ -259,12 +357,8 @@ def get_exam_points(
     level2_point: str = None,
     level3_point: str = None,
     description: str = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
 ):
-    """获取考点列表，支持查询条件"""
-    query = db.query(ExamPoint)
-    
+    """为考点查询附加筛选条件，列表查询和计数查询共用同一套条件"""
     if province_id:
         query = query.filter(ExamPoint.province_id == province_id)
     if subject:
@@ -273,17 +367,363 @@ def get_exam_points(
         query = query.filter(ExamPoint.grade == grade)
     if semester:
         query = query.filter(ExamPoint.semester == semester)
-    if level1_point:
-        query = query.filter(ExamPoint.level1_point.contains(level1_point))
-    if level2_point:
-        query = query.filter(ExamPoint.level2_point.contains(level2_point))
-    if level3_point:
-        query = query.filter(ExamPoint.level3_point.contains(level3_point))
-    if description:
-        query = query.filter(ExamPoint.description.contains(description))
-    
-    exam_points = query.all()
-    return exam_points
+    
+    # 文本条件先用n-gram索引缩小候选集，再用原始条件校验
+    text_filters = {
+        "level1_point": level1_point,
+        "level2_point": level2_point,
+        "level3_point": level3_point,
+        "description": description,
+    }
+    for field_name, value in text_filters.items():
+        if not value:
+            continue
+        candidate_ids = search_index.matching_ids(value, field_name)
+        if candidate_ids is not None:
+            query = query.filter(ExamPoint.id.in_(candidate_ids))
+        query = query.filter(getattr(ExamPoint, field_name).contains(value))
+    return query
+
+@app.get("/exam-points", response_model=ExamPointPage)
+def get_exam_points(
+    request: Request,
+    response: Response,
+    province_id: int = None,
+    subject: str = None,
+    grade: str = None,
+    semester: str = None,
+    level1_point: str = None,
+    level2_point: str = None,
+    level3_point: str = None,
+    description: str = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: str = None,
+    sort_by: Literal["id", "coverage_rate", "complexity_score"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    view: Literal["full", "summary"] = "full",
+    fields: str = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """获取考点列表，支持查询条件，分页和总数均在数据库中计算
+
+    传入cursor时使用游标分页，不再计算总数，适合深度翻页和全量同步。
+    view=summary 或 fields=a,b,c 时只查询指定列，不读取考点描述等大文本。
+    """
+    # ETag与缓存键使用同一次读取的考点表版本号，其他进程写入考点（导入脚本等）后不会命中旧结果
+    versions = get_versions(db, ["exam_points"])
+    not_modified = conditional_get(request, response, db, ["exam_points"], versions)
+    if not_modified:
+        return not_modified
+    
+    cache_key = QueryCache.make_key(
+        endpoint="list",
+        version=versions["exam_points"],
+        province_id=province_id,
+        subject=subject,
+        grade=grade,
+        semester=semester,
+        level1_point=level1_point,
+        level2_point=level2_point,
+        level3_point=level3_point,
+        description=description,
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        sort_by=sort_by,
+        order=order,
+        view=view,
+        fields=fields,
+    )
+    cached = exam_point_cache.get(cache_key)
+    if cached is not None:
+        body, next_cursor = cached
+        headers = dict(response.headers)
+        if next_cursor:
+            headers[CURSOR_HEADER] = next_cursor
+        return Response(content=body, media_type="application/json", headers=headers)
+    generation = exam_point_cache.generation
+    
+    projection = resolve_projection(
+        ExamPoint, view, fields, EXAM_POINT_SUMMARY_FIELDS, ["id", sort_by]
+    )
+    if projection:
+        base_query = db.query(*[getattr(ExamPoint, name) for name in projection])
+    else:
+        base_query = db.query(ExamPoint)
+    query = filter_exam_points(
+        base_query,
+        province_id=province_id,
+        subject=subject,
+        grade=grade,
+        semester=semester,
+        level1_point=level1_point,
+        level2_point=level2_point,
+        level3_point=level3_point,
+        description=description,
+    )
+    
+    total = None if cursor else query.order_by(None).count()
+    if sort_by == "id":
+        columns = [ExamPoint.id]
+    elif sort_by == "complexity_score":
+        # 尚未评分的考点复杂度为空，按-1参与排序和游标比较
+        columns = [func.coalesce(ExamPoint.complexity_score, -1), ExamPoint.id]
+    else:
+        columns = [getattr(ExamPoint, sort_by), ExamPoint.id]
+    exam_points, next_cursor = keyset_paginate(
+        query,
+        columns,
+        sort_by,
+        page_size,
+        cursor=cursor,
+        offset=(page - 1) * page_size,
+        descending=order == "desc",
+    )
+    if projection:
+        exam_points = [dict(row._mapping) for row in exam_points]
+    result = ExamPointPage(
+        items=exam_points,
+        total=total,
+        page=page,
+        page_size=page_size,
+        pages=None if total is None else (total + page_size - 1) // page_size,
+        next_cursor=next_cursor
+    )
+    body = result.model_dump_json().encode("utf-8")
+    exam_point_cache.set(cache_key, (body, next_cursor), generation)
+    headers = dict(response.headers)
+    if next_cursor:
+        headers[CURSOR_HEADER] = next_cursor
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/exam-points/search", response_model=List[ExamPointSearchHit])
+def search_exam_points(
+    q: str = Query(..., min_length=1, max_length=100),
+    fields: List[Literal["level1_point", "level2_point", "level3_point", "description"]] = Query(None),
+    province_id: int = None,
+    subject: str = None,
+    grade: str = None,
+    semester: str = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """基于n-gram倒排索引的考点关键词搜索，按命中程度排序"""
+    base_query = filter_exam_points(
+        db.query(ExamPoint),
+        province_id=province_id,
+        subject=subject,
+        grade=grade,
+        semester=semester,
+    )
+    results = search_index.search_exam_points(db, q, base_query, fields=fields, limit=limit)
+    return [
+        ExamPointSearchHit.model_validate(exam_point).model_copy(update={"score": score})
+        for exam_point, score in results
+    ]
+
+# 考点筛选侧栏的分面字段
+EXAM_POINT_FACET_FIELDS = ["subject", "grade", "semester", "province_id", "level1_point"]
+
+@app.get("/exam-points/facets", response_model=ExamPointFacets)
+def get_exam_point_facets(
+    province_id: int = None,
+    subject: str = None,
+    grade: str = None,
+    semester: str = None,
+    level1_point: str = None,
+    level2_point: str = None,
+    level3_point: str = None,
+    description: str = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """获取当前筛选条件下各分面字段的考点数量"""
+    columns = [getattr(ExamPoint, field) for field in EXAM_POINT_FACET_FIELDS]
+    query = filter_exam_points(
+        db.query(*columns, func.count(ExamPoint.id)),
+        province_id=province_id,
+        subject=subject,
+        grade=grade,
+        semester=semester,
+        level1_point=level1_point,
+        level2_point=level2_point,
+        level3_point=level3_point,
+        description=description,
+    )
+    
+    # 一次分组查询得到所有分面组合的计数，再在内存中按字段汇总
+    counters: Dict[str, Counter] = {field: Counter() for field in EXAM_POINT_FACET_FIELDS}
+    total = 0
+    for row in query.group_by(*columns).all():
+        count = row[-1]
+        total += count
+        for field, value in zip(EXAM_POINT_FACET_FIELDS, row):
+            counters[field][value] += count
+    
+    return ExamPointFacets(
+        total=total,
+        facets={
+            field: [FacetCount(value=value, count=count) for value, count in counter.most_common()]
+            for field, counter in counters.items()
+        }
+    )
+
+@app.get("/exam-points/tree", response_model=ExamPointTreeNode)
+def get_exam_point_tree(
+    province_id: int = None,
+    subject: str = None,
+    grade: str = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """获取 一级->二级->三级 考点层级树，含各节点考点数和平均覆盖率"""
+    body = exam_point_tree.get_body(db, province_id=province_id, subject=subject, grade=grade)
+    return Response(content=body, media_type="application/json")
+
+@app.get("/exam-points/rollups", response_model=CoverageRollup)
+def get_exam_point_rollups(
+    request: Request,
+    response: Response,
+    province_id: int = None,
+    subject: str = None,
+    grade: str = None,
+    level1_point: str = None,
+    group_by: Literal["province_id", "subject", "grade", "level1_point"] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """按 省份->科目->年级->一级考点 下钻的覆盖率汇总，读取增量维护的汇总表
+
+    未指定 group_by 时按筛选条件之后的下一级分组，例如只传 province_id 时按科目分组。
+    """
+    not_modified = conditional_get(request, response, db, ["exam_points"])
+    if not_modified:
+        return not_modified
+    filters = {"province_id": province_id, "subject": subject, "grade": grade, "level1_point": level1_point}
+    if group_by is None:
+        group_by = next((level for level in coverage_rollup.ROLLUP_LEVELS if filters[level] is None), None)
+    return coverage_rollup.summarize(db, group_by=group_by, filters=filters)
+
+@app.get("/exam-points/coverage-analysis", response_model=CoverageAnalysisReport)
+def get_coverage_analysis(
+    request: Request,
+    response: Response,
+    province_id: int = None,
+    subject: str = None,
+    grade: str = None,
+    semester: str = None,
+    gap_limit: int = Query(20, ge=0, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """分析考点内容复杂度并给出建议覆盖率，按科目汇总并列出差距最大的考点"""
+    not_modified = conditional_get(request, response, db, ["exam_points"])
+    if not_modified:
+        return not_modified
+    query = filter_exam_points(
+        db.query(*coverage_analysis.analysis_columns()),
+        province_id=province_id,
+        subject=subject,
+        grade=grade,
+        semester=semester,
+    )
+    return coverage_analysis.analyze(db, query.statement, gap_limit=gap_limit)
+
+EXPORT_MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+}
+
+@app.get("/exam-points/export")
+def export_exam_points(
+    format: Literal["xlsx", "csv"] = "xlsx",
+    province_id: int = None,
+    subject: str = None,
+    grade: str = None,
+    semester: str = None,
+    level1_point: str = None,
+    level2_point: str = None,
+    level3_point: str = None,
+    description: str = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """按查询条件导出考点，边查询边输出，文件可直接用于Excel导入"""
+    query = filter_exam_points(
+        db.query(
+            Province.name.label("province_name"),
+            ExamPoint.subject, ExamPoint.grade, ExamPoint.semester,
+            ExamPoint.level1_point, ExamPoint.level2_point, ExamPoint.level3_point,
+            ExamPoint.description, ExamPoint.coverage_rate, ExamPoint.added_by,
+            ExamPoint.added_date, ExamPoint.is_active,
+        ).outerjoin(Province, Province.id == ExamPoint.province_id),
+        province_id=province_id,
+        subject=subject,
+        grade=grade,
+        semester=semester,
+        level1_point=level1_point,
+        level2_point=level2_point,
+        level3_point=level3_point,
+        description=description,
+    ).order_by(ExamPoint.id)
+    rows = (
+        exam_point_row(row)
+        for row in stream_rows(db.get_bind(), query.statement, settings.EXPORT_BATCH_SIZE)
+    )
+    if format == "csv":
+        content = iter_csv([name for name, _ in EXAM_POINT_COLUMNS], rows)
+    else:
+        content = iter_xlsx(EXAM_POINT_COLUMNS, rows, sheet_name="考点数据")
+    filename = f"考点数据_{datetime.now().strftime('%Y-%m-%d')}.{format}"
+    headers = {
+        "Content-Disposition": f"attachment; filename=exam_points.{format}; filename*=UTF-8''{quote(filename)}",
+    }
+    return StreamingResponse(content, media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
+
+@app.post("/exam-points/import-jobs", response_model=ImportJobStatus, status_code=202)
+def submit_import_job(
+    file: UploadFile = File(...),
+    batch_size: int = Query(settings.IMPORT_BATCH_SIZE, ge=1, le=10000),
+    mode: Literal["append", "upsert"] = "append",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """提交后台导入任务，支持 .ndjson/.jsonl/.csv/.xlsx，立即返回任务ID"""
+    file_format = job_format(file.filename)
+    if file_format is None:
+        raise HTTPException(status_code=400, detail="仅支持.ndjson、.jsonl、.csv和.xlsx文件")
+    chunks = iter(lambda: file.file.read(1024 * 1024), b"")
+    job = create_job(
+        db, chunks, file_format, current_user.username,
+        mode=mode, batch_size=batch_size, original_filename=file.filename,
+    )
+    import_job_runner.notify()
+    return job_status(job)
+
+@app.get("/exam-points/import-jobs", response_model=List[ImportJobStatus])
+def get_import_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """获取最近的导入任务"""
+    jobs = db.query(ImportJob).order_by(ImportJob.created_at.desc(), ImportJob.id).limit(limit).all()
+    return [job_status(job) for job in jobs]
+
+@app.get("/exam-points/import-jobs/{job_id}", response_model=ImportJobStatus)
+def get_import_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """获取导入任务进度"""
+    job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="导入任务不存在")
+    return job_status(job)
 
 @app.get("/exam-points/{exam_point_id}", response_model=ExamPointSchema)
 def get_exam_point(
@@ -292,10 +732,20 @@ def get_exam_point(
     current_user: User = Depends(get_current_user)
 ):
     """获取单个考点信息"""
-    exam_point = db.query(ExamPoint).filter(ExamPoint.id == exam_point_id).first()
-    if not exam_point:
-        raise HTTPException(status_code=404, detail="考点不存在")
-    return exam_point
+    cache_key = QueryCache.make_key(
+        endpoint="detail",
+        version=get_versions(db, ["exam_points"])["exam_points"],
+        exam_point_id=exam_point_id,
+    )
+    body = exam_point_cache.get(cache_key)
+    if body is None:
+        generation = exam_point_cache.generation
+        exam_point = db.query(ExamPoint).filter(ExamPoint.id == exam_point_id).first()
+        if not exam_point:
+            raise HTTPException(status_code=404, detail="考点不存在")
+        body = ExamPointSchema.model_validate(exam_point).model_dump_json().encode("utf-8")
+        exam_point_cache.set(cache_key, body, generation)
+    return Response(content=body, media_type="application/json")
 
 @app.post("/exam-points", response_model=ExamPointSchema)
 def create_exam_point(
@@ -318,7 +768,12 @@ def create_exam_point(
         is_active=exam_point.is_active
     )
     db.add(db_exam_point)
+    db.flush()
+    search_index.index_exam_point(db, db_exam_point)
+    added = tree_entry(db_exam_point)
+    version = exam_points_version(db)
     db.commit()
+    exam_points_changed(added=[added], version=version)
     db.refresh(db_exam_point)
     return db_exam_point
 
@@ -339,11 +794,17 @@ def update_exam_point(
     if "coverage_rate" in update_data:
         update_data["coverage_rate"] = int(update_data["coverage_rate"])
     
+    removed = tree_entry(db_exam_point)
     for field, value in update_data.items():
         setattr(db_exam_point, field, value)
     
     db_exam_point.updated_at = datetime.utcnow()
+    if any(field in update_data for field in search_index.FIELD_CODES):
+        search_index.index_exam_point(db, db_exam_point)
+    added = tree_entry(db_exam_point)
+    version = exam_points_version(db)
     db.commit()
+    exam_points_changed(added=[added], removed=[removed], version=version)
     db.refresh(db_exam_point)
     return db_exam_point
 
@@ -358,38 +819,126 @@ def delete_exam_point(
     if not db_exam_point:
         raise HTTPException(status_code=404, detail="考点不存在")
     
+    search_index.remove_exam_points(db, [db_exam_point.id])
+    removed = tree_entry(db_exam_point)
     db.delete(db_exam_point)
+    version = exam_points_version(db)
     db.commit()
+    exam_points_changed(removed=[removed], version=version)
     
     return {"message": "考点删除成功"}
 
 @app.post("/exam-points/import")
 def import_exam_points(
     import_data: ExamPointImport,
+    batch_size: int = Query(settings.IMPORT_BATCH_SIZE, ge=1, le=10000),
+    mode: Literal["append", "upsert"] = "append",
+    background: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """批量导入考点数据"""
-    imported_count = 0
-    for exam_point_data in import_data.exam_points:
-        db_exam_point = ExamPoint(
-            province_id=exam_point_data.province_id,
-            subject=exam_point_data.subject,
-            grade=exam_point_data.grade,
-            semester=exam_point_data.semester,
-            level1_point=exam_point_data.level1_point,
-            level2_point=exam_point_data.level2_point,
-            level3_point=exam_point_data.level3_point,
-            description=exam_point_data.description,
-            coverage_rate=int(exam_point_data.coverage_rate * 100),
-            added_by=exam_point_data.added_by,
-            is_active=exam_point_data.is_active
+    """批量导入考点数据，按批次多行插入并逐批提交，返回各批次的错误明细
+
+    mode=upsert 时按自然键（省份/科目/年级/学期/各级考点）更新已有考点，内容未变的跳过。
+    background=true 时转为后台导入任务，立即以202返回任务状态。
+    """
+    if background:
+        chunks = (
+            (exam_point_data.model_dump_json() + "\n").encode("utf-8")
+            for exam_point_data in import_data.exam_points
         )
-        db.add(db_exam_point)
-        imported_count += 1
-    
-    db.commit()
-    return {"message": f"成功导入 {imported_count} 条考点数据", "imported_count": imported_count} 
+        job = create_job(db, chunks, "ndjson", current_user.username, mode=mode, batch_size=batch_size)
+        import_job_runner.notify()
+        return JSONResponse(status_code=202, content=jsonable_encoder(job_status(job)))
+    importer = BulkImporter(db, batch_size=batch_size, on_commit=exam_points_changed, mode=mode)
+    for exam_point_data in import_data.exam_points:
+        importer.add(exam_point_values(exam_point_data))
+    report = importer.finish()
+    return {"message": import_message(report), **report}
+
+@app.post("/exam-points/import/stream")
+async def import_exam_points_stream(
+    request: Request,
+    format: Literal["ndjson", "csv"] = None,
+    batch_size: int = Query(settings.IMPORT_BATCH_SIZE, ge=1, le=10000),
+    mode: Literal["append", "upsert"] = "append",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """流式导入考点，请求体为NDJSON或带表头的CSV，边读取边校验并按批写入
+
+    未指定 format 时按 Content-Type 判断，text/csv 为CSV，其余按NDJSON处理。
+    内存中最多保留一批待写入的数据，与文件大小无关。
+    """
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    importer = await run_in_threadpool(
+        BulkImporter, db, batch_size, exam_points_changed, mode
+    )
+    # 未填写录入人时记为当前用户
+    defaults = {"added_by": current_user.username}
+    # CSV按表格行处理，与Excel一致支持中文表头、省份名称、百分数覆盖率，导出的CSV可以直接导入
+    resolver = await run_in_threadpool(get_resolver, db) if format == "csv" else None
+
+    def parse(record):
+        if resolver is not None:
+            return parse_exam_point_row(record, resolver, defaults)
+        return parse_exam_point(record, defaults)
+    pending = []
+
+    def write(records):
+        for values, row_number in records:
+            importer.add(values, row_number)
+
+    started = datetime.utcnow()
+    async for row_number, record, error in iter_records(request.stream(), format):
+        if error is None:
+            try:
+                pending.append((parse(record), row_number))
+            except ValueError as e:
+                error = str(e)
+        if error is not None:
+            importer.reject(row_number, error)
+        if len(pending) >= batch_size:
+            # 数据库写入是同步操作，放到线程池中执行，避免阻塞事件循环
+            await run_in_threadpool(write, pending)
+            pending = []
+    await run_in_threadpool(write, pending)
+    report = await run_in_threadpool(importer.finish)
+    report["elapsed_seconds"] = round((datetime.utcnow() - started).total_seconds(), 3)
+    return {"message": import_message(report), **report}
+
+@app.post("/exam-points/upload-excel")
+def upload_exam_points_excel(
+    file: UploadFile = File(...),
+    sheet: str = None,
+    batch_size: int = Query(settings.IMPORT_BATCH_SIZE, ge=1, le=10000),
+    mode: Literal["append", "upsert"] = "append",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """上传Excel(.xlsx)导入考点，服务端以只读模式逐行读取并按批写入
+
+    表头使用 EXCEL_COLUMNS 的中文标题或字段名，默认读取第一个工作表。
+    """
+    if not file.filename or not file.filename.lower().endswith(".xlsx"):
+        raise HTTPException(status_code=400, detail="仅支持.xlsx格式的Excel文件")
+    importer = BulkImporter(db, batch_size=batch_size, on_commit=exam_points_changed, mode=mode)
+    resolver = get_resolver(db)
+    defaults = {"added_by": current_user.username}
+    try:
+        for row_number, record in iter_excel_records(file.file, sheet):
+            try:
+                values = parse_exam_point_row(record, resolver, defaults)
+            except ValueError as e:
+                importer.reject(row_number, str(e))
+                continue
+            importer.add(values, row_number)
+    except ValueError as e:
+        # 文件或表头错误在读取数据行之前发现，此时尚未写入任何数据
+        raise HTTPException(status_code=400, detail=str(e))
+    report = importer.finish()
+    return {"message": import_message(report), **report}
 
 # 初始化Ollama服务
 ollama_service = OllamaService()
@@ -397,16 +946,25 @@ ollama_service = OllamaService()
 # 高考试题相关路由
 @app.get("/exam-papers", response_model=List[ExamPaperSchema])
 def get_exam_papers(
+    request: Request,
+    response: Response,
     year: int = None,
     province_id: int = None,
     subject: str = None,
     paper_name: str = None,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = None,
+    sort_by: Literal["id", "year"] = "id",
+    order: Literal["asc", "desc"] = "asc",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取高考试卷列表"""
+    """获取高考试卷列表，支持skip/limit和游标分页及ETag条件请求"""
+    # 列表中包含省份名称，省份变更也需要使缓存失效
+    not_modified = conditional_get(request, response, db, ["exam_papers", "provinces"])
+    if not_modified:
+        return not_modified
     query = db.query(ExamPaper).filter(ExamPaper.is_active == True)
     
     if year:
@@ -418,7 +976,18 @@ def get_exam_papers(
     if paper_name:
         query = query.filter(ExamPaper.paper_name.contains(paper_name))
     
-    exam_papers = query.offset(skip).limit(limit).all()
+    columns = [ExamPaper.id] if sort_by == "id" else [ExamPaper.year, ExamPaper.id]
+    exam_papers, next_cursor = keyset_paginate(
+        query,
+        columns,
+        sort_by,
+        limit,
+        cursor=cursor,
+        offset=skip,
+        descending=order == "desc",
+    )
+    if next_cursor:
+        response.headers[CURSOR_HEADER] = next_cursor
     return [
         ExamPaperSchema(
             id=paper.id,
@@ -439,6 +1008,37 @@ def get_exam_papers(
         for paper in exam_papers
     ]
 
+@app.get("/exam-papers/export")
+def export_exam_papers(
+    year: int = None,
+    province_id: int = None,
+    subject: str = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """以NDJSON格式导出试卷及其试题，每行一份试卷
+
+    试卷和试题在一次联表查询中按试卷顺序读取，通过服务端游标边查询边输出。
+    """
+    stmt = (
+        select(*paper_export_columns(), Province.name.label("province_name"))
+        .select_from(ExamPaper)
+        .outerjoin(Province, Province.id == ExamPaper.province_id)
+        .outerjoin(ExamQuestion, (ExamQuestion.exam_paper_id == ExamPaper.id) & (ExamQuestion.is_active == True))
+        .where(ExamPaper.is_active == True)
+        .order_by(ExamPaper.id, ExamQuestion.id)
+    )
+    if year:
+        stmt = stmt.where(ExamPaper.year == year)
+    if province_id:
+        stmt = stmt.where(ExamPaper.province_id == province_id)
+    if subject:
+        stmt = stmt.where(ExamPaper.subject == subject)
+    content = iter_paper_ndjson(stream_rows(db.get_bind(), stmt, settings.EXPORT_BATCH_SIZE))
+    filename = f"exam_papers_{datetime.now().strftime('%Y-%m-%d')}.ndjson"
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+    return StreamingResponse(content, media_type="application/x-ndjson", headers=headers)
+
 @app.get("/exam-papers/{paper_id}", response_model=ExamPaperWithQuestions)
 def get_exam_paper(
     paper_id: int,
@@ -695,19 +1295,30 @@ def extract_questions_with_ollama(
     }
 
 # 试题管理相关路由
-@app.get("/exam-questions", response_model=List[ExamQuestionSchema])
+@app.get("/exam-questions", response_model=List[Union[ExamQuestionSchema, Dict[str, Any]]])
 def get_exam_questions(
+    response: Response,
     exam_paper_id: int = None,
     question_type: str = None,
     question_number: str = None,
     difficulty_level: str = None,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = None,
+    view: Literal["full", "summary"] = "full",
+    fields: str = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取试题列表"""
-    query = db.query(ExamQuestion).filter(ExamQuestion.is_active == True)
+    """获取试题列表，支持skip/limit和游标分页，view/fields 可跳过题干和解析等大文本"""
+    projection = resolve_projection(
+        ExamQuestion, view, fields, EXAM_QUESTION_SUMMARY_FIELDS, ["id"]
+    )
+    if projection:
+        query = db.query(*[getattr(ExamQuestion, name) for name in projection])
+    else:
+        query = db.query(ExamQuestion)
+    query = query.filter(ExamQuestion.is_active == True)
     
     if exam_paper_id:
         query = query.filter(ExamQuestion.exam_paper_id == exam_paper_id)
@@ -718,7 +1329,13 @@ def get_exam_questions(
     if difficulty_level:
         query = query.filter(ExamQuestion.difficulty_level == difficulty_level)
     
-    questions = query.offset(skip).limit(limit).all()
+    questions, next_cursor = keyset_paginate(
+        query, [ExamQuestion.id], "id", limit, cursor=cursor, offset=skip
+    )
+    if next_cursor:
+        response.headers[CURSOR_HEADER] = next_cursor
+    if projection:
+        return [dict(row._mapping) for row in questions]
     return questions
 
 @app.get("/exam-questions/{question_id}", response_model=ExamQuestionSchema)
@@ -835,6 +1452,76 @@ def get_file(filename: str, current_user: User = Depends(get_current_user)):
         filename=filename
     )
 
+# 系统概览
+DASHBOARD_TABLES = ["exam_points", "exam_papers", "exam_questions", "users"]
+DASHBOARD_TOP_SUBJECTS = 5
+
+def build_dashboard_summary(db: Session) -> DashboardSummary:
+    """用三次查询算出系统概览的各项指标"""
+    point_counts = db.query(ExamPoint.subject, ExamPoint.is_active, func.count(ExamPoint.id)).group_by(
+        ExamPoint.subject, ExamPoint.is_active
+    ).all()
+    paper_counts = dict(
+        db.query(ExamPaper.subject, func.count(ExamPaper.id))
+        .filter(ExamPaper.is_active == True)
+        .group_by(ExamPaper.subject)
+        .all()
+    )
+    question_count, user_count, pending_user_count = db.query(
+        select(func.count(ExamQuestion.id)).where(ExamQuestion.is_active == True).scalar_subquery(),
+        select(func.count(User.id)).where(User.is_deleted == False).scalar_subquery(),
+        select(func.count(User.id)).where(User.is_deleted == False, User.is_approved == False).scalar_subquery(),
+    ).one()
+
+    active_points: Counter = Counter()
+    total_points = 0
+    for subject, is_active, count in point_counts:
+        total_points += count
+        if is_active:
+            active_points[subject] += count
+    subjects = set(active_points) | set(paper_counts)
+    top_subjects = sorted(subjects, key=lambda name: (-active_points[name], -paper_counts.get(name, 0), name))
+    return DashboardSummary(
+        exam_point_count=total_points,
+        active_exam_point_count=sum(active_points.values()),
+        exam_paper_count=sum(paper_counts.values()),
+        exam_question_count=question_count,
+        user_count=user_count,
+        pending_user_count=pending_user_count,
+        subject_count=len(subjects),
+        top_subjects=[
+            DashboardSubject(subject=name, exam_point_count=active_points[name],
+                             exam_paper_count=paper_counts.get(name, 0))
+            for name in top_subjects[:DASHBOARD_TOP_SUBJECTS]
+        ],
+        generated_at=datetime.utcnow(),
+    )
+
+@app.get("/dashboard/summary", response_model=DashboardSummary)
+def get_dashboard_summary(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """系统概览的汇总指标：考点、试卷、试题、用户数，待审核用户数和考点最多的科目"""
+    not_modified = conditional_get(request, response, db, DASHBOARD_TABLES)
+    if not_modified:
+        return not_modified
+    # ETag 由相关表的版本号生成，任何写操作（含其他进程的批量写入）都会使旧缓存失效
+    cache_key = response.headers["etag"]
+    body = dashboard_cache.get(cache_key)
+    if body is None:
+        body = build_dashboard_summary(db).model_dump_json().encode("utf-8")
+        dashboard_cache.set(cache_key, body)
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
+
+# 缓存命中情况
+@app.get("/cache/stats")
+def get_cache_stats(current_user: User = Depends(get_current_user)):
+    """查看各结果缓存的命中统计"""
+    return {"caches": [exam_point_cache.stats(), dashboard_cache.stats()]}
+
 # Ollama服务状态检查
 @app.get("/ollama/status")
 def check_ollama_status():
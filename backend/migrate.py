@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据库结构迁移工具
+按版本号顺序执行迁移，已执行的版本记录在 schema_migrations 表中
+
+考点复杂度评分的规则版本变化时，执行迁移也会重算旧版本的评分
+
+用法:
+    python migrate.py           执行所有未执行的迁移
+    python migrate.py status    查看迁移执行情况
+    python migrate.py rebuild-rollups    按考点表重新生成覆盖率汇总表
+"""
+
+import sys
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, bindparam, exists, insert, inspect, select, text
+
+from database import Base, engine
+import models  # noqa: F401  注册所有模型到 Base.metadata
+import coverage_rollup
+import search_index
+import versioning
+from coverage_analysis import outdated_complexity, rescore_exam_points
+from exam_point_hash import CONTENT_FIELDS, NATURAL_KEY_FIELDS, add_hashes
+
+migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", String(20), primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+def create_tables(*table_names):
+    """创建模型中新增的数据表（已存在则跳过）"""
+    def upgrade(connection):
+        for name in table_names:
+            Base.metadata.tables[name].create(connection, checkfirst=True)
+    return upgrade
+
+def add_index(table_name, index_name):
+    """按模型中的定义添加索引，MySQL上使用在线DDL，建索引期间不锁表"""
+    def upgrade(connection):
+        table = Base.metadata.tables[table_name]
+        index = next(index for index in table.indexes if index.name == index_name)
+        existing = {item["name"] for item in inspect(connection).get_indexes(table_name)}
+        if index_name in existing:
+            print(f"⏭️  索引 {index_name} 已存在，跳过")
+            return
+        if connection.dialect.name == "mysql":
+            columns = ", ".join(f"`{column.name}`" for column in index.columns)
+            connection.execute(text(
+                f"ALTER TABLE `{table_name}` ADD INDEX `{index_name}` ({columns}), "
+                "ALGORITHM=INPLACE, LOCK=NONE"
+            ))
+        else:
+            index.create(connection)
+        print(f"✅ 已创建索引 {table_name}.{index_name}")
+    return upgrade
+
+def add_column(table_name, column_name):
+    """按模型中的定义添加可为空的新列（已存在则跳过）"""
+    def upgrade(connection):
+        existing = {column["name"] for column in inspect(connection).get_columns(table_name)}
+        if column_name in existing:
+            print(f"⏭️  列 {table_name}.{column_name} 已存在，跳过")
+            return
+        column = Base.metadata.tables[table_name].c[column_name]
+        column_type = column.type.compile(dialect=connection.dialect)
+        quote = connection.dialect.identifier_preparer.quote
+        connection.execute(text(f"ALTER TABLE {quote(table_name)} ADD COLUMN {quote(column_name)} {column_type}"))
+        print(f"✅ 已添加列 {table_name}.{column_name}")
+    return upgrade
+
+def backfill_exam_point_hashes(connection, batch_size=1000):
+    """为已有考点计算自然键哈希和内容哈希"""
+    table = Base.metadata.tables["exam_points"]
+    columns = [table.c[field] for field in NATURAL_KEY_FIELDS + CONTENT_FIELDS]
+    stmt = (
+        table.update()
+        .where(table.c.id == bindparam("point_id"))
+        .values(natural_key_hash=bindparam("nk_hash"), content_hash=bindparam("c_hash"))
+    )
+    total = 0
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(table.c.id, *columns)
+            .where(table.c.id > last_id, table.c.natural_key_hash.is_(None))
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).mappings().all()
+        if not rows:
+            break
+        params = []
+        for row in rows:
+            values = add_hashes(dict(row))
+            params.append({"point_id": row["id"], "nk_hash": values["natural_key_hash"], "c_hash": values["content_hash"]})
+        connection.execute(stmt, params)
+        total += len(rows)
+        last_id = rows[-1]["id"]
+    print(f"✅ 回填考点哈希: {total} 行")
+
+def backfill_exam_point_ngrams(connection, batch_size=1000):
+    """为还没有索引行的考点建立n-gram索引，考点文本筛选依赖该索引"""
+    table = Base.metadata.tables["exam_points"]
+    ngrams = Base.metadata.tables["exam_point_ngrams"]
+    columns = [table.c[name] for name in search_index.INDEXED_FIELDS.values()]
+    total = 0
+    last_id = 0
+    while True:
+        points = connection.execute(
+            select(table.c.id, *columns)
+            .where(table.c.id > last_id, ~exists().where(ngrams.c.exam_point_id == table.c.id))
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not points:
+            break
+        rows = [row for point in points for row in search_index.build_rows(point)]
+        if rows:
+            connection.execute(insert(ngrams), rows)
+        total += len(points)
+        last_id = points[-1].id
+    if total:
+        # 运行中的服务可能缓存了索引为空时的筛选结果
+        versioning.bump_versions(connection, ["exam_points"])
+    print(f"✅ 建立考点n-gram索引: {total} 行")
+
+def rescore_exam_point_complexity(connection, batch_size=1000):
+    """重算没有评分或评分版本过期的考点复杂度"""
+    total = rescore_exam_points(connection, batch_size)
+    if total:
+        versioning.bump_versions(connection, ["exam_points"])
+    print(f"✅ 重算考点复杂度评分: {total} 行")
+    return total
+
+def rebuild_exam_point_rollups(connection):
+    """按已有考点生成覆盖率汇总表"""
+    total = coverage_rollup.rebuild(connection)
+    print(f"✅ 生成考点覆盖率汇总: {total} 行")
+
+def backfill_user_flags(connection):
+    """回填用户状态标志中的NULL，并在MySQL上把这些列改为非空"""
+    defaults = {"is_active": 1, "is_approved": 0, "is_deleted": 0}
+    for column, value in defaults.items():
+        result = connection.execute(text(
+            f"UPDATE users SET {column} = :value WHERE {column} IS NULL"
+        ), {"value": value})
+        print(f"✅ 回填 users.{column}: {result.rowcount} 行")
+    if connection.dialect.name == "mysql":
+        connection.execute(text(
+            "ALTER TABLE `users` "
+            "MODIFY `is_active` TINYINT(1) NOT NULL DEFAULT 1, "
+            "MODIFY `is_approved` TINYINT(1) NOT NULL DEFAULT 0, "
+            "MODIFY `is_deleted` TINYINT(1) NOT NULL DEFAULT 0, "
+            "ALGORITHM=INPLACE, LOCK=NONE"
+        ))
+        print("✅ users 状态标志已改为非空")
+    else:
+        print(f"⏭️  {connection.dialect.name} 不支持修改列约束，跳过非空修改")
+
+def run_all(*steps):
+    """把多个迁移步骤组合为一个迁移"""
+    def upgrade(connection):
+        for step in steps:
+            step(connection)
+    return upgrade
+
+# 迁移列表，只能在末尾追加，不要修改已发布的版本
+MIGRATIONS = [
+    {
+        "version": "0001",
+        "description": "创建考点n-gram索引表和数据表版本号表",
+        "upgrade": create_tables("exam_point_ngrams", "table_versions"),
+    },
+    {
+        "version": "0002",
+        "description": "按实际查询条件添加联合索引",
+        "upgrade": run_all(
+            add_index("exam_points", "ix_exam_points_scope"),
+            add_index("exam_points", "ix_exam_points_scope_coverage"),
+            add_index("exam_papers", "ix_exam_papers_province_subject_year"),
+            add_index("exam_questions", "ix_exam_questions_paper_active"),
+        ),
+    },
+    {
+        "version": "0003",
+        "description": "用户状态标志改为非空并添加未删除用户索引",
+        "upgrade": run_all(
+            backfill_user_flags,
+            add_index("users", "ix_users_deleted_username"),
+            add_index("users", "ix_users_deleted_id"),
+        ),
+    },
+    {
+        "version": "0004",
+        "description": "添加考点自然键哈希和内容哈希，支持增量导入",
+        "upgrade": run_all(
+            add_column("exam_points", "natural_key_hash"),
+            add_column("exam_points", "content_hash"),
+            backfill_exam_point_hashes,
+            add_index("exam_points", "ix_exam_points_natural_key_hash"),
+        ),
+    },
+    {
+        "version": "0005",
+        "description": "创建考点导入任务表",
+        "upgrade": create_tables("import_jobs"),
+    },
+    {
+        "version": "0006",
+        "description": "保存考点复杂度评分，报表和排序直接读取",
+        "upgrade": run_all(
+            add_column("exam_points", "complexity_score"),
+            add_column("exam_points", "formula_count"),
+            add_column("exam_points", "keyword_count"),
+            add_column("exam_points", "complexity_version"),
+            rescore_exam_point_complexity,
+            add_index("exam_points", "ix_exam_points_complexity_score"),
+        ),
+    },
+    {
+        "version": "0007",
+        "description": "创建考点覆盖率汇总表并按已有考点生成",
+        "upgrade": run_all(
+            create_tables("exam_point_rollups"),
+            rebuild_exam_point_rollups,
+        ),
+    },
+    {
+        "version": "0008",
+        "description": "添加按试卷统计的考点考查情况",
+        "upgrade": run_all(
+            add_column("exam_points", "paper_count"),
+            add_column("exam_points", "paper_year_count"),
+            add_column("exam_points", "paper_score_share"),
+            add_column("exam_points", "paper_coverage_rate"),
+            add_column("exam_points", "paper_stats_at"),
+            create_tables("exam_paper_coverage_states", "exam_point_paper_hits"),
+        ),
+    },
+    {
+        "version": "0009",
+        "description": "试卷考查统计按id识别新增的试题和考点",
+        "upgrade": run_all(
+            add_column("exam_paper_coverage_states", "max_question_id"),
+            add_column("exam_paper_coverage_states", "max_exam_point_id"),
+        ),
+    },
+    {
+        "version": "0010",
+        "description": "为已有考点建立n-gram索引（0001只创建了索引表）",
+        "upgrade": backfill_exam_point_ngrams,
+    },
+]
+
+def applied_versions(connection):
+    schema_migrations.create(connection, checkfirst=True)
+    return {row.version for row in connection.execute(select(schema_migrations.c.version))}
+
+def upgrade(bind=engine):
+    """执行所有未执行的迁移，返回本次执行的版本列表"""
+    executed = []
+    with bind.begin() as connection:
+        done = applied_versions(connection)
+    for migration in MIGRATIONS:
+        if migration["version"] in done:
+            continue
+        print(f"🔄 执行迁移 {migration['version']}: {migration['description']}")
+        # 每个迁移单独提交，失败时已完成的迁移不受影响，修复后可重新执行
+        with bind.begin() as connection:
+            migration["upgrade"](connection)
+            connection.execute(schema_migrations.insert().values(
+                version=migration["version"],
+                description=migration["description"],
+                applied_at=datetime.utcnow(),
+            ))
+        executed.append(migration["version"])
+    # 评分规则升级后（SCORING_VERSION 递增）重算旧评分，没有过期评分时只执行一次查询
+    with bind.begin() as connection:
+        table = Base.metadata.tables["exam_points"]
+        if connection.execute(select(table.c.id).where(outdated_complexity()).limit(1)).first():
+            rescore_exam_point_complexity(connection)
+    return executed
+
+def status(bind=engine):
+    with bind.begin() as connection:
+        done = applied_versions(connection)
+    for migration in MIGRATIONS:
+        mark = "✅" if migration["version"] in done else "⏳"
+        print(f"{mark} {migration['version']} {migration['description']}")
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+    try:
+        if command == "status":
+            status()
+        elif command == "rebuild-rollups":
+            with engine.begin() as connection:
+                rebuild_exam_point_rollups(connection)
+        elif command == "upgrade":
+            executed = upgrade()
+            print(f"🎉 迁移完成，本次执行 {len(executed)} 个版本")
+        else:
+            print(__doc__)
+            sys.exit(1)
+    except Exception as e:
+        print(f"💥 迁移失败: {e}")
+        sys.exit(1)
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, DECIMAL
+from sqlalchemy import Column, BigInteger, Integer, SmallInteger, String, Boolean, DateTime, Text, ForeignKey, DECIMAL, Float, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, expression
 from database import Base
 from datetime import datetime
 
@@ -31,6 +31,12 @@ class City(Base):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # 认证时按用户名查找未删除用户
+        Index("ix_users_deleted_username", "is_deleted", "username"),
+        # 用户列表按id顺序翻页
+        Index("ix_users_deleted_id", "is_deleted", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, index=True, nullable=False)
@@ -42,9 +48,9 @@ class User(Base):
     grade = Column(String(20))
     province_id = Column(Integer, ForeignKey("provinces.id"))
     city_id = Column(Integer, ForeignKey("cities.id"))
-    is_active = Column(Boolean, default=True, nullable=True)  # 允许NULL
-    is_approved = Column(Boolean, default=False, nullable=True)  # 允许NULL
-    is_deleted = Column(Boolean, default=False, nullable=True)  # 允许NULL
+    is_active = Column(Boolean, default=True, server_default=expression.true(), nullable=False)
+    is_approved = Column(Boolean, default=False, server_default=expression.false(), nullable=False)
+    is_deleted = Column(Boolean, default=False, server_default=expression.false(), nullable=False)
     is_superuser = Column(Boolean, default=False, nullable=True)  # 超级用户标识
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -57,6 +63,12 @@ class User(Base):
 
 class ExamPoint(Base):
     __tablename__ = "exam_points"
+    __table_args__ = (
+        # 列表/分面/层级树的常用筛选：省份+科目+年级+学期，分组到一级考点
+        Index("ix_exam_points_scope", "province_id", "subject", "grade", "semester", "level1_point"),
+        # 同一筛选范围内按覆盖率排序
+        Index("ix_exam_points_scope_coverage", "province_id", "subject", "grade", "semester", "coverage_rate"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     province_id = Column(Integer, ForeignKey("provinces.id"), nullable=False)
@@ -71,13 +83,63 @@ class ExamPoint(Base):
     added_by = Column(String(50), nullable=False)
     added_date = Column(DateTime(timezone=True), server_default=func.now())
     is_active = Column(Boolean, default=True, nullable=False)
+    # 自然键和内容的SHA1，用于重复导入时识别已有考点及其是否变化，由 exam_point_hash 维护
+    natural_key_hash = Column(String(40), nullable=True, index=True)
+    content_hash = Column(String(40), nullable=True)
+    # 描述的复杂度评分(1-10)及公式数、关键词数，写入时计算，由 coverage_analysis 维护
+    complexity_score = Column(DECIMAL(3,1, asdecimal=False), nullable=True, index=True)
+    formula_count = Column(Integer, nullable=True)
+    keyword_count = Column(Integer, nullable=True)
+    complexity_version = Column(SmallInteger, nullable=True)  # 计算评分时的 coverage_analysis.SCORING_VERSION
+    # 按已录入试卷统计的实际考查情况，由 paper_coverage 计算，范围为同省份同科目的试卷
+    paper_count = Column(Integer, nullable=True)  # 考查过该考点的试卷数
+    paper_year_count = Column(Integer, nullable=True)  # 考查过该考点的年份数
+    paper_score_share = Column(Float, nullable=True)  # 相关试题分值占试卷总分的百分比
+    paper_coverage_rate = Column(Integer, nullable=True)  # 考查年份数占有试卷年份数的百分比
+    paper_stats_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # 与接口中显式写入的修改时间一致使用UTC，试卷考查统计按该时间增量处理
+    updated_at = Column(DateTime(timezone=True), onupdate=datetime.utcnow)
+
+class ExamPointRollup(Base):
+    """考点覆盖率汇总表，按 省份/科目/年级/一级考点/覆盖率分段 累计考点数和覆盖率合计
+
+    随考点写入在同一事务中增量更新，由 coverage_rollup 维护。
+    """
+    __tablename__ = "exam_point_rollups"
+
+    province_id = Column(Integer, primary_key=True)
+    subject = Column(String(50), primary_key=True)
+    grade = Column(String(20), primary_key=True)
+    level1_point = Column(String(100), primary_key=True)
+    bucket = Column(SmallInteger, primary_key=True)  # 覆盖率分段：0 为 0-9%，9 为 90-100%
+    point_count = Column(Integer, nullable=False, default=0)
+    coverage_sum = Column(BigInteger, nullable=False, default=0)
+
+class ExamPointNgram(Base):
+    """考点文本n-gram倒排索引表"""
+    __tablename__ = "exam_point_ngrams"
+    
+    gram = Column(String(8), primary_key=True)  # 二元组，主键以gram开头便于按词项查找
+    field = Column(SmallInteger, primary_key=True)  # 字段编号，见search_index.INDEXED_FIELDS
+    exam_point_id = Column(Integer, ForeignKey("exam_points.id", ondelete="CASCADE"), primary_key=True, index=True)
+    tf = Column(SmallInteger, nullable=False, default=1)  # 词项在该字段中出现的次数
+
+class TableVersion(Base):
+    """数据表版本号，表数据每次变更时递增，用于生成ETag"""
+    __tablename__ = "table_versions"
+    
+    table_name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 # 高考试题相关模型
 class ExamPaper(Base):
     """高考试卷表"""
     __tablename__ = "exam_papers"
+    __table_args__ = (
+        Index("ix_exam_papers_province_subject_year", "province_id", "subject", "year"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     year = Column(Integer, nullable=False, index=True)  # 年份
@@ -91,7 +153,8 @@ class ExamPaper(Base):
     added_by = Column(String(50), nullable=False)  # 添加人
     is_active = Column(Boolean, default=True, nullable=False)  # 状态删除
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # 与接口中显式写入的修改时间一致使用UTC，试卷考查统计按该时间增量处理
+    updated_at = Column(DateTime(timezone=True), onupdate=datetime.utcnow)
     
     # 关联试题
     questions = relationship("ExamQuestion", back_populates="exam_paper")
@@ -100,6 +163,9 @@ class ExamPaper(Base):
 class ExamQuestion(Base):
     """高考试题表"""
     __tablename__ = "exam_questions"
+    __table_args__ = (
+        Index("ix_exam_questions_paper_active", "exam_paper_id", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     exam_paper_id = Column(Integer, ForeignKey("exam_papers.id"), nullable=False)
@@ -114,7 +180,67 @@ class ExamQuestion(Base):
     added_by = Column(String(50), nullable=False)  # 添加人
     is_active = Column(Boolean, default=True, nullable=False)  # 状态删除
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # 与接口中显式写入的修改时间一致使用UTC，试卷考查统计按该时间增量处理
+    updated_at = Column(DateTime(timezone=True), onupdate=datetime.utcnow)
     
     # 关联试卷
-    exam_paper = relationship("ExamPaper", back_populates="questions") 
\ No newline at end of file
+    exam_paper = relationship("ExamPaper", back_populates="questions") 
+
+class ExamPaperCoverageState(Base):
+    """已统计考点的试卷，记录统计时试卷的范围和总分，用于增量统计"""
+    __tablename__ = "exam_paper_coverage_states"
+    __table_args__ = (
+        Index("ix_exam_paper_coverage_states_scope", "province_id", "subject"),
+    )
+
+    exam_paper_id = Column(Integer, ForeignKey("exam_papers.id"), primary_key=True)
+    province_id = Column(Integer, nullable=False)
+    subject = Column(String(50), nullable=False)
+    year = Column(Integer, nullable=False)
+    total_score = Column(Float, nullable=False, default=0)
+    processed_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    # 统计时的最大试题id和考点id，之后新增的试题和考点按id识别，不依赖数据库时钟
+    max_question_id = Column(Integer, nullable=True)
+    max_exam_point_id = Column(Integer, nullable=True)
+
+class ExamPointPaperHit(Base):
+    """试卷中考查到的考点及相关试题的分值，由 paper_coverage 按试卷整体替换"""
+    __tablename__ = "exam_point_paper_hits"
+    __table_args__ = (
+        Index("ix_exam_point_paper_hits_scope", "province_id", "subject"),
+    )
+
+    exam_paper_id = Column(Integer, ForeignKey("exam_papers.id"), primary_key=True)
+    exam_point_id = Column(Integer, ForeignKey("exam_points.id", ondelete="CASCADE"), primary_key=True, index=True)
+    province_id = Column(Integer, nullable=False)
+    subject = Column(String(50), nullable=False)
+    year = Column(Integer, nullable=False)
+    score = Column(Float, nullable=False, default=0)
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+    
+    id = Column(String(32), primary_key=True)
+    status = Column(String(20), nullable=False, default="pending", index=True)  # pending/running/completed/failed
+    file_format = Column(String(10), nullable=False)  # ndjson/csv/xlsx
+    file_path = Column(String(500), nullable=False)
+    original_filename = Column(String(255), nullable=True)
+    mode = Column(String(10), nullable=False, default="append")
+    batch_size = Column(Integer, nullable=False)
+    total_rows = Column(Integer, nullable=True)  # 提交时估算的记录数
+    # 已处理的记录数，与最后一批数据在同一事务中提交，中断后从这里继续
+    processed_rows = Column(Integer, nullable=False, default=0)
+    imported_count = Column(Integer, nullable=False, default=0)
+    updated_count = Column(Integer, nullable=False, default=0)
+    skipped_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    batch_count = Column(Integer, nullable=False, default=0)
+    errors = Column(Text, nullable=True)  # JSON格式的错误明细
+    message = Column(Text, nullable=True)
+    created_by = Column(String(50), nullable=False)
+    worker_id = Column(String(100), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    run_started_rows = Column(Integer, nullable=False, default=0)  # 本次运行开始时已处理的记录数，用于计算速度
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,75 @@
+import base64
+import json
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlalchemy.sql import functions
+
+# 下一页游标通过响应头返回，列表接口的响应体保持不变
+CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(sort_key: str, values: Sequence) -> str:
+    """把排序键和最后一行的排序值编码为不透明游标"""
+    payload = json.dumps({"k": sort_key, "v": list(values)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, sort_key: str) -> list:
+    """解析游标，游标无效或与当前排序方式不一致时返回400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        key, values = payload["k"], payload["v"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+    if key != sort_key or not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="分页游标与当前排序方式不匹配")
+    return values
+
+def _sort_value(row, column):
+    """读取结果行的排序值，coalesce(列, 默认值) 形式的排序列为空时取默认值"""
+    if isinstance(column, functions.coalesce):
+        inner, default = column.clauses
+        value = getattr(row, inner.key)
+        return default.value if value is None else value
+    return getattr(row, column.key)
+
+def keyset_paginate(
+    query,
+    columns: List,
+    sort_key: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    descending: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """按 columns 排序分页，返回 (当前页数据, 下一页游标)
+
+    columns 的最后一列必须唯一（通常是主键），保证排序稳定。
+    可为空的排序列需写成 func.coalesce(列, 默认值)，否则 NULL 参与行比较时结果恒为假，游标会跳过这些行。
+    传入 cursor 时使用 keyset 条件定位，忽略 offset；
+    否则按 offset 取数，同样会返回下一页游标，方便从第一页切换到游标模式。
+    """
+    sort_key = f"{sort_key}:{'desc' if descending else 'asc'}"
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in columns])
+
+    if cursor:
+        values = decode_cursor(cursor, sort_key)
+        if len(values) != len(columns):
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+        if len(columns) == 1:
+            left, right = columns[0], values[0]
+        else:
+            left, right = tuple_(*columns), tuple_(*values)
+        query = query.filter(left < right if descending else left > right)
+    elif offset:
+        query = query.offset(offset)
+
+    # 多取一行用于判断是否还有下一页
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort_key, [_sort_value(last, column) for column in columns])
+    return rows, next_cursor
@@ -0,0 +1,247 @@
+"""
+按已录入试卷统计考点的实际考查情况
+用试题“相关考点”文本中的考点名匹配同省份同科目的考点，统计每个考点被多少份试卷、
+多少个年份考查过，以及相关试题分值占试卷总分的比例，写回 exam_points 的 paper_* 列。
+
+每份试卷的匹配结果保存在 exam_point_paper_hits 表中。再次统计时只重新匹配上次统计之后
+新增、修改或删除过的试卷（及其试题），以及考点有新增或修改的 省份+科目 下的试卷，
+再对受影响的 省份+科目 用汇总查询重新计算考点统计。
+
+新增的试卷、试题和考点按统计状态和id识别；修改按 updated_at 识别，统计时间与 updated_at
+都取应用的UTC时间，不使用时区可能不同的数据库 NOW()。
+"""
+
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, bindparam, delete, distinct, func, insert, or_, select, update
+
+from models import ExamPaper, ExamPaperCoverageState, ExamPoint, ExamPointPaperHit, ExamQuestion
+import versioning
+
+# 试题相关考点中分隔多个考点名的符号
+TERM_SEPARATORS = re.compile(r"[，,、；;。/|\s]+")
+# 每批重新匹配的试卷数
+PAPER_BATCH_SIZE = 500
+# 时间戳只精确到秒且各服务器时钟可能略有偏差，按上次统计时间回退一段时间查找变更，
+# 重复统计同一试卷的结果不变
+TIMESTAMP_SLACK = timedelta(seconds=5)
+
+Scope = Tuple[int, str]
+
+def split_terms(text: Optional[str]) -> List[str]:
+    """拆分试题的相关考点文本，去重并保持顺序"""
+    terms = [term.strip() for term in TERM_SEPARATORS.split(text or "")]
+    return list(dict.fromkeys(term for term in terms if term))
+
+class ScopeIndex:
+    """某个 省份+科目 范围内的考点名称索引
+
+    考点名依次按三级、二级、一级考点匹配，匹配到较高层级时该层级下的考点都计为被考查。
+    """
+
+    def __init__(self, rows: Iterable):
+        self.levels = [defaultdict(list), defaultdict(list), defaultdict(list)]
+        for point_id, level1, level2, level3 in rows:
+            for names, name in zip(self.levels, (level3, level2, level1)):
+                if name and name.strip():
+                    names[name.strip()].append(point_id)
+
+    @classmethod
+    def load(cls, connection, scope: Scope) -> "ScopeIndex":
+        province_id, subject = scope
+        return cls(connection.execute(
+            select(ExamPoint.id, ExamPoint.level1_point, ExamPoint.level2_point, ExamPoint.level3_point)
+            .where(ExamPoint.province_id == province_id, ExamPoint.subject == subject, ExamPoint.is_active == True)
+        ).all())
+
+    def match(self, term: str) -> List[int]:
+        for names in self.levels:
+            if term in names:
+                return names[term]
+        return []
+
+def match_questions(index: ScopeIndex, questions: Iterable) -> Dict[int, float]:
+    """一份试卷的试题 -> {考点id: 相关试题分值}
+
+    试题分值平均分给匹配到考点的各个考点名，一个考点名对应多个考点时每个考点都计入该份分值。
+    """
+    scores: Dict[int, float] = defaultdict(float)
+    for question in questions:
+        matches = [index.match(term) for term in split_terms(question.exam_points)]
+        matches = [point_ids for point_ids in matches if point_ids]
+        if not matches:
+            continue
+        share = float(question.score or 0) / len(matches)
+        # 同一考点被同一试题的多个考点名匹配到时只计一份
+        for point_id in {point_id for point_ids in matches for point_id in point_ids}:
+            scores[point_id] += share
+    return dict(scores)
+
+def changed_paper_ids(connection, full: bool = False) -> Set[int]:
+    """需要重新匹配的试卷：从未统计过的有效试卷，上次统计后试卷或其试题有变更的试卷，
+    以及上次统计后考点有新增或修改（名称变化会影响匹配）的 省份+科目 下的有效试卷
+    """
+    state = ExamPaperCoverageState
+    if full:
+        papers = connection.execute(select(ExamPaper.id).where(ExamPaper.is_active == True)).scalars()
+        return set(papers) | set(connection.execute(select(state.exam_paper_id)).scalars())
+
+    changed = set(connection.execute(
+        select(ExamPaper.id)
+        .outerjoin(state, state.exam_paper_id == ExamPaper.id)
+        .where(ExamPaper.is_active == True, state.exam_paper_id.is_(None))
+    ).scalars())
+    last_run, last_question_id, last_point_id = connection.execute(
+        select(func.max(state.processed_at), func.max(state.max_question_id), func.max(state.max_exam_point_id))
+    ).one()
+    if last_run is None:
+        return changed
+    since = last_run - TIMESTAMP_SLACK
+
+    def added_after(model, last_id):
+        # 迁移前统计的记录没有保存最大id，退回按创建时间判断
+        return model.id > last_id if last_id is not None else model.created_at >= since
+
+    changed.update(connection.execute(
+        select(ExamPaper.id).where(ExamPaper.updated_at >= since)
+    ).scalars())
+    changed.update(connection.execute(
+        select(distinct(ExamQuestion.exam_paper_id))
+        .where(or_(added_after(ExamQuestion, last_question_id), ExamQuestion.updated_at >= since))
+    ).scalars())
+    # 统计结果写回考点时保留原修改时间，不会使考点范围被反复重新匹配
+    scopes = connection.execute(
+        select(ExamPoint.province_id, ExamPoint.subject).distinct()
+        .where(or_(added_after(ExamPoint, last_point_id), ExamPoint.updated_at >= since))
+    ).all()
+    if scopes:
+        changed.update(connection.execute(
+            select(ExamPaper.id).where(
+                ExamPaper.is_active == True,
+                or_(*[and_(ExamPaper.province_id == province_id, ExamPaper.subject == subject)
+                      for province_id, subject in scopes]),
+            )
+        ).scalars())
+    return changed
+
+def _process_papers(connection, paper_ids: List[int], marks: Dict, indexes: Dict[Scope, ScopeIndex]) -> Set[Scope]:
+    """重新匹配一批试卷，替换其匹配结果，返回受影响的范围
+
+    marks 为本次统计的时间和最大试题id、考点id，写入统计状态。
+    """
+    state = ExamPaperCoverageState
+    scopes = {
+        (row.province_id, row.subject)
+        for row in connection.execute(
+            select(state.province_id, state.subject).where(state.exam_paper_id.in_(paper_ids))
+        )
+    }
+    connection.execute(delete(ExamPointPaperHit).where(ExamPointPaperHit.exam_paper_id.in_(paper_ids)))
+    connection.execute(delete(state).where(state.exam_paper_id.in_(paper_ids)))
+
+    papers = connection.execute(
+        select(ExamPaper.id, ExamPaper.year, ExamPaper.province_id, ExamPaper.subject, ExamPaper.total_score)
+        .where(ExamPaper.id.in_(paper_ids), ExamPaper.is_active == True)
+    ).all()
+    if not papers:
+        return scopes
+    questions = defaultdict(list)
+    for question in connection.execute(
+        select(ExamQuestion.exam_paper_id, ExamQuestion.score, ExamQuestion.exam_points)
+        .where(ExamQuestion.exam_paper_id.in_([paper.id for paper in papers]), ExamQuestion.is_active == True)
+    ):
+        questions[question.exam_paper_id].append(question)
+
+    hits, states = [], []
+    for paper in papers:
+        scope = (paper.province_id, paper.subject)
+        scopes.add(scope)
+        if scope not in indexes:
+            indexes[scope] = ScopeIndex.load(connection, scope)
+        paper_questions = questions[paper.id]
+        total_score = paper.total_score or sum(float(question.score or 0) for question in paper_questions)
+        states.append({
+            "exam_paper_id": paper.id, "province_id": paper.province_id, "subject": paper.subject,
+            "year": paper.year, "total_score": float(total_score), **marks,
+        })
+        for point_id, score in match_questions(indexes[scope], paper_questions).items():
+            hits.append({
+                "exam_paper_id": paper.id, "exam_point_id": point_id, "province_id": paper.province_id,
+                "subject": paper.subject, "year": paper.year, "score": score,
+            })
+    connection.execute(insert(state), states)
+    if hits:
+        connection.execute(insert(ExamPointPaperHit), hits)
+    return scopes
+
+def _update_scope(connection, scope: Scope, started) -> int:
+    """按匹配结果重新计算一个范围内所有考点的统计，返回更新的考点数"""
+    province_id, subject = scope
+    state, hit = ExamPaperCoverageState, ExamPointPaperHit
+    year_total, score_total = connection.execute(
+        select(func.count(distinct(state.year)), func.coalesce(func.sum(state.total_score), 0))
+        .where(state.province_id == province_id, state.subject == subject)
+    ).one()
+
+    in_scope = (ExamPoint.province_id == province_id, ExamPoint.subject == subject)
+    # 先把范围内考点统计清零，再写入有匹配结果的考点；统计不是考点内容，保留原修改时间
+    updated = connection.execute(
+        update(ExamPoint).where(*in_scope).values(
+            paper_count=0, paper_year_count=0, paper_score_share=0.0, paper_coverage_rate=0,
+            paper_stats_at=started, updated_at=ExamPoint.updated_at,
+        )
+    ).rowcount
+    rows = connection.execute(
+        select(hit.exam_point_id, func.count(), func.count(distinct(hit.year)), func.sum(hit.score))
+        .where(hit.province_id == province_id, hit.subject == subject)
+        .group_by(hit.exam_point_id)
+    ).all()
+    if rows:
+        table = ExamPoint.__table__
+        connection.execute(
+            table.update()
+            .where(table.c.id == bindparam("point_id"), table.c.province_id == province_id, table.c.subject == subject)
+            .values(
+                paper_count=bindparam("papers"),
+                paper_year_count=bindparam("years"),
+                paper_score_share=bindparam("share"),
+                paper_coverage_rate=bindparam("rate"),
+                updated_at=table.c.updated_at,
+            ),
+            [
+                {
+                    "point_id": point_id,
+                    "papers": papers,
+                    "years": years,
+                    "share": round(float(score) / float(score_total) * 100, 2) if score_total else 0.0,
+                    "rate": round(years / year_total * 100) if year_total else 0,
+                }
+                for point_id, papers, years, score in rows
+            ],
+        )
+    return updated
+
+def refresh(connection, full: bool = False, batch_size: int = PAPER_BATCH_SIZE) -> Dict[str, int]:
+    """增量统计考点的试卷考查情况，在调用方的事务中执行，返回处理的试卷数、范围数和考点数
+
+    full=True 时重新匹配全部试卷，用于考点名称批量调整之后。
+    """
+    # 先记录本次统计的时间和最大id，再查找变更，之后写入的记录留给下次统计
+    started = datetime.utcnow()
+    max_question_id, max_point_id = connection.execute(
+        select(select(func.max(ExamQuestion.id)).scalar_subquery(), select(func.max(ExamPoint.id)).scalar_subquery())
+    ).one()
+    marks = {"processed_at": started, "max_question_id": max_question_id, "max_exam_point_id": max_point_id}
+    paper_ids = sorted(changed_paper_ids(connection, full))
+    scopes: Set[Scope] = set()
+    indexes: Dict[Scope, ScopeIndex] = {}
+    for start in range(0, len(paper_ids), batch_size):
+        scopes |= _process_papers(connection, paper_ids[start:start + batch_size], marks, indexes)
+
+    points = sum(_update_scope(connection, scope, started) for scope in sorted(scopes))
+    if points:
+        versioning.bump_versions(connection, ["exam_points"])
+    return {"paper_count": len(paper_ids), "scope_count": len(scopes), "point_count": points}
@@ -0,0 +1,122 @@
+"""
+省份/城市名称解析
+把导入数据中的省份名称、简称或代码解析为ID。一次查询加载全部省份（城市按需加载），
+之后按字典查找；省份/城市表发生变更后自动重新加载。
+"""
+
+import threading
+import unicodedata
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from models import City, Province
+import versioning
+
+# 省份代码，与 init_provinces.sql 一致
+PROVINCE_CODES: Dict[str, str] = {
+    "北京": "BJ", "天津": "TJ", "河北": "HEB", "山西": "SX", "内蒙古": "NMG", "辽宁": "LN",
+    "吉林": "JL", "黑龙江": "HLJ", "上海": "SH", "江苏": "JS", "浙江": "ZJ", "安徽": "AH",
+    "福建": "FJ", "江西": "JX", "山东": "SD", "河南": "HEN", "湖北": "HUB", "湖南": "HUN",
+    "广东": "GD", "广西": "GX", "海南": "HAIN", "重庆": "CQ", "四川": "SC", "贵州": "GZ",
+    "云南": "YN", "西藏": "XZ", "陕西": "SN", "甘肃": "GS", "青海": "QH", "宁夏": "NX",
+    "新疆": "XJ", "香港": "HK", "澳门": "MO", "台湾": "TW",
+}
+
+# 按顺序去掉的行政区划后缀，较长的放在前面
+PROVINCE_SUFFIXES = ("特别行政区", "维吾尔自治区", "壮族自治区", "回族自治区", "自治区", "省", "市")
+CITY_SUFFIXES = ("自治州", "地区", "市", "盟")
+
+def _clean(name) -> str:
+    return unicodedata.normalize("NFKC", str(name)).strip().replace(" ", "")
+
+def _strip_suffix(name: str, suffixes) -> str:
+    for suffix in suffixes:
+        if name.endswith(suffix) and len(name) > len(suffix):
+            return name[:-len(suffix)]
+    return name
+
+def province_key(name) -> str:
+    """省份名称的规范形式：北京市/北京 -> 北京，广西壮族自治区 -> 广西"""
+    return _strip_suffix(_clean(name), PROVINCE_SUFFIXES)
+
+def city_key(name) -> str:
+    return _strip_suffix(_clean(name), CITY_SUFFIXES)
+
+class RegionResolver:
+    """省份/城市名称到ID的内存映射"""
+
+    def __init__(self, provinces, cities=None):
+        """provinces 为 (id, 名称, 代码) 序列，cities 为 (id, 名称, 省份id) 序列"""
+        self.province_ids: Dict[str, int] = {}
+        self.valid_province_ids = set()
+        for province_id, name, code in provinces:
+            key = province_key(name)
+            self.valid_province_ids.add(province_id)
+            self.province_ids[key] = province_id
+            self.province_ids[_clean(name)] = province_id
+            for alias_code in (code, PROVINCE_CODES.get(key)):
+                if alias_code:
+                    self.province_ids.setdefault(alias_code.upper(), province_id)
+        self.city_ids: Optional[Dict[Tuple[int, str], int]] = None
+        if cities is not None:
+            self._load_cities(cities)
+
+    def _load_cities(self, cities):
+        self.city_ids = {}
+        # 不区分省份的查找只保留唯一的城市名
+        self.unique_city_ids: Dict[str, Optional[int]] = {}
+        for city_id, name, province_id in cities:
+            key = city_key(name)
+            self.city_ids[(province_id, key)] = city_id
+            self.unique_city_ids[key] = None if key in self.unique_city_ids else city_id
+
+    def province_id(self, value) -> Optional[int]:
+        """解析省份名称、简称、代码或ID，无法识别时返回None"""
+        if value is None:
+            return None
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value if value in self.valid_province_ids else None
+        text = _clean(value)
+        if not text:
+            return None
+        if text.isdigit():
+            return int(text) if int(text) in self.valid_province_ids else None
+        return (
+            self.province_ids.get(text)
+            or self.province_ids.get(province_key(text))
+            or self.province_ids.get(text.upper())
+        )
+
+    def city_id(self, value, province_id: Optional[int] = None) -> Optional[int]:
+        """解析城市名称，同名城市需要指定省份"""
+        if value is None or self.city_ids is None:
+            return None
+        key = city_key(value)
+        if province_id is not None:
+            return self.city_ids.get((province_id, key))
+        return self.unique_city_ids.get(key)
+
+# (数据库引擎, 是否含城市) -> (版本号, 解析器)
+_cache: Dict[Tuple, Tuple[Tuple, RegionResolver]] = {}
+_cache_lock = threading.Lock()
+
+def get_resolver(db: Session, include_cities: bool = False) -> RegionResolver:
+    """返回缓存的解析器，省份/城市表版本号变化时重新加载"""
+    versions = versioning.get_versions(db, ["provinces", "cities"])
+    version_key = (versions["provinces"], versions["cities"])
+    cache_key = (db.get_bind(), include_cities)
+    with _cache_lock:
+        cached = _cache.get(cache_key)
+        if cached and cached[0] == version_key:
+            return cached[1]
+    provinces = db.query(Province.id, Province.name, Province.code).all()
+    cities = db.query(City.id, City.name, City.province_id).all() if include_cities else None
+    resolver = RegionResolver(provinces, cities)
+    with _cache_lock:
+        _cache[cache_key] = (version_key, resolver)
+    return resolver
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
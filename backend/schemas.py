@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Optional, List, Dict, Union, Any
 from datetime import datetime
 from decimal import Decimal
 
@@ -154,10 +154,125 @@ class ExamPoint(ExamPointBase):
     added_date: datetime
     created_at: datetime
     updated_at: Optional[datetime] = None
+    complexity_score: Optional[float] = None  # 描述复杂度评分(1-10)，写入时计算
+    formula_count: Optional[int] = None
+    keyword_count: Optional[int] = None
+    # 按已录入试卷统计的考查情况，未统计时为空
+    paper_count: Optional[int] = None
+    paper_year_count: Optional[int] = None
+    paper_score_share: Optional[float] = None
+    paper_coverage_rate: Optional[int] = None
+    paper_stats_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
 
+class ExamPointPage(BaseModel):
+    items: List[Union[ExamPoint, Dict[str, Any]]]  # 指定view/fields时为部分字段
+    total: Optional[int] = None  # 游标分页时不计算总数
+    page: int
+    page_size: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class ExamPointSearchHit(ExamPoint):
+    score: float = 0
+
+class FacetCount(BaseModel):
+    value: Union[int, str, None] = None
+    count: int
+
+class ExamPointFacets(BaseModel):
+    total: int
+    facets: Dict[str, List[FacetCount]]
+
+class ExamPointTreeNode(BaseModel):
+    name: Optional[str] = None
+    count: int
+    coverage_rate: float  # 节点下考点的平均覆盖率
+    children: List["ExamPointTreeNode"] = []
+    # 仅根节点返回所在范围
+    province_id: Optional[int] = None
+    subject: Optional[str] = None
+    grade: Optional[str] = None
+
+class ImportJobStatus(BaseModel):
+    id: str
+    status: str  # pending/running/completed/failed
+    file_format: str
+    original_filename: Optional[str] = None
+    mode: str
+    batch_size: int
+    total_rows: Optional[int] = None  # 提交时估算
+    processed_rows: int
+    remaining_rows: Optional[int] = None
+    imported_count: int
+    updated_count: int
+    skipped_count: int
+    failed_count: int
+    batch_count: int
+    rows_per_second: float
+    errors: List[Dict[str, Any]] = []
+    message: Optional[str] = None
+    created_by: str
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class SubjectCoverage(BaseModel):
+    subject: str
+    count: int
+    avg_coverage_rate: float
+    avg_recommended_rate: float
+    avg_complexity: float
+
+class CoverageGap(BaseModel):
+    id: int
+    subject: str
+    level1_point: str
+    level2_point: Optional[str] = None
+    level3_point: Optional[str] = None
+    coverage_rate: float
+    recommended_rate: int  # 按内容复杂度、科目和层级计算的建议覆盖率
+    complexity: float
+
+class CoverageAnalysisReport(BaseModel):
+    total_points: int
+    avg_coverage_rate: float
+    avg_recommended_rate: float
+    avg_complexity: float
+    complexity_distribution: Dict[str, int]  # low(<2)/medium(2-5)/high(>=5)
+    subjects: List[SubjectCoverage]
+    largest_gaps: List[CoverageGap]  # 当前覆盖率与建议覆盖率相差最大的考点
+
+class CoverageRollupGroup(BaseModel):
+    value: Union[int, str, None] = None  # 分组维度的取值，总体统计为空
+    province_name: Optional[str] = None  # 按省份分组时的省份名称
+    count: int
+    avg_coverage_rate: float
+    distribution: List[int]  # 覆盖率按10%分段的考点数，最后一段含100%
+
+class CoverageRollup(BaseModel):
+    group_by: Optional[str] = None
+    total: CoverageRollupGroup
+    items: List[CoverageRollupGroup]
+
+class DashboardSubject(BaseModel):
+    subject: str
+    exam_point_count: int  # 有效考点数
+    exam_paper_count: int  # 有效试卷数
+
+class DashboardSummary(BaseModel):
+    exam_point_count: int
+    active_exam_point_count: int
+    exam_paper_count: int
+    exam_question_count: int
+    user_count: int
+    pending_user_count: int  # 待审核用户数
+    subject_count: int
+    top_subjects: List[DashboardSubject]
+    generated_at: datetime
+
 class ExamPointImport(BaseModel):
     exam_points: List[ExamPointCreate]
 
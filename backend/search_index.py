@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+考点文本n-gram倒排索引
+为一级/二级/三级考点和考点描述建立二元组索引，替代 LIKE '%x%' 全表扫描
+"""
+
+import re
+import sys
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from models import ExamPoint, ExamPointNgram
+
+# 字段编号 -> 字段名
+INDEXED_FIELDS: Dict[int, str] = {
+    1: "level1_point",
+    2: "level2_point",
+    3: "level3_point",
+    4: "description",
+}
+FIELD_CODES: Dict[str, int] = {name: code for code, name in INDEXED_FIELDS.items()}
+
+# 排序权重：考点名称命中比描述命中更重要
+FIELD_WEIGHTS: Dict[int, int] = {1: 3, 2: 3, 3: 3, 4: 1}
+
+# 文本末尾的哨兵字符，保证每个字符都是某个二元组的首字符，单字查询可走前缀匹配
+END_MARK = "\x1f"
+MAX_TF = 32767
+INSERT_BATCH_SIZE = 5000
+
+_IGNORED_CHARS = re.compile(r"[\s\x00-\x1f\x7f]+")
+
+def normalize_text(text: Optional[str]) -> str:
+    """统一全角半角和大小写，去掉空白和控制字符"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _IGNORED_CHARS.sub("", text)
+
+def extract_ngrams(text: Optional[str]) -> Counter:
+    """提取文本的二元组及出现次数"""
+    normalized = normalize_text(text)
+    if not normalized:
+        return Counter()
+    padded = normalized + END_MARK
+    return Counter(padded[i:i + 2] for i in range(len(padded) - 1))
+
+def query_ngrams(text: str) -> List[str]:
+    """提取查询词的二元组（去重），单字查询返回该字本身"""
+    normalized = normalize_text(text)
+    if len(normalized) <= 1:
+        return [normalized] if normalized else []
+    return sorted({normalized[i:i + 2] for i in range(len(normalized) - 1)})
+
+def _gram_condition(grams: List[str]):
+    """构造词项匹配条件，单字查询按前缀匹配二元组"""
+    if len(grams) == 1 and len(grams[0]) == 1:
+        return ExamPointNgram.gram.startswith(grams[0], autoescape=True)
+    return ExamPointNgram.gram.in_(grams)
+
+def _required_matches(grams: List[str]) -> int:
+    return 1 if len(grams) == 1 and len(grams[0]) == 1 else len(grams)
+
+def build_rows(exam_point: ExamPoint) -> List[dict]:
+    """生成一个考点的索引行"""
+    rows = []
+    for code, field_name in INDEXED_FIELDS.items():
+        for gram, tf in extract_ngrams(getattr(exam_point, field_name)).items():
+            rows.append({
+                "gram": gram,
+                "field": code,
+                "exam_point_id": exam_point.id,
+                "tf": min(tf, MAX_TF),
+            })
+    return rows
+
+def index_exam_points(db: Session, exam_points: Iterable[ExamPoint], replace: bool = True):
+    """（重新）索引一批考点，考点需已flush获得id，由调用方提交事务
+
+    新插入的考点没有旧索引，可传 replace=False 跳过删除。
+    """
+    exam_points = list(exam_points)
+    if not exam_points:
+        return
+    if replace:
+        remove_exam_points(db, [point.id for point in exam_points])
+    rows = []
+    for exam_point in exam_points:
+        rows.extend(build_rows(exam_point))
+        if len(rows) >= INSERT_BATCH_SIZE:
+            db.execute(insert(ExamPointNgram), rows)
+            rows = []
+    if rows:
+        db.execute(insert(ExamPointNgram), rows)
+
+def index_exam_point(db: Session, exam_point: ExamPoint):
+    """（重新）索引单个考点"""
+    index_exam_points(db, [exam_point])
+
+def remove_exam_points(db: Session, exam_point_ids: List[int]):
+    """删除考点的索引行"""
+    if exam_point_ids:
+        db.execute(delete(ExamPointNgram).where(ExamPointNgram.exam_point_id.in_(exam_point_ids)))
+
+def matching_ids(text: str, field_name: Optional[str] = None):
+    """返回包含查询词全部二元组的考点id子查询，用于替代 LIKE '%x%' 的候选过滤
+
+    结果是候选集，调用方仍需用原始条件校验是否连续出现。
+    查询词为空时返回None。
+    """
+    grams = query_ngrams(text)
+    if not grams:
+        return None
+    stmt = select(ExamPointNgram.exam_point_id).where(_gram_condition(grams))
+    if field_name:
+        stmt = stmt.where(ExamPointNgram.field == FIELD_CODES[field_name])
+    return (
+        stmt.group_by(ExamPointNgram.exam_point_id)
+        .having(func.count(func.distinct(ExamPointNgram.gram)) >= _required_matches(grams))
+    )
+
+def search_exam_points(
+    db: Session,
+    text: str,
+    base_query,
+    fields: Optional[List[str]] = None,
+    limit: int = 20,
+) -> List[Tuple[ExamPoint, float]]:
+    """按n-gram命中情况对考点打分排序，返回 [(考点, 得分)]
+
+    base_query 是已附加结构化筛选条件的 ExamPoint 查询。
+    """
+    grams = query_ngrams(text)
+    if not grams:
+        return []
+    codes = [FIELD_CODES[name] for name in (fields or INDEXED_FIELDS.values())]
+    weight = case(FIELD_WEIGHTS, value=ExamPointNgram.field, else_=1)
+    score = func.sum(ExamPointNgram.tf * weight).label("score")
+
+    candidates = (
+        select(ExamPointNgram.exam_point_id, score)
+        .where(_gram_condition(grams), ExamPointNgram.field.in_(codes))
+        .group_by(ExamPointNgram.exam_point_id)
+        .having(func.count(func.distinct(ExamPointNgram.gram)) >= _required_matches(grams))
+        .subquery()
+    )
+    ranked = (
+        base_query.join(candidates, candidates.c.exam_point_id == ExamPoint.id)
+        .add_columns(candidates.c.score)
+        .order_by(candidates.c.score.desc(), ExamPoint.id)
+    )
+
+    # 二元组全部命中不代表连续出现，按原文校验并给完整短语命中加分。
+    # 候选按得分分页读取，每页翻倍，直到凑满 limit 条短语命中且后续候选加分后也无法超过第 limit 条，
+    # 或候选读完为止
+    needle = normalize_text(text)
+    max_bonus = sum(FIELD_WEIGHTS[code] for code in codes) * 10
+    results = []
+    offset, page_size = 0, limit * 2
+    while True:
+        rows = ranked.offset(offset).limit(page_size).all()
+        for exam_point, raw_score in rows:
+            phrase_hits = sum(
+                FIELD_WEIGHTS[code] for code in codes
+                if needle in normalize_text(getattr(exam_point, INDEXED_FIELDS[code]))
+            )
+            if phrase_hits:
+                results.append((exam_point, float(raw_score) + phrase_hits * 10))
+        if len(rows) < page_size:
+            break
+        results.sort(key=lambda item: (-item[1], item[0].id))
+        if len(results) >= limit and float(rows[-1][1]) + max_bonus < results[limit - 1][1]:
+            break
+        offset += page_size
+        page_size *= 2
+    results.sort(key=lambda item: (-item[1], item[0].id))
+    return results[:limit]
+
+def rebuild_index(db: Session, batch_size: int = 1000) -> int:
+    """全量重建索引，返回索引的考点数量"""
+    db.execute(delete(ExamPointNgram))
+    db.commit()
+    total = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(ExamPoint)
+            .filter(ExamPoint.id > last_id)
+            .order_by(ExamPoint.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        rows = []
+        for exam_point in batch:
+            rows.extend(build_rows(exam_point))
+        if rows:
+            db.execute(insert(ExamPointNgram), rows)
+        db.commit()
+        db.expunge_all()
+        total += len(batch)
+        last_id = batch[-1].id
+        print(f"📝 已索引 {total} 条考点")
+    return total
+
+if __name__ == "__main__":
+    from database import SessionLocal, engine, Base
+
+    Base.metadata.create_all(bind=engine)
+    print("🚀 开始重建考点搜索索引...")
+    session = SessionLocal()
+    try:
+        count = rebuild_index(session)
+        print(f"🎉 索引重建完成，共 {count} 条考点")
+    except Exception as e:
+        session.rollback()
+        print(f"💥 索引重建失败: {e}")
+        sys.exit(1)
+    finally:
+        session.close()
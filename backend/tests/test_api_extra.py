@@ -1,10 +1,15 @@
 import pytest
+from types import SimpleNamespace
 from fastapi.testclient import TestClient
 from main import app
+from sqlalchemy import select
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 import models
+import coverage_rollup
+import versioning
+from exam_point_tree import tree_entry
 from database import Base, get_db
 from auth import get_password_hash
 
@@ -21,6 +26,11 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 # 创建测试数据库表
 Base.metadata.create_all(bind=engine)
 
+# 考点导入会校验省份是否存在
+with TestingSessionLocal() as _db:
+    _db.add(models.Province(id=1, name="北京", code="BJ"))
+    _db.commit()
+
 def override_get_db():
     try:
         db = TestingSessionLocal()
@@ -262,4 +272,857 @@ def test_exam_questions_crud():
         assert upr.status_code == 200
         # 删
         delr = client.delete(f"/exam-questions/{qid}", headers=auth_headers())
-        assert delr.status_code == 200 
\ No newline at end of file
+        assert delr.status_code == 200 
+def make_exam_point(**overrides):
+    """构造完整的考点数据"""
+    data = {
+        "province_id": 1,
+        "subject": "数学",
+        "grade": "高三",
+        "semester": "上学期",
+        "level1_point": "函数",
+        "level2_point": "初等函数",
+        "level3_point": "指数函数",
+        "description": "指数函数的图像与性质",
+        "coverage_rate": 0.8,
+        "added_by": "admin",
+        "is_active": True
+    }
+    data.update(overrides)
+    return data
+
+def test_exam_points_pagination():
+    """测试考点列表服务端分页"""
+    headers = auth_headers()
+    points = [make_exam_point(subject="分页测试", level3_point=f"考点{i}") for i in range(5)]
+    resp = client.post("/exam-points/import", json={"exam_points": points}, headers=headers)
+    assert resp.status_code == 200
+
+    resp = client.get("/exam-points", params={"subject": "分页测试", "page": 2, "page_size": 2}, headers=headers)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["total"] == 5
+    assert body["page"] == 2
+    assert body["pages"] == 3
+    assert [item["level3_point"] for item in body["items"]] == ["考点2", "考点3"]
+
+    resp = client.get("/exam-points", params={"page_size": 1000}, headers=headers)
+    assert resp.status_code == 422
+
+def test_exam_points_cursor_pagination():
+    """测试考点列表游标分页"""
+    headers = auth_headers()
+    points = [make_exam_point(subject="游标测试", level3_point=f"考点{i}", coverage_rate=i / 10) for i in range(5)]
+    resp = client.post("/exam-points/import", json={"exam_points": points}, headers=headers)
+    assert resp.status_code == 200
+
+    params = {"subject": "游标测试", "page_size": 2, "sort_by": "coverage_rate", "order": "desc"}
+    seen = []
+    cursor = None
+    while True:
+        resp = client.get("/exam-points", params={**params, "cursor": cursor} if cursor else params, headers=headers)
+        assert resp.status_code == 200
+        body = resp.json()
+        seen.extend(item["level3_point"] for item in body["items"])
+        cursor = body["next_cursor"]
+        assert resp.headers.get("X-Next-Cursor") == cursor
+        if not cursor:
+            break
+        assert body["total"] is None or body["total"] == 5
+    assert seen == [f"考点{i}" for i in range(4, -1, -1)]
+
+    resp = client.get("/exam-points", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert resp.status_code == 400
+
+def test_users_cursor_pagination():
+    """测试用户列表游标分页"""
+    headers = auth_headers()
+    resp = client.get("/users", params={"limit": 1}, headers=headers)
+    assert resp.status_code == 200
+    assert len(resp.json()) <= 1
+    cursor = resp.headers.get("X-Next-Cursor")
+    if cursor:
+        resp2 = client.get("/users", params={"limit": 1, "cursor": cursor}, headers=headers)
+        assert resp2.status_code == 200
+        assert resp2.json()[0]["id"] > resp.json()[0]["id"]
+
+def test_exam_points_ngram_search():
+    """测试考点n-gram索引搜索与文本筛选"""
+    headers = auth_headers()
+    points = [
+        make_exam_point(subject="搜索测试", level1_point="集合与函数", level3_point="对数函数", description="对数函数的单调性"),
+        make_exam_point(subject="搜索测试", level1_point="数列", level3_point="等差数列", description="等差数列求和"),
+        make_exam_point(subject="搜索测试", level1_point="函数", level3_point="数函混排", description="无关描述"),
+    ]
+    resp = client.post("/exam-points/import", json={"exam_points": points}, headers=headers)
+    assert resp.status_code == 200
+
+    resp = client.get("/exam-points/search", params={"q": "对数函数", "subject": "搜索测试"}, headers=headers)
+    assert resp.status_code == 200
+    hits = resp.json()
+    assert [hit["level3_point"] for hit in hits] == ["对数函数"]
+    assert hits[0]["score"] > 0
+
+    resp = client.get("/exam-points", params={"subject": "搜索测试", "level1_point": "函数"}, headers=headers)
+    assert {item["level1_point"] for item in resp.json()["items"]} == {"集合与函数", "函数"}
+
+    resp = client.get("/exam-points", params={"subject": "搜索测试", "description": "和"}, headers=headers)
+    assert [item["level3_point"] for item in resp.json()["items"]] == ["等差数列"]
+
+    # 修改后索引同步更新
+    eid = hits[0]["id"]
+    resp = client.put(f"/exam-points/{eid}", json={"level3_point": "指数函数"}, headers=headers)
+    assert resp.status_code == 200
+    resp = client.get("/exam-points/search", params={"q": "对数函数", "fields": "level3_point", "subject": "搜索测试"}, headers=headers)
+    assert resp.json() == []
+    resp = client.delete(f"/exam-points/{eid}", headers=headers)
+    assert resp.status_code == 200
+    resp = client.get("/exam-points/search", params={"q": "指数函数", "subject": "搜索测试"}, headers=headers)
+    assert resp.json() == []
+
+def test_exam_points_search_skips_non_phrase_candidates():
+    """测试二元组全部命中但不连续的候选得分更高、数量超过 limit*2 时，仍能找到短语命中的考点"""
+    headers = auth_headers()
+    # 干扰项包含“函数”“数图”“图像”但不包含“函数图像”，二元组得分更高
+    decoys = [
+        make_exam_point(subject="短语搜索", level3_point=f"函数数图图像{i}", description="函数数图图像函数数图图像")
+        for i in range(8)
+    ]
+    target = make_exam_point(subject="短语搜索", level3_point="性质", description="函数图像")
+    resp = client.post("/exam-points/import", json={"exam_points": decoys + [target]}, headers=headers)
+    assert resp.status_code == 200
+
+    resp = client.get("/exam-points/search", params={"q": "函数图像", "subject": "短语搜索", "limit": 1}, headers=headers)
+    assert [hit["description"] for hit in resp.json()] == ["函数图像"]
+
+def test_exam_point_facets():
+    """测试考点分面计数"""
+    headers = auth_headers()
+    points = [
+        make_exam_point(subject="分面测试", grade="高一", level1_point="函数"),
+        make_exam_point(subject="分面测试", grade="高一", level1_point="数列"),
+        make_exam_point(subject="分面测试", grade="高二", level1_point="函数"),
+    ]
+    resp = client.post("/exam-points/import", json={"exam_points": points}, headers=headers)
+    assert resp.status_code == 200
+
+    resp = client.get("/exam-points/facets", params={"subject": "分面测试"}, headers=headers)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["total"] == 3
+    assert body["facets"]["grade"] == [{"value": "高一", "count": 2}, {"value": "高二", "count": 1}]
+    assert body["facets"]["province_id"] == [{"value": 1, "count": 3}]
+    assert {f["value"]: f["count"] for f in body["facets"]["level1_point"]} == {"函数": 2, "数列": 1}
+
+def test_exam_points_projection():
+    """测试考点列表精简视图和字段投影"""
+    headers = auth_headers()
+    points = [make_exam_point(subject="投影测试", description="很长的描述" * 50)]
+    resp = client.post("/exam-points/import", json={"exam_points": points}, headers=headers)
+    assert resp.status_code == 200
+
+    resp = client.get("/exam-points", params={"subject": "投影测试"}, headers=headers)
+    assert "description" in resp.json()["items"][0]
+
+    resp = client.get("/exam-points", params={"subject": "投影测试", "view": "summary"}, headers=headers)
+    item = resp.json()["items"][0]
+    assert "description" not in item
+    assert item["level1_point"] == "函数"
+
+    resp = client.get("/exam-points", params={"subject": "投影测试", "fields": "level3_point,coverage_rate"}, headers=headers)
+    assert set(resp.json()["items"][0]) == {"id", "level3_point", "coverage_rate"}
+
+    resp = client.get("/exam-points", params={"fields": "password"}, headers=headers)
+    assert resp.status_code == 400
+
+    resp = client.get("/exam-questions", params={"view": "summary"}, headers=headers)
+    assert resp.status_code == 200
+    for question in resp.json():
+        assert "question_content" not in question
+
+def test_exam_points_cache_invalidation():
+    """测试考点查询缓存命中与写操作失效"""
+    headers = auth_headers()
+    params = {"subject": "缓存测试"}
+    first = client.get("/exam-points", params=params, headers=headers)
+    assert first.json()["total"] == 0
+    hits_before = client.get("/cache/stats", headers=headers).json()["caches"][0]["hits"]
+    second = client.get("/exam-points", params=params, headers=headers)
+    assert second.content == first.content
+    assert client.get("/cache/stats", headers=headers).json()["caches"][0]["hits"] == hits_before + 1
+
+    resp = client.post("/exam-points", json=make_exam_point(subject="缓存测试"), headers=headers)
+    assert resp.status_code == 200
+    eid = resp.json()["id"]
+    assert client.get("/exam-points", params=params, headers=headers).json()["total"] == 1
+
+    assert client.get(f"/exam-points/{eid}", headers=headers).json()["level3_point"] == "指数函数"
+    client.put(f"/exam-points/{eid}", json={"level3_point": "对数函数"}, headers=headers)
+    assert client.get(f"/exam-points/{eid}", headers=headers).json()["level3_point"] == "对数函数"
+
+    # 其他进程（导入脚本等）直接写库并递增版本号后，缓存不再命中旧结果
+    with TestingSessionLocal() as other:
+        other.execute(
+            models.ExamPoint.__table__.update()
+            .where(models.ExamPoint.id == eid)
+            .values(level3_point="幂函数")
+        )
+        versioning.bump_versions(other.connection(), ["exam_points"])
+        other.commit()
+    assert client.get(f"/exam-points/{eid}", headers=headers).json()["level3_point"] == "幂函数"
+    assert client.get("/exam-points", params=params, headers=headers).json()["items"][0]["level3_point"] == "幂函数"
+    client.delete(f"/exam-points/{eid}", headers=headers)
+    assert client.get(f"/exam-points/{eid}", headers=headers).status_code == 404
+
+def test_etag_conditional_requests():
+    """测试目录类接口的ETag与304响应"""
+    headers = auth_headers()
+    resp = client.get("/provinces", headers=headers)
+    etag = resp.headers["ETag"]
+    resp = client.get("/provinces", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+
+    params = {"subject": "ETag测试"}
+    resp = client.get("/exam-points", params=params, headers=headers)
+    etag = resp.headers["ETag"]
+    assert client.get("/exam-points", params=params, headers={**headers, "If-None-Match": etag}).status_code == 304
+    # 不同查询参数对应不同的ETag
+    other = client.get("/exam-points", params={"subject": "其他"}, headers=headers)
+    assert other.headers["ETag"] != etag
+
+    client.post("/exam-points", json=make_exam_point(subject="ETag测试"), headers=headers)
+    resp = client.get("/exam-points", params=params, headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()["total"] == 1
+    assert resp.headers["ETag"] != etag
+
+    resp = client.get("/exam-papers", headers=headers)
+    assert client.get("/exam-papers", headers={**headers, "If-None-Match": resp.headers["ETag"]}).status_code == 304
+
+def test_etag_and_cache_follow_external_writes():
+    """测试其他会话写入考点并递增版本号后，列表返回新内容和新ETag，且新ETag与内容一致"""
+    headers = auth_headers()
+    params = {"subject": "外部写入测试"}
+    eid = client.post("/exam-points", json=make_exam_point(subject="外部写入测试"), headers=headers).json()["id"]
+    first = client.get("/exam-points", params=params, headers=headers)
+    etag = first.headers["ETag"]
+    # 再请求一次，响应体进入缓存
+    assert client.get("/exam-points", params=params, headers=headers).content == first.content
+
+    with TestingSessionLocal() as other:
+        other.execute(
+            models.ExamPoint.__table__.update()
+            .where(models.ExamPoint.id == eid)
+            .values(description="外部进程修改")
+        )
+        versioning.bump_versions(other.connection(), ["exam_points"])
+        other.commit()
+
+    resp = client.get("/exam-points", params=params, headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+    assert resp.content != first.content
+    assert resp.json()["items"][0]["description"] == "外部进程修改"
+    again = client.get("/exam-points", params=params, headers={**headers, "If-None-Match": resp.headers["ETag"]})
+    assert again.status_code == 304
+
+def test_deleted_user_excluded_from_auth_and_listing():
+    """测试软删除用户不能再通过认证，也不出现在用户列表中"""
+    user_data = {"username": "soft_deleted_user", "email": "soft_deleted@test.com", "password": "testpass123"}
+    reg = client.post("/auth/register", json=user_data)
+    assert reg.status_code == 200
+    user_id = reg.json()["id"]
+    login = client.post("/auth/login", data={"username": "soft_deleted_user", "password": "testpass123"})
+    user_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert client.get("/users/me", headers=user_headers).status_code == 200
+
+    headers = auth_headers()
+    assert client.delete(f"/users/{user_id}", headers=headers).status_code == 200
+    assert client.get("/users/me", headers=user_headers).status_code == 401
+    assert user_id not in [user["id"] for user in client.get("/users", params={"limit": 1000}, headers=headers).json()]
+
+def test_exam_point_tree_incremental():
+    """测试考点层级树及其增量更新"""
+    headers = auth_headers()
+    points = [
+        make_exam_point(subject="层级测试", level1_point="函数", level2_point="初等函数", level3_point="指数函数", coverage_rate=0.8),
+        make_exam_point(subject="层级测试", level1_point="函数", level2_point="初等函数", level3_point="对数函数", coverage_rate=0.6),
+    ]
+    resp = client.post("/exam-points/import", json={"exam_points": points}, headers=headers)
+    assert resp.status_code == 200
+
+    tree = client.get("/exam-points/tree", params={"subject": "层级测试"}, headers=headers).json()
+    assert tree["count"] == 2
+    assert tree["coverage_rate"] == 70
+    level2 = tree["children"][0]["children"][0]
+    assert [node["name"] for node in level2["children"]] == ["对数函数", "指数函数"]
+
+    resp = client.post("/exam-points", json=make_exam_point(subject="层级测试", level1_point="数列", coverage_rate=40), headers=headers)
+    new_id = resp.json()["id"]
+    tree = client.get("/exam-points/tree", params={"subject": "层级测试"}, headers=headers).json()
+    assert tree["count"] == 3
+    assert [node["name"] for node in tree["children"]] == ["函数", "数列"]
+
+    client.put(f"/exam-points/{new_id}", json={"level1_point": "函数"}, headers=headers)
+    tree = client.get("/exam-points/tree", params={"subject": "层级测试"}, headers=headers).json()
+    assert [node["name"] for node in tree["children"]] == ["函数"]
+    assert tree["children"][0]["count"] == 3
+
+    client.delete(f"/exam-points/{new_id}", headers=headers)
+    tree = client.get("/exam-points/tree", params={"subject": "层级测试"}, headers=headers).json()
+    assert tree["count"] == 2
+    assert tree["coverage_rate"] == 70
+
+    # 增量更新后范围版本与数据库一致，无需重新构建
+    from main import exam_point_tree
+    with TestingSessionLocal() as other:
+        version = versioning.get_versions(other, ["exam_points"])["exam_points"]
+    assert exam_point_tree._scopes[(None, "层级测试", None)].version == version
+
+    # 范围在提交之后、增量通知之前构建时，已包含该变更，不会重复计入
+    entry = tree_entry(SimpleNamespace(**{**make_exam_point(subject="层级测试", level1_point="数列"), "coverage_rate": 40}))
+    with TestingSessionLocal() as other:
+        other.add(models.ExamPoint(**{**make_exam_point(subject="层级测试", level1_point="数列"), "coverage_rate": 40}))
+        other.flush()
+        version = versioning.get_versions(other, ["exam_points"])["exam_points"]
+        other.commit()
+    assert client.get("/exam-points/tree", params={"subject": "层级测试"}, headers=headers).json()["count"] == 3
+    exam_point_tree.apply(version, added=[entry])
+    assert client.get("/exam-points/tree", params={"subject": "层级测试"}, headers=headers).json()["count"] == 3
+
+    # 其他进程写入后范围版本落后，重新构建
+    with TestingSessionLocal() as other:
+        for point in other.query(models.ExamPoint).filter(models.ExamPoint.subject == "层级测试", models.ExamPoint.level1_point == "数列"):
+            other.delete(point)
+        other.commit()
+    assert client.get("/exam-points/tree", params={"subject": "层级测试"}, headers=headers).json()["count"] == 2
+
+def test_exam_points_bulk_import_batches():
+    """测试考点批量导入按批次写入并报告失败行"""
+    headers = auth_headers()
+    points = [make_exam_point(subject="批量导入", level3_point=f"批量考点{i}") for i in range(5)]
+    points[2]["province_id"] = 9999
+    resp = client.post("/exam-points/import", params={"batch_size": 2}, json={"exam_points": points}, headers=headers)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["imported_count"] == 4
+    assert body["failed_count"] == 1
+    assert body["batch_count"] == 2
+    assert body["errors"][0]["row"] == 3
+
+    # 批量写入的考点同样进入搜索索引和层级树
+    resp = client.get("/exam-points/search", params={"q": "批量考点4"}, headers=headers)
+    assert [hit["level3_point"] for hit in resp.json()][0] == "批量考点4"
+    tree = client.get("/exam-points/tree", params={"subject": "批量导入"}, headers=headers).json()
+    assert tree["count"] == 4
+
+def test_insert_rows_without_consecutive_ids(monkeypatch):
+    """测试不支持RETURNING且无法确认自增id连续时逐行插入，返回的id与输入顺序一致"""
+    import bulk_import
+
+    monkeypatch.setattr(engine.dialect, "insert_executemany_returning_sort_by_parameter_order", False)
+    values = [bulk_import.parse_exam_point(make_exam_point(subject="逐行插入", level3_point=f"逐行{i}")) for i in range(3)]
+    with TestingSessionLocal() as db:
+        assert bulk_import.consecutive_autoinc(db) is False
+        ids = bulk_import.insert_rows(db, models.ExamPoint, [bulk_import.add_hashes(row) for row in values])
+        names = {point.id: point.level3_point for point in db.query(models.ExamPoint).filter(models.ExamPoint.id.in_(ids))}
+        # 直接插入不维护汇总表，回滚以免影响其他测试
+        db.rollback()
+    assert [names[point_id] for point_id in ids] == ["逐行0", "逐行1", "逐行2"]
+
+def test_import_chunk_write_failure_not_checkpointed(monkeypatch):
+    """测试命令行导入中数据库写入失败的批次抛出异常，不会被记为已完成"""
+    from concurrent.futures import Future
+    from sqlalchemy.exc import OperationalError
+    import bulk_import
+    import import_from_json
+
+    def fail_insert(db, rows):
+        raise OperationalError("INSERT", {}, Exception("connection lost"))
+
+    monkeypatch.setattr(import_from_json, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(bulk_import, "insert_exam_points", fail_insert)
+    values = bulk_import.parse_exam_point(make_exam_point(subject="写入失败", level3_point="写入失败考点"))
+    validated = Future()
+    validated.set_result(([[(1, values)]], []))
+    with pytest.raises(RuntimeError, match="写入失败"):
+        import_from_json.write_part(validated, 0, "append")
+
+def test_import_validate_chunk_partitions_by_natural_key(monkeypatch):
+    """测试命令行导入按自然键拆分每批记录，同一考点总分到同一写入线程"""
+    import import_from_json
+    from region_resolver import RegionResolver
+
+    monkeypatch.setattr(import_from_json, "_resolver", RegionResolver([(1, "北京", "BJ")]))
+    records = [make_exam_point(subject="分区导入", level3_point=f"分区{i % 5}") for i in range(20)]
+    chunk = list(enumerate(records + ["not a dict"], start=1))
+    parts, errors = import_from_json.validate_chunk(chunk, 3)
+    assert errors == [(21, "记录必须是JSON对象")]
+    assert sum(len(part) for part in parts) == 20
+    owners = {}
+    for part, rows in enumerate(parts):
+        for _, values in rows:
+            assert owners.setdefault(values["natural_key_hash"], part) == part
+    assert len(owners) == 5
+
+def test_import_json_record_size_limit(tmp_path, monkeypatch):
+    """测试未闭合的JSON对象超过单条记录上限时立即报错，不读到文件末尾"""
+    import import_from_json
+
+    monkeypatch.setattr(import_from_json, "READ_SIZE", 16)
+    monkeypatch.setattr(import_from_json, "MAX_JSON_RECORD_CHARS", 64)
+    path = tmp_path / "broken.json"
+    path.write_text('[{"subject": "完整"}, {"subject": "' + "x" * 1000, encoding="utf-8")
+    records = import_from_json.iter_json_records(str(path))
+    assert next(records) == {"subject": "完整"}
+    with pytest.raises(ValueError, match="第 2 条记录超过 64 个字符"):
+        next(records)
+
+def test_exam_points_stream_import():
+    """测试NDJSON和CSV流式导入"""
+    import json
+    headers = auth_headers()
+    lines = [json.dumps(make_exam_point(subject="流式导入", level3_point=f"流式{i}"), ensure_ascii=False) for i in range(3)]
+    lines.insert(1, "{broken")
+    body = "\n".join(lines).encode("utf-8")
+    resp = client.post(
+        "/exam-points/import/stream", params={"batch_size": 2}, content=body,
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200
+    result = resp.json()
+    assert result["received_count"] == 4
+    assert result["imported_count"] == 3
+    assert result["errors"][0]["row"] == 2
+
+    csv_body = (
+        "\ufeffprovince_id,subject,grade,semester,level1_point,level3_point,description,coverage_rate\r\n"
+        '1,流式导入,高二,下学期,数列,等差数列,"多行\r\n描述",0.5\r\n'
+        "1,流式导入,高二,下学期,数列,,,0.5\r\n"
+    ).encode("utf-8")
+    resp = client.post(
+        "/exam-points/import/stream", content=csv_body,
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+    result = resp.json()
+    assert result["imported_count"] == 1
+    assert result["errors"][0]["error"].startswith("description")
+
+    resp = client.get("/exam-points", params={"subject": "流式导入", "grade": "高二"}, headers=headers)
+    item = resp.json()["items"][0]
+    assert item["description"] == "多行\n描述"
+    assert item["added_by"] == "admin"
+
+def test_exam_points_stream_import_unclosed_quote(monkeypatch):
+    """测试CSV引号未闭合时待拼接的记录超过上限后报告该行错误并停止解析"""
+    import bulk_import
+    monkeypatch.setattr(bulk_import, "MAX_CSV_RECORD_CHARS", 200)
+    headers = auth_headers()
+    csv_body = (
+        "province_id,subject,grade,semester,level1_point,level3_point,description,coverage_rate\n"
+        "1,引号未闭合,高二,下学期,数列,正常,描述,0.5\n"
+        '1,引号未闭合,高二,下学期,数列,未闭合,"描述,0.5\n'
+        + "1,引号未闭合,高二,下学期,数列,后续,描述,0.5\n" * 20
+    ).encode("utf-8")
+    resp = client.post(
+        "/exam-points/import/stream", content=csv_body,
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+    result = resp.json()
+    assert result["imported_count"] == 1
+    assert result["failed_count"] == 1
+    assert result["errors"][0]["row"] == 2
+    assert "未闭合的引号" in result["errors"][0]["error"]
+
+def test_exam_points_upload_excel():
+    """测试服务端解析Excel导入考点"""
+    import io
+    from openpyxl import Workbook
+    headers = auth_headers()
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["省份", "科目", "年级", "学期", "一级考点", "二级考点", "三级考点", "考点描述", "历年高考覆盖率", "有效状态"])
+    sheet.append(["北京", "表格导入", "高三", "上学期", "函数", "初等函数", 1, "求 frac{1}{2}", 85.5, "是"])
+    sheet.append(["火星", "表格导入", "高三", "上学期", "函数", None, None, "省份错误", 50, "否"])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    files = {"file": ("考点.xlsx", buffer.getvalue(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+    resp = client.post("/exam-points/upload-excel", files=files, headers=headers)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["imported_count"] == 1
+    assert body["errors"] == [{"row": 3, "error": "省份不存在: 火星"}]
+
+    item = client.get("/exam-points", params={"subject": "表格导入"}, headers=headers).json()["items"][0]
+    assert item["level3_point"] == "1"
+    assert item["coverage_rate"] == 85
+    assert item["description"] == "$求 \\frac{1}{2}$"
+
+    files = {"file": ("考点.xlsx", b"not an excel file", "application/octet-stream")}
+    resp = client.post("/exam-points/upload-excel", files=files, headers=headers)
+    assert resp.status_code == 400
+
+def test_exam_points_upsert_import():
+    """测试按自然键增量导入：未变化跳过、变化更新、新考点插入"""
+    headers = auth_headers()
+    points = [make_exam_point(subject="增量导入", level3_point=f"增量{i}") for i in range(3)]
+    resp = client.post("/exam-points/import", params={"mode": "upsert"}, json={"exam_points": points}, headers=headers)
+    assert resp.json()["imported_count"] == 3
+
+    points[1]["description"] = "修改后的描述"
+    points.append(make_exam_point(subject="增量导入", level3_point="增量3"))
+    resp = client.post("/exam-points/import", params={"mode": "upsert"}, json={"exam_points": points}, headers=headers)
+    body = resp.json()
+    assert (body["imported_count"], body["updated_count"], body["skipped_count"]) == (2, 1, 2)
+
+    items = client.get("/exam-points", params={"subject": "增量导入", "page_size": 100}, headers=headers).json()["items"]
+    assert len(items) == 4
+    assert {item["level3_point"]: item["description"] for item in items}["增量1"] == "修改后的描述"
+
+    # 通过接口修改后同步更新内容哈希，再次导入原内容会被识别为变化
+    target = next(item for item in items if item["level3_point"] == "增量0")
+    client.put(f"/exam-points/{target['id']}", json={"description": "界面修改"}, headers=headers)
+    resp = client.post("/exam-points/import", params={"mode": "upsert"}, json={"exam_points": points}, headers=headers)
+    assert resp.json()["updated_count"] == 1
+
+def test_import_jobs_run_and_resume(tmp_path, monkeypatch):
+    """测试后台导入任务的执行进度和中断后继续"""
+    import json
+    from datetime import datetime, timedelta
+    import main
+    from config import settings
+    monkeypatch.setattr(settings, "IMPORT_JOB_DIR", str(tmp_path))
+    monkeypatch.setattr(main.import_job_runner, "session_factory", TestingSessionLocal)
+    headers = auth_headers()
+
+    lines = [json.dumps(make_exam_point(subject="后台导入", level3_point=f"后台{i}"), ensure_ascii=False) for i in range(5)]
+    lines[3] = "{broken"
+    files = {"file": ("考点.ndjson", "\n".join(lines).encode("utf-8"), "application/x-ndjson")}
+    resp = client.post("/exam-points/import-jobs", params={"batch_size": 2}, files=files, headers=headers)
+    assert resp.status_code == 202
+    job = resp.json()
+    assert (job["status"], job["total_rows"], job["remaining_rows"]) == ("pending", 5, 5)
+
+    assert main.import_job_runner.run_pending() == 1
+    job = client.get(f"/exam-points/import-jobs/{job['id']}", headers=headers).json()
+    assert job["status"] == "completed"
+    assert (job["processed_rows"], job["imported_count"], job["failed_count"], job["remaining_rows"]) == (5, 4, 1, 0)
+    assert job["errors"][0]["row"] == 4
+
+    # 模拟运行中断：已提交前2条的任务在心跳超时后被重新认领，从第3条继续
+    points = [make_exam_point(subject="后台续传", level3_point=f"续传{i}") for i in range(4)]
+    resp = client.post("/exam-points/import", params={"background": True, "batch_size": 2}, json={"exam_points": points}, headers=headers)
+    assert resp.status_code == 202
+    job_id = resp.json()["id"]
+    with TestingSessionLocal() as db:
+        db.query(models.ImportJob).filter(models.ImportJob.id == job_id).update({
+            "status": "running",
+            "processed_rows": 2,
+            "heartbeat_at": datetime.utcnow() - timedelta(seconds=settings.IMPORT_JOB_STALE_SECONDS + 1),
+        })
+        db.commit()
+    main.import_job_runner.run_pending()
+    job = client.get(f"/exam-points/import-jobs/{job_id}", headers=headers).json()
+    assert (job["status"], job["processed_rows"], job["imported_count"]) == ("completed", 4, 2)
+    items = client.get("/exam-points", params={"subject": "后台续传"}, headers=headers).json()["items"]
+    assert sorted(item["level3_point"] for item in items) == ["续传2", "续传3"]
+    assert list(tmp_path.iterdir()) == []
+
+def test_import_job_heartbeat_during_parse(tmp_path, monkeypatch):
+    """测试后台导入任务在没有批次提交时也按时间刷新心跳"""
+    import asyncio
+    import json
+    from datetime import datetime, timedelta
+    import main
+    from bulk_import import BulkImporter
+    from config import settings
+    monkeypatch.setattr(settings, "IMPORT_JOB_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "IMPORT_JOB_HEARTBEAT_SECONDS", 0)
+    headers = auth_headers()
+
+    # 全部记录校验失败，不会有批次提交
+    lines = [json.dumps({"subject": "心跳测试"}, ensure_ascii=False) for _ in range(3)]
+    files = {"file": ("考点.ndjson", "\n".join(lines).encode("utf-8"), "application/x-ndjson")}
+    job_id = client.post("/exam-points/import-jobs", files=files, headers=headers).json()["id"]
+    stale = datetime.utcnow() - timedelta(seconds=settings.IMPORT_JOB_STALE_SECONDS + 1)
+    with TestingSessionLocal() as db:
+        job = db.get(models.ImportJob, job_id)
+        job.heartbeat_at = stale
+        db.commit()
+        importer = BulkImporter(db, batch_size=100)
+        asyncio.run(main.import_job_runner._consume(db, job, importer, skip=0))
+        assert importer.failed == 3
+        assert importer.batches == 0
+    with TestingSessionLocal() as db:
+        assert db.get(models.ImportJob, job_id).heartbeat_at > stale
+
+def test_excel_import_resolves_province_alias():
+    """测试Excel导入按省份全称和代码解析省份"""
+    import io
+    from openpyxl import Workbook
+    headers = auth_headers()
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["省份", "科目", "年级", "学期", "一级考点", "考点描述", "历年高考覆盖率"])
+    sheet.append(["北京市", "省份别名", "高三", "上学期", "函数", "全称", 0.5])
+    sheet.append(["bj", "省份别名", "高三", "上学期", "数列", "代码", 0.5])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    files = {"file": ("考点.xlsx", buffer.getvalue(), "application/octet-stream")}
+    resp = client.post("/exam-points/upload-excel", files=files, headers=headers)
+    assert resp.json()["imported_count"] == 2
+
+def test_exam_points_export_stream():
+    """测试按查询条件流式导出CSV和XLSX，导出文件可重新导入"""
+    import csv
+    import io
+    from openpyxl import load_workbook
+    headers = auth_headers()
+    points = [make_exam_point(subject="导出测试", level3_point=f"导出{i}", description=f"描述<{i}>") for i in range(3)]
+    client.post("/exam-points/import", json={"exam_points": points}, headers=headers)
+
+    resp = client.get("/exam-points/export", params={"format": "csv", "subject": "导出测试"}, headers=headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    assert "filename*=UTF-8''" in resp.headers["content-disposition"]
+    rows = list(csv.reader(io.StringIO(resp.content.decode("utf-8-sig"))))
+    assert rows[0][:3] == ["省份", "科目", "年级"]
+    assert [row[6] for row in rows[1:]] == ["导出0", "导出1", "导出2"]
+    assert rows[1][0] == "北京"
+    assert rows[1][7] == "描述<0>"
+
+    resp = client.get("/exam-points/export", params={"subject": "导出测试", "level3_point": "导出1"}, headers=headers)
+    assert resp.status_code == 200
+    sheet = load_workbook(io.BytesIO(resp.content)).active
+    values = list(sheet.values)
+    assert len(values) == 2
+    assert values[1][6] == "导出1"
+    assert values[1][11] == "是"
+
+    # 导出的文件修改科目后可以直接导入
+    sheet["B2"] = "导出再导入"
+    buffer = io.BytesIO()
+    sheet.parent.save(buffer)
+    files = {"file": ("考点.xlsx", buffer.getvalue(), "application/octet-stream")}
+    resp = client.post("/exam-points/upload-excel", files=files, headers=headers)
+    assert resp.json()["imported_count"] == 1
+
+def test_exam_points_export_low_coverage_round_trip():
+    """测试覆盖率为1%、29%的考点导出后重新导入覆盖率不变"""
+    import io
+    from openpyxl import load_workbook
+    headers = auth_headers()
+    points = [make_exam_point(subject="低覆盖导出", level3_point=f"低覆盖{rate}", coverage_rate=rate / 100) for rate in (1, 29)]
+    client.post("/exam-points/import", json={"exam_points": points}, headers=headers)
+
+    resp = client.get("/exam-points/export", params={"subject": "低覆盖导出"}, headers=headers)
+    sheet = load_workbook(io.BytesIO(resp.content)).active
+    assert [sheet["I2"].value, sheet["I3"].value] == ["1%", "29%"]
+    sheet["B2"] = sheet["B3"] = "低覆盖再导入"
+    buffer = io.BytesIO()
+    sheet.parent.save(buffer)
+    files = {"file": ("考点.xlsx", buffer.getvalue(), "application/octet-stream")}
+    assert client.post("/exam-points/upload-excel", files=files, headers=headers).json()["imported_count"] == 2
+    items = client.get("/exam-points", params={"subject": "低覆盖再导入"}, headers=headers).json()["items"]
+    assert sorted(item["coverage_rate"] for item in items) == [1, 29]
+
+def test_exam_points_csv_export_stream_import_round_trip():
+    """测试导出的CSV（中文表头、省份名称、百分数覆盖率）可以直接通过流式接口导入"""
+    headers = auth_headers()
+    points = [make_exam_point(subject="CSV往返", level3_point=f"CSV往返{rate}", coverage_rate=rate / 100) for rate in (1, 29, 100)]
+    client.post("/exam-points/import", json={"exam_points": points}, headers=headers)
+
+    resp = client.get("/exam-points/export", params={"format": "csv", "subject": "CSV往返"}, headers=headers)
+    exported = resp.content.decode("utf-8-sig").replace(",CSV往返,", ",CSV再导入,")
+    resp = client.post(
+        "/exam-points/import/stream", content=exported.encode("utf-8"),
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+    result = resp.json()
+    assert (result["imported_count"], result["failed_count"]) == (3, 0)
+
+    def snapshot(subject):
+        items = client.get("/exam-points", params={"subject": subject}, headers=headers).json()["items"]
+        return sorted(
+            (item["province_id"], item["level3_point"], item["description"], item["coverage_rate"], item["is_active"])
+            for item in items
+        )
+    assert snapshot("CSV再导入") == snapshot("CSV往返")
+
+def test_exam_papers_ndjson_export():
+    """测试试卷及试题的NDJSON流式导出"""
+    import json
+    headers = auth_headers()
+    with TestingSessionLocal() as db:
+        papers = [
+            models.ExamPaper(year=2023, province_id=1, subject="导出科目", paper_name="有试题", added_by="admin"),
+            models.ExamPaper(year=2023, province_id=1, subject="导出科目", paper_name="无试题", added_by="admin"),
+            models.ExamPaper(year=2022, province_id=1, subject="导出科目", paper_name="其他年份", added_by="admin"),
+        ]
+        db.add_all(papers)
+        db.flush()
+        for number, active in (("1", True), ("2", False), ("3", True)):
+            db.add(models.ExamQuestion(
+                exam_paper_id=papers[0].id, question_number=number, question_type="选择题",
+                question_content=f"第{number}题", score=5, added_by="admin", is_active=active,
+            ))
+        db.commit()
+
+    resp = client.get("/exam-papers/export", params={"subject": "导出科目", "year": 2023}, headers=headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [paper["paper_name"] for paper in lines] == ["有试题", "无试题"]
+    assert lines[0]["province_name"] == "北京"
+    assert [question["question_number"] for question in lines[0]["questions"]] == ["1", "3"]
+    assert lines[1]["questions"] == []
+
+def test_exam_points_coverage_analysis():
+    """测试考点覆盖率分析接口"""
+    headers = auth_headers()
+    points = [
+        make_exam_point(subject="覆盖分析", level3_point="分析0", description="求 \\frac{1}{2}。证明定理。", coverage_rate=0.1),
+        make_exam_point(subject="覆盖分析", level3_point="分析1", description="简单描述", coverage_rate=0.45),
+    ]
+    client.post("/exam-points/import", json={"exam_points": points}, headers=headers)
+
+    resp = client.get("/exam-points/coverage-analysis", params={"subject": "覆盖分析", "gap_limit": 1}, headers=headers)
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report["total_points"] == 2
+    assert report["subjects"][0]["subject"] == "覆盖分析"
+    assert report["largest_gaps"][0]["level3_point"] == "分析0"
+    assert report["largest_gaps"][0]["complexity"] == 2.2
+
+    resp = client.get("/exam-points/coverage-analysis", params={"subject": "覆盖分析", "gap_limit": 1},
+                      headers={**headers, "If-None-Match": resp.headers["etag"]})
+    assert resp.status_code == 304
+
+def test_exam_points_complexity_persisted():
+    """测试新增、修改和导入考点时保存复杂度评分，并可按评分排序"""
+    headers = auth_headers()
+    points = [
+        make_exam_point(subject="复杂度", level3_point="简单", description="简单描述"),
+        make_exam_point(subject="复杂度", level3_point="公式", description="求 \\frac{1}{2}。证明定理。"),
+    ]
+    client.post("/exam-points/import", json={"exam_points": points}, headers=headers)
+    resp = client.post("/exam-points", json=make_exam_point(subject="复杂度", level3_point="新增",
+                                                             description="公式 \\sqrt{2}"), headers=headers)
+    assert resp.status_code == 200
+    created = resp.json()
+    assert (created["complexity_score"], created["formula_count"], created["keyword_count"]) == (1.8, 1, 1)
+
+    resp = client.put(f"/exam-points/{created['id']}", json={"description": "普通"}, headers=headers)
+    assert resp.json()["complexity_score"] == 1.1
+
+    resp = client.get("/exam-points", params={"subject": "复杂度", "sort_by": "complexity_score", "order": "desc",
+                                              "view": "summary", "page_size": 1}, headers=headers)
+    body = resp.json()
+    assert [(item["level3_point"], item["complexity_score"]) for item in body["items"]] == [("公式", 2.2)]
+    resp = client.get("/exam-points", params={"subject": "复杂度", "sort_by": "complexity_score", "order": "desc",
+                                              "view": "summary", "cursor": body["next_cursor"]}, headers=headers)
+    assert [item["level3_point"] for item in resp.json()["items"]] == ["新增", "简单"]
+
+def test_exam_points_complexity_cursor_with_null_scores():
+    """测试按复杂度游标分页时，未评分（复杂度为空）的考点不会被跳过"""
+    headers = auth_headers()
+    points = [make_exam_point(subject="空评分", level3_point=f"空评分{i}", description="求 \\frac{1}{2}" * i) for i in range(5)]
+    client.post("/exam-points/import", json={"exam_points": points}, headers=headers)
+    with TestingSessionLocal() as other:
+        other.execute(
+            models.ExamPoint.__table__.update()
+            .where(models.ExamPoint.level3_point.in_(["空评分1", "空评分3"]))
+            .values(complexity_score=None)
+        )
+        versioning.bump_versions(other.connection(), ["exam_points"])
+        other.commit()
+
+    for order in ("asc", "desc"):
+        for view in ("full", "summary"):
+            params = {"subject": "空评分", "sort_by": "complexity_score", "order": order, "view": view, "page_size": 1}
+            seen, cursor = [], None
+            while True:
+                resp = client.get("/exam-points", params={**params, **({"cursor": cursor} if cursor else {})}, headers=headers)
+                assert resp.status_code == 200
+                body = resp.json()
+                seen.extend(item["level3_point"] for item in body["items"])
+                cursor = body["next_cursor"]
+                if not cursor:
+                    break
+            assert sorted(seen) == [f"空评分{i}" for i in range(5)]
+            # 未评分的排在最前（升序）或最后（降序）
+            nulls = seen[:2] if order == "asc" else seen[-2:]
+            assert sorted(nulls) == ["空评分1", "空评分3"]
+
+def test_exam_point_rollups_incremental():
+    """测试覆盖率汇总随考点新增、修改、删除和导入增量更新，并支持下钻"""
+    headers = auth_headers()
+    params = {"province_id": 1, "subject": "汇总测试"}
+    points = [
+        make_exam_point(subject="汇总测试", grade="高一", level1_point="函数", level3_point="甲", coverage_rate=0.35),
+        make_exam_point(subject="汇总测试", grade="高一", level1_point="几何", level3_point="乙", coverage_rate=1.0),
+    ]
+    client.post("/exam-points/import", json={"exam_points": points}, headers=headers)
+    resp = client.post("/exam-points", json=make_exam_point(subject="汇总测试", grade="高二", level3_point="丙",
+                                                             coverage_rate=61), headers=headers)
+    point_id = resp.json()["id"]
+
+    resp = client.get("/exam-points/rollups", params=params, headers=headers)
+    body = resp.json()
+    assert body["group_by"] == "grade"
+    assert body["total"]["count"] == 3
+    assert body["total"]["avg_coverage_rate"] == round((35 + 100 + 61) / 3, 2)
+    assert body["total"]["distribution"] == [0, 0, 0, 1, 0, 0, 1, 0, 0, 1]
+    assert [(item["value"], item["count"]) for item in body["items"]] == [("高一", 2), ("高二", 1)]
+
+    client.put(f"/exam-points/{point_id}", json={"grade": "高一", "coverage_rate": 20}, headers=headers)
+    resp = client.get("/exam-points/rollups", params={**params, "grade": "高一"}, headers=headers)
+    body = resp.json()
+    assert body["group_by"] == "level1_point"
+    assert [(item["value"], item["count"], item["avg_coverage_rate"]) for item in body["items"]] == [
+        ("函数", 2, 27.5), ("几何", 1, 100.0),
+    ]
+
+    client.delete(f"/exam-points/{point_id}", headers=headers)
+    points[0]["coverage_rate"] = 0.55
+    client.post("/exam-points/import", params={"mode": "upsert"}, json={"exam_points": points}, headers=headers)
+    resp = client.get("/exam-points/rollups", params={**params, "group_by": "province_id"}, headers=headers)
+    body = resp.json()
+    assert body["total"]["distribution"] == [0, 0, 0, 0, 0, 1, 0, 0, 0, 1]
+    assert [(item["value"], item["province_name"], item["count"]) for item in body["items"]] == [(1, "北京", 2)]
+
+    # 增量维护的结果与按考点表重新生成的一致
+    with TestingSessionLocal() as db:
+        rollup_rows = lambda: set(db.execute(select(models.ExamPointRollup.__table__)).all())
+        incremental = rollup_rows()
+        coverage_rollup.rebuild(db.connection())
+        assert rollup_rows() == incremental
+        db.rollback()
+
+def test_dashboard_summary():
+    """测试系统概览汇总指标，写操作后缓存失效"""
+    headers = auth_headers()
+    resp = client.get("/dashboard/summary", headers=headers)
+    assert resp.status_code == 200
+    before = resp.json()
+    assert client.get("/dashboard/summary", headers={**headers, "If-None-Match": resp.headers["ETag"]}).status_code == 304
+
+    client.post("/exam-points/import", json={"exam_points": [
+        make_exam_point(subject="概览测试", level3_point=f"概览{i}") for i in range(3)
+    ]}, headers=headers)
+    client.post("/exam-points", json=make_exam_point(subject="概览测试", level3_point="停用", is_active=False),
+                headers=headers)
+    resp = client.get("/dashboard/summary", headers=headers)
+    after = resp.json()
+    assert after["exam_point_count"] == before["exam_point_count"] + 4
+    assert after["active_exam_point_count"] == before["active_exam_point_count"] + 3
+    assert after["exam_paper_count"] == before["exam_paper_count"]
+    with TestingSessionLocal() as db:
+        assert after["pending_user_count"] == db.query(models.User).filter(
+            models.User.is_deleted == False, models.User.is_approved == False
+        ).count()
+    counts = [item["exam_point_count"] for item in after["top_subjects"]]
+    assert 0 < len(counts) <= 5
+    assert counts == sorted(counts, reverse=True)
@@ -0,0 +1,48 @@
+import pytest
+from cache import QueryCache
+
+class TestQueryCache:
+    def test_make_key_ignores_empty_params(self):
+        """测试缓存键规范化"""
+        assert QueryCache.make_key(a=1, b=None, c="") == QueryCache.make_key(a=1)
+        assert QueryCache.make_key(a=1, b=2) == QueryCache.make_key(b=2, a=1)
+
+    def test_hit_miss_and_lru_eviction(self):
+        """测试命中统计和LRU淘汰"""
+        cache = QueryCache("test", max_size=2)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)  # 淘汰最久未使用的 b
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 2
+        assert stats["evictions"] == 1
+
+    def test_invalidate_and_stale_write(self):
+        """测试写操作失效及计算期间发生写入时放弃缓存"""
+        cache = QueryCache("test")
+        cache.set("a", 1)
+        generation = cache.generation
+        cache.invalidate()
+        assert cache.get("a") is None
+        cache.set("a", 2, generation)
+        assert cache.get("a") is None
+        cache.set("a", 3, cache.generation)
+        assert cache.get("a") == 3
+
+    def test_ttl_expiry(self, monkeypatch):
+        """测试设置ttl的条目超时后不再命中"""
+        import cache as cache_module
+        now = [100.0]
+        monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+        cache = QueryCache("test", ttl=30)
+        cache.set("a", 1)
+        now[0] += 29
+        assert cache.get("a") == 1
+        now[0] += 2
+        assert cache.get("a") is None
+        assert cache.stats()["size"] == 0
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+import coverage_analysis
+from coverage_analysis import CoverageAnalysis, recommended_coverage, score_descriptions
+
+def make_row(id, description, subject="数学", coverage_rate=50, level1="函数", level2=None, level3=None,
+             complexity_score=None, complexity_version=None):
+    return SimpleNamespace(id=id, subject=subject, level1_point=level1, level2_point=level2,
+                           level3_point=level3, description=description, coverage_rate=coverage_rate,
+                           complexity_score=complexity_score, complexity_version=complexity_version)
+
+class TestCoverageAnalysis:
+    def test_score_descriptions(self):
+        """测试按批计算公式、符号、关键词、句子数和复杂度"""
+        scores = score_descriptions(["", None, "求 \\frac{1}{2} 与 √2。证明定理！", "简单描述"])
+        assert scores["formula_count"].tolist() == [0, 0, 1, 0]
+        assert scores["symbol_count"].tolist() == [0, 0, 1, 0]
+        assert scores["keyword_count"].tolist() == [0, 0, 2, 0]
+        assert scores["sentence_count"].tolist() == [1, 1, 3, 1]
+        # 1 + 0.5 + 0.3 + 0.4 + 0.3
+        assert scores["complexity"].tolist() == [1.0, 1.0, 2.5, 1.1]
+
+    def test_complexity_capped(self):
+        """测试复杂度上限为10"""
+        assert score_descriptions(["\\sum" * 30])["complexity"].tolist() == [10.0]
+
+    def test_recommended_coverage(self):
+        """测试建议覆盖率按科目和层级加权并限制在5-95"""
+        import numpy as np
+        rates = recommended_coverage(
+            np.array([1.0, 1.0, 10.0, 1.0]), ["数学", "体育", "数学", "政治"],
+            ["函数", "田径", "函数", " "], [None, None, None, "  "], [None, None, None, "三级"],
+        )
+        # 30 + 15 + 15；30 + 0 + 15；30 + 18 + 15 + 15；30 + 3 + 3
+        assert rates.tolist() == [60, 45, 78, 36]
+
+    def test_analysis_merges_batches(self):
+        """测试多批结果合并为按科目的汇总和差距最大的考点"""
+        analysis = CoverageAnalysis(gap_limit=2)
+        analysis.add_batch([make_row(1, "描述", coverage_rate=60), make_row(2, "描述", subject="语文", coverage_rate=10)])
+        analysis.add_batch([make_row(3, "描述", coverage_rate=0)])
+        report = analysis.report()
+        assert report["total_points"] == 3
+        assert [item["subject"] for item in report["subjects"]] == ["数学", "语文"]
+        assert report["subjects"][0]["count"] == 2
+        assert [gap["id"] for gap in report["largest_gaps"]] == [3, 2]
+        assert report["complexity_distribution"] == {"low": 3, "medium": 0, "high": 0}
+
+    def test_fields_match_model(self):
+        """测试分析所需的列都存在于考点模型"""
+        from models import ExamPoint
+        assert all(hasattr(ExamPoint, name) for name in coverage_analysis.ANALYSIS_FIELDS)
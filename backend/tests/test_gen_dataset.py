@@ -0,0 +1,80 @@
+import json
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from database import Base
+from gen_dataset import DatasetGenerator, PAPER_STRUCTURES, allocate, write_database, write_ndjson
+
+def make_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+class TestDatasetGenerator:
+    def test_allocate_respects_weights_and_capacity(self):
+        """测试按权重分配数量且不超过容量"""
+        assert allocate(10, [1, 1], [100, 100]) == [5, 5]
+        assert allocate(10, [3, 1], [4, 100]) == [4, 6]
+        assert allocate(7, [1, 1, 1], [100, 100, 100]) in ([3, 2, 2], [2, 3, 2], [2, 2, 3])
+        assert allocate(500, [1, 1], [3, 4]) == [3, 4]
+
+    def test_same_seed_same_data(self):
+        """测试相同种子生成相同数据，不同种子生成不同数据"""
+        first = DatasetGenerator(seed=7, points=300, papers=5, users=20)
+        second = DatasetGenerator(seed=7, points=300, papers=5, users=20)
+        other = DatasetGenerator(seed=8, points=300, papers=5, users=20)
+        assert list(first.iter_exam_points()) == list(second.iter_exam_points())
+        assert list(first.iter_exam_papers()) == list(second.iter_exam_papers())
+        assert list(first.iter_users()) == list(second.iter_users())
+        assert list(first.iter_exam_points()) != list(other.iter_exam_points())
+        # 试卷数量不影响生成的考点
+        assert list(DatasetGenerator(seed=7, points=300, papers=50, users=20).iter_exam_points()) == \
+            list(first.iter_exam_points())
+
+    def test_points_are_unique_and_papers_consistent(self):
+        """测试考点自然键不重复，试卷总分等于试题分值之和"""
+        generator = DatasetGenerator(seed=1, points=2000, papers=20, users=100)
+        points = list(generator.iter_exam_points())
+        assert len(points) == 2000
+        keys = {tuple(point[field] for field in ("province", "subject", "grade", "semester",
+                                                   "level1_point", "level2_point", "level3_point"))
+                for point in points}
+        assert len(keys) == 2000
+        assert all(0 <= point["coverage_rate"] <= 100 for point in points)
+        assert {point["added_by"] for point in points} <= set(generator.contributors)
+        for paper in generator.iter_exam_papers():
+            assert paper["total_score"] == sum(question["score"] for question in paper["questions"])
+            assert len(paper["questions"]) == sum(len(scores) for _, scores in PAPER_STRUCTURES[paper["subject"]])
+
+    def test_write_database(self):
+        """测试批量写入数据库"""
+        from init_data import PROVINCES_AND_CITIES
+        db = make_session()
+        for index, (province_name, cities) in enumerate(PROVINCES_AND_CITIES.items(), start=1):
+            db.add(models.Province(id=index, name=province_name, code=f"P{index:03d}"))
+            for city_index, city_name in enumerate(cities, start=1):
+                db.add(models.City(name=city_name, code=f"C{index}{city_index:02d}", province_id=index))
+        db.commit()
+
+        generator = DatasetGenerator(seed=3, points=500, papers=10, users=30)
+        counts = write_database(db, generator, batch_size=64)
+        questions = sum(len(paper["questions"]) for paper in generator.iter_exam_papers())
+        assert counts == {"users": 30, "exam_points": 500, "exam_papers": 10, "exam_questions": questions}
+        assert db.query(models.ExamPoint).filter(models.ExamPoint.natural_key_hash.is_(None)).count() == 0
+        assert db.query(func.count(models.ExamPointNgram.gram)).scalar() > 0
+        assert db.query(models.User).filter(models.User.city_id.is_(None)).count() == 0
+        assert db.query(models.ExamQuestion).join(models.ExamPaper).count() == questions
+        db.close()
+
+    def test_write_ndjson(self, tmp_path):
+        """测试输出NDJSON文件"""
+        generator = DatasetGenerator(seed=3, points=50, papers=2, users=5)
+        counts = write_ndjson(generator, str(tmp_path))
+        assert counts == {"users.ndjson": 5, "exam_points.ndjson": 50, "exam_papers.ndjson": 2}
+        with open(tmp_path / "exam_points.ndjson", encoding="utf-8") as f:
+            point = json.loads(f.readline())
+        assert 0 <= point["coverage_rate"] <= 1
+        with open(tmp_path / "exam_papers.ndjson", encoding="utf-8") as f:
+            assert len(json.loads(f.readline())["questions"]) > 0
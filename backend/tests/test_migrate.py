@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+import migrate
+
+@pytest.fixture
+def migrate_engine():
+    """创建独立的内存数据库"""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+def test_upgrade_adds_missing_indexes(migrate_engine):
+    """测试迁移为已有数据库补建联合索引，且重复执行无副作用"""
+    with migrate_engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_exam_points_scope"))
+        connection.execute(text("DROP TABLE table_versions"))
+
+    executed = migrate.upgrade(migrate_engine)
+    assert executed == [m["version"] for m in migrate.MIGRATIONS]
+
+    inspector = inspect(migrate_engine)
+    assert "ix_exam_points_scope" in {i["name"] for i in inspector.get_indexes("exam_points")}
+    assert "table_versions" in inspector.get_table_names()
+
+    assert migrate.upgrade(migrate_engine) == []
+
+def test_upgrade_backfills_exam_point_hashes(migrate_engine):
+    """测试迁移为旧库添加哈希列并回填已有考点"""
+    with migrate_engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_exam_points_natural_key_hash"))
+        connection.execute(text("ALTER TABLE exam_points DROP COLUMN natural_key_hash"))
+        connection.execute(text("ALTER TABLE exam_points DROP COLUMN content_hash"))
+        connection.execute(text(
+            "INSERT INTO exam_points (province_id, subject, grade, semester, level1_point, description, "
+            "coverage_rate, added_by, is_active) VALUES (1, '数学', '高三', '上学期', '函数', '描述', 80, 'admin', 1)"
+        ))
+
+    migrate.upgrade(migrate_engine)
+
+    with migrate_engine.begin() as connection:
+        row = connection.execute(text("SELECT natural_key_hash, content_hash FROM exam_points")).one()
+    expected = migrate.add_hashes({
+        "province_id": 1, "subject": "数学", "grade": "高三", "semester": "上学期",
+        "level1_point": "函数", "level2_point": None, "level3_point": None,
+        "description": "描述", "coverage_rate": 80, "is_active": True,
+    })
+    assert tuple(row) == (expected["natural_key_hash"], expected["content_hash"])
+
+def test_upgrade_scores_complexity(migrate_engine, monkeypatch):
+    """测试迁移为已有考点计算复杂度评分，评分版本变化后重新执行迁移会重算"""
+    with migrate_engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_exam_points_complexity_score"))
+        for column in ("complexity_score", "formula_count", "keyword_count", "complexity_version"):
+            connection.execute(text(f"ALTER TABLE exam_points DROP COLUMN {column}"))
+        connection.execute(text(
+            "INSERT INTO exam_points (province_id, subject, grade, semester, level1_point, description, "
+            "coverage_rate, added_by, is_active) VALUES (1, '数学', '高三', '上学期', '函数', "
+            "'求 \\frac{1}{2}。证明定理。', 80, 'admin', 1)"
+        ))
+
+    migrate.upgrade(migrate_engine)
+    query = text("SELECT complexity_score, formula_count, keyword_count, complexity_version FROM exam_points")
+    with migrate_engine.begin() as connection:
+        assert tuple(connection.execute(query).one()) == (2.2, 1, 2, 1)
+    assert "ix_exam_points_complexity_score" in {i["name"] for i in inspect(migrate_engine).get_indexes("exam_points")}
+
+    import coverage_analysis
+    monkeypatch.setattr(coverage_analysis, "SCORING_VERSION", 2)
+    assert migrate.upgrade(migrate_engine) == []
+    with migrate_engine.begin() as connection:
+        assert connection.execute(query).one().complexity_version == 2
+
+def test_upgrade_indexes_existing_exam_points(migrate_engine):
+    """测试迁移为已有考点建立n-gram索引，迁移后文本筛选能查到已有考点"""
+    from sqlalchemy.orm import Session
+    import models
+    import search_index
+    with migrate_engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO exam_points (province_id, subject, grade, semester, level1_point, description, "
+            "coverage_rate, added_by, is_active) VALUES (1, '数学', '高三', '上学期', '集合与函数', '描述', 80, 'admin', 1)"
+        ))
+
+    migrate.upgrade(migrate_engine)
+
+    with Session(migrate_engine) as db:
+        ids = db.execute(search_index.matching_ids("函数", "level1_point")).scalars().all()
+        assert ids == [db.query(models.ExamPoint.id).scalar()]
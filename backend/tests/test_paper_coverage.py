@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+import paper_coverage
+from database import Base
+
+@pytest.fixture
+def db():
+    """独立的内存数据库，包含两个同科目考点"""
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add(models.Province(id=1, name="北京", code="BJ"))
+    for level2, level3 in (("函数", "指数函数"), ("函数", "对数函数"), ("数列", "等差数列")):
+        session.add(models.ExamPoint(
+            province_id=1, subject="数学", grade="高三", semester="上学期", level1_point="代数",
+            level2_point=level2, level3_point=level3, description="描述", coverage_rate=50, added_by="admin",
+            is_active=True,
+        ))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+def add_paper(db, year, questions, total_score=None):
+    paper = models.ExamPaper(year=year, province_id=1, subject="数学", paper_name=f"{year}年数学",
+                             total_score=total_score, added_by="admin")
+    db.add(paper)
+    db.flush()
+    for number, (score, exam_points) in enumerate(questions, start=1):
+        db.add(models.ExamQuestion(exam_paper_id=paper.id, question_number=str(number), question_type="解答题",
+                                   question_content="题目", score=score, exam_points=exam_points, added_by="admin"))
+    db.commit()
+    return paper
+
+def stats(db):
+    rows = db.query(models.ExamPoint.level3_point, models.ExamPoint.paper_count, models.ExamPoint.paper_year_count,
+                    models.ExamPoint.paper_score_share, models.ExamPoint.paper_coverage_rate).order_by(models.ExamPoint.id)
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+def refresh(db, **kwargs):
+    report = paper_coverage.refresh(db.connection(), **kwargs)
+    db.commit()
+    return report
+
+def test_split_terms():
+    """测试按常见分隔符拆分相关考点并去重"""
+    assert paper_coverage.split_terms(" 指数函数，对数函数、指数函数;数列\n") == ["指数函数", "对数函数", "数列"]
+    assert paper_coverage.split_terms(None) == []
+
+def test_refresh_counts_papers_years_and_score_share(db):
+    """测试统计考点出现的试卷数、年份数和分值占比"""
+    add_paper(db, 2023, [(10, "指数函数，等差数列"), (20, "函数")], total_score=150)
+    add_paper(db, 2024, [(30, "对数函数"), (5, "未知考点")], total_score=150)
+
+    report = refresh(db)
+    assert report == {"paper_count": 2, "scope_count": 1, "point_count": 3}
+    # 二级考点“函数”匹配到其下所有三级考点
+    assert stats(db) == {
+        "指数函数": (1, 1, 8.33, 50),
+        "对数函数": (2, 2, 16.67, 100),
+        "等差数列": (1, 1, 1.67, 50),
+    }
+
+def test_refresh_processes_only_changed_papers(db):
+    """测试再次统计只处理有变更的试卷，删除试卷和试题后统计随之更新"""
+    first = add_paper(db, 2023, [(10, "指数函数")], total_score=100)
+    second = add_paper(db, 2024, [(10, "等差数列")], total_score=100)
+    # 考点和试卷在一小时前录入
+    earlier = datetime.utcnow() - timedelta(hours=1)
+    for model in (models.ExamPoint, models.ExamPaper, models.ExamQuestion):
+        db.execute(update(model).values(created_at=earlier, updated_at=None))
+    db.commit()
+    assert refresh(db)["paper_count"] == 2
+    assert refresh(db)["paper_count"] == 0
+
+    # 上次统计之后删除了第二份试卷的试题
+    db.execute(update(models.ExamQuestion).where(models.ExamQuestion.exam_paper_id == second.id)
+               .values(is_active=False, updated_at=datetime.utcnow() + timedelta(minutes=1)))
+    db.commit()
+    assert refresh(db)["paper_count"] == 1
+    assert stats(db)["等差数列"] == (0, 0, 0.0, 0)
+    assert stats(db)["指数函数"] == (1, 1, 5.0, 50)
+
+    db.query(models.ExamPaper).filter(models.ExamPaper.id == first.id).update({"is_active": False})
+    db.commit()
+    assert refresh(db, full=True)["paper_count"] == 2
+    assert stats(db)["指数函数"] == (0, 0, 0.0, 0)
+
+def test_refresh_rematches_scope_after_exam_point_change(db):
+    """测试考点新增或改名后，同省份科目下的试卷重新匹配"""
+    add_paper(db, 2023, [(10, "数列求和")], total_score=100)
+    add_paper(db, 2024, [(10, "等差数列")], total_score=100)
+    earlier = datetime.utcnow() - timedelta(hours=1)
+    for model in (models.ExamPoint, models.ExamPaper, models.ExamQuestion):
+        db.execute(update(model).values(created_at=earlier, updated_at=None))
+    db.commit()
+    assert refresh(db)["paper_count"] == 2
+    assert refresh(db)["paper_count"] == 0
+
+    # 新增的考点匹配到之前未能匹配的试题
+    db.add(models.ExamPoint(
+        province_id=1, subject="数学", grade="高三", semester="上学期", level1_point="代数",
+        level2_point="数列", level3_point="数列求和", description="描述", coverage_rate=50, added_by="admin",
+        is_active=True,
+    ))
+    db.commit()
+    assert refresh(db) == {"paper_count": 2, "scope_count": 1, "point_count": 4}
+    assert stats(db)["数列求和"] == (1, 1, 5.0, 50)
+
+    # 考点改名后原名称不再匹配
+    point = db.query(models.ExamPoint).filter(models.ExamPoint.level3_point == "等差数列").one()
+    point.level3_point = "等比数列"
+    db.commit()
+    assert refresh(db)["paper_count"] == 2
+    assert stats(db)["等比数列"] == (0, 0, 0.0, 0)
+
+def test_refresh_does_not_depend_on_database_clock(db):
+    """测试数据库时钟与应用UTC时钟不一致（如数据库为东八区）时，增量统计不会漏掉变更"""
+    paper = add_paper(db, 2023, [(10, "指数函数")], total_score=100)
+    assert refresh(db)["paper_count"] == 1
+
+    # 新增的试题和考点由数据库按本地时间写入创建时间，比应用的UTC时间早8小时
+    skewed = datetime.utcnow() - timedelta(hours=8)
+    db.add(models.ExamQuestion(exam_paper_id=paper.id, question_number="2", question_type="解答题",
+                               question_content="题目", score=10, exam_points="等差数列", added_by="admin",
+                               created_at=skewed))
+    db.commit()
+    assert refresh(db)["paper_count"] == 1
+    assert stats(db)["等差数列"] == (1, 1, 10.0, 100)
+
+    db.add(models.ExamPoint(
+        province_id=1, subject="数学", grade="高三", semester="上学期", level1_point="代数",
+        level2_point="数列", level3_point="数列求和", description="描述", coverage_rate=50, added_by="admin",
+        is_active=True, created_at=skewed,
+    ))
+    db.commit()
+    assert refresh(db)["paper_count"] == 1
+
+    # 修改时间由应用按UTC写入
+    question = db.query(models.ExamQuestion).filter(models.ExamQuestion.question_number == "2").one()
+    question.exam_points = "数列求和"
+    db.commit()
+    assert question.updated_at is not None
+    assert refresh(db)["paper_count"] == 1
+    assert stats(db)["数列求和"] == (1, 1, 10.0, 100)
+    assert stats(db)["等差数列"] == (0, 0, 0.0, 0)
@@ -0,0 +1,44 @@
+import pytest
+from region_resolver import RegionResolver, province_key
+
+PROVINCES = [
+    (1, "北京市", "P001"),
+    (5, "内蒙古自治区", "P005"),
+    (20, "广西壮族自治区", "P020"),
+    (23, "四川省", "P023"),
+    (32, "香港特别行政区", "P032"),
+]
+CITIES = [
+    (101, "北京市", 1),
+    (2301, "成都市", 23),
+    (2320, "阿坝藏族羌族自治州", 23),
+    (501, "朝阳市", 5),
+    (102, "朝阳市", 1),
+]
+
+class TestRegionResolver:
+    def test_province_key_strips_suffixes(self):
+        """测试省份名称后缀规范化"""
+        assert province_key("北京市") == "北京"
+        assert province_key(" 广西壮族自治区 ") == "广西"
+        assert province_key("香港特别行政区") == "香港"
+        assert province_key("四川") == "四川"
+
+    @pytest.mark.parametrize("value, expected", [
+        ("北京", 1), ("北京市", 1), ("内蒙古", 5), ("广西", 20), ("四川省", 23), ("香港", 32),
+        ("BJ", 1), ("sc", 23), ("P023", 23), (23, 23), ("23", 23),
+        ("火星", None), (99, None), ("", None), (None, None),
+    ])
+    def test_resolve_province(self, value, expected):
+        """测试按名称、简称、代码和ID解析省份"""
+        resolver = RegionResolver(PROVINCES)
+        assert resolver.province_id(value) == expected
+
+    def test_resolve_city(self):
+        """测试城市解析，同名城市需指定省份"""
+        resolver = RegionResolver(PROVINCES, CITIES)
+        assert resolver.city_id("成都") == 2301
+        assert resolver.city_id("阿坝藏族羌族自治州") == 2320
+        assert resolver.city_id("朝阳市") is None
+        assert resolver.city_id("朝阳", province_id=5) == 501
+        assert RegionResolver(PROVINCES).city_id("成都") is None
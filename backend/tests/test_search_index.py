@@ -0,0 +1,21 @@
+import pytest
+from search_index import normalize_text, extract_ngrams, query_ngrams, END_MARK
+
+class TestNgrams:
+    def test_normalize_text(self):
+        """测试全角转半角、大小写和空白处理"""
+        assert normalize_text("  ＡＢ c\n函数 ") == "abc函数"
+        assert normalize_text(None) == ""
+
+    def test_extract_ngrams(self):
+        """测试二元组提取及计数"""
+        grams = extract_ngrams("函数函数")
+        assert grams["函数"] == 2
+        assert grams["数函"] == 1
+        assert grams["数" + END_MARK] == 1
+
+    def test_query_ngrams(self):
+        """测试查询词切分"""
+        assert query_ngrams("指数函数") == sorted({"指数", "数函", "函数"})
+        assert query_ngrams("数") == ["数"]
+        assert query_ngrams("  ") == []
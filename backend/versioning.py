@@ -0,0 +1,85 @@
+import hashlib
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import TableVersion
+
+# 需要维护版本号的数据表
+VERSIONED_TABLES = {"provinces", "cities", "exam_points", "exam_papers", "exam_questions", "users"}
+
+def bump_versions(connection, table_names: Iterable[str]):
+    """递增数据表版本号，在当前事务中执行"""
+    for name in sorted(set(table_names)):
+        stmt = (
+            update(TableVersion)
+            .where(TableVersion.table_name == name)
+            .values(version=TableVersion.version + 1)
+        )
+        if connection.execute(stmt).rowcount:
+            continue
+        # 首次写入该表时创建版本记录，并发创建冲突时退回到更新
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(TableVersion).values(table_name=name, version=1))
+        except IntegrityError:
+            connection.execute(stmt)
+
+@event.listens_for(Session, "after_flush")
+def track_table_changes(session, flush_context):
+    """ORM写操作flush后自动递增相关表的版本号"""
+    tables = set()
+    for obj in list(session.new) + list(session.deleted):
+        tables.add(obj.__table__.name)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            tables.add(obj.__table__.name)
+    tables &= VERSIONED_TABLES
+    if tables:
+        bump_versions(session.connection(), tables)
+
+def get_versions(db: Session, table_names: List[str]) -> Dict[str, int]:
+    """读取数据表版本号，未写入过的表版本为0"""
+    rows = db.query(TableVersion.table_name, TableVersion.version).filter(
+        TableVersion.table_name.in_(table_names)
+    ).all()
+    versions = {name: 0 for name in table_names}
+    versions.update({name: version for name, version in rows})
+    return versions
+
+def make_etag(versions: Dict[str, int], *parts: str) -> str:
+    """根据表版本号和请求参数生成强ETag"""
+    source = "|".join([f"{name}:{versions[name]}" for name in sorted(versions)] + list(parts))
+    return '"' + hashlib.sha1(source.encode("utf-8")).hexdigest()[:20] + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """判断请求的 If-None-Match 是否命中当前ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def conditional_get(
+    request: Request,
+    response: Response,
+    db: Session,
+    table_names: List[str],
+    versions: Optional[Dict[str, int]] = None,
+) -> Optional[Response]:
+    """处理条件GET：命中时返回304响应，否则在response上设置ETag并返回None
+
+    调用方还需按版本号缓存响应体时，先用 get_versions 读取一次并通过 versions 传入，
+    保证ETag与缓存键来自同一次读取的版本号。
+    """
+    if versions is None:
+        versions = get_versions(db, table_names)
+    etag = make_etag(versions, request.url.path, request.url.query)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
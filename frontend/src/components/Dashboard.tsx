@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { authAPI, User } from '../services/api';
+import { authAPI, dashboardAPI, DashboardSummary, User } from '../services/api';
 import UserManagement from './UserManagement';
 import ProfileEdit from './ProfileEdit';
 import ExamPointManagement from './ExamPointManagement';
@@ -12,6 +12,7 @@ const Dashboard: React.FC = () => {
   const [user, setUser] = useState<User | null>(null);
   const [loading, setLoading] = useState(true);
   const [currentView, setCurrentView] = useState<DashboardView>('home');
+  const [summary, setSummary] = useState<DashboardSummary | null>(null);
   const navigate = useNavigate();
 
   useEffect(() => {
@@ -38,6 +39,13 @@ const Dashboard: React.FC = () => {
     fetchUser();
   }, [navigate]);
 
+  useEffect(() => {
+    if (currentView !== 'home') return;
+    dashboardAPI.getSummary()
+      .then(setSummary)
+      .catch((error) => console.error('❌ 获取概览数据失败:', error));
+  }, [currentView]);
+
   const handleLogout = () => {
     localStorage.removeItem('token');
     console.log('✅ 已退出登录');
@@ -170,7 +178,38 @@ const Dashboard: React.FC = () => {
     <div className="flex-1 p-6">
       <div className="max-w-4xl mx-auto">
         <h1 className="text-3xl font-bold text-gray-900 mb-8">系统概览</h1>
-        
+
+        {summary && (
+          <div className="mb-8">
+            <div className="grid grid-cols-2 md:grid-cols-5 gap-4">
+              {[
+                { label: '有效考点', value: summary.active_exam_point_count },
+                { label: '试卷', value: summary.exam_paper_count },
+                { label: '试题', value: summary.exam_question_count },
+                { label: '用户', value: summary.user_count },
+                { label: '待审核用户', value: summary.pending_user_count },
+              ].map((item) => (
+                <div key={item.label} className="bg-white rounded-lg shadow p-4">
+                  <p className="text-sm text-gray-500">{item.label}</p>
+                  <p className="text-2xl font-semibold text-gray-900">{item.value.toLocaleString()}</p>
+                </div>
+              ))}
+            </div>
+            {summary.top_subjects.length > 0 && (
+              <div className="bg-white rounded-lg shadow p-4 mt-4">
+                <p className="text-sm font-medium text-gray-500 mb-2">考点最多的科目（共 {summary.subject_count} 个科目）</p>
+                <div className="flex flex-wrap gap-4">
+                  {summary.top_subjects.map((item) => (
+                    <span key={item.subject} className="text-sm text-gray-900">
+                      {item.subject}：{item.exam_point_count} 个考点 / {item.exam_paper_count} 份试卷
+                    </span>
+                  ))}
+                </div>
+              </div>
+            )}
+          </div>
+        )}
+
         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6 mb-8">
           {/* 用户信息卡片 */}
           <div className="bg-white rounded-lg shadow p-6">
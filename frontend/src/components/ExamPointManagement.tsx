@@ -1,7 +1,8 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import { examPointAPI } from '../services/api';
 import { ExamPoint, ExamPointQuery, PROVINCES, SUBJECTS, GRADES, SEMESTERS, EXCEL_COLUMNS, SAMPLE_EXAM_POINTS } from '../config/examPointConfig';
-import { readExamPointsFromExcel, exportExamPointsToExcel, generateExcelTemplate, validateExcelFile } from '../utils/excelUtils';
+import { saveAs } from 'file-saver';
+import { COVERAGE_RATE_NOTE, generateExcelTemplate } from '../utils/excelUtils';
 import PaginationTool from './PaginationTool';
 import ExamPointDetailModal from './ExamPointDetailModal';
 
@@ -191,25 +192,20 @@ const ExamPointManagement: React.FC<ExamPointManagementProps> = ({ currentUser }
       return;
     }
 
+    if (!selectedFile.name.toLowerCase().endsWith('.xlsx')) {
+      setMessage('仅支持.xlsx格式的Excel文件');
+      return;
+    }
+
     try {
-      // 验证文件格式
-      await validateExcelFile(selectedFile);
-      
-      // 读取Excel数据
-      let examPoints = await readExamPointsFromExcel(selectedFile);
-      
-      // 批量导入到后端
-      examPoints = examPoints.map(item => ({
-        ...item,
-        description: autoFormatDescription(item.description || '')
-      }));
-      await examPointAPI.importExamPoints(examPoints);
+      // 直接上传文件，由后端逐行解析并分批写入
+      const result = await examPointAPI.uploadExcelFile(selectedFile);
       
       setShowImportModal(false);
       setSelectedFile(null);
       fetchExamPoints();
-      setMessage('✅ Excel导入成功');
-      alert(`📥 Excel文件导入成功！共导入 ${examPoints.length} 条数据`);
+      setMessage(`✅ ${result.message}`);
+      alert(`📥 Excel文件导入完成！${result.message}`);
     } catch (error) {
       console.error('❌ Excel导入失败:', error);
       setMessage(`Excel导入失败: ${error instanceof Error ? error.message : '未知错误'}`);
@@ -218,8 +214,18 @@ const ExamPointManagement: React.FC<ExamPointManagementProps> = ({ currentUser }
 
   const handleExport = async () => {
     try {
-      // 使用前端Excel工具导出，传入 provinceList
-      exportExamPointsToExcel(examPoints, provinceList, '考点数据');
+      // 由后端按当前查询条件流式生成Excel文件，不再在浏览器中加载全部考点
+      const params: any = {};
+      if (query.province_id) params.province_id = query.province_id;
+      if (query.subject) params.subject = query.subject;
+      if (query.grade) params.grade = query.grade;
+      if (query.semester) params.semester = query.semester;
+      if (query.level1_point) params.level1_point = query.level1_point;
+      if (query.level2_point) params.level2_point = query.level2_point;
+      if (query.level3_point) params.level3_point = query.level3_point;
+      if (query.description) params.description = query.description;
+      const blob = await examPointAPI.exportExamPoints(params);
+      saveAs(blob, `考点数据_${new Date().toISOString().split('T')[0]}.xlsx`);
       setMessage('✅ 导出成功');
       alert('📤 考点数据导出成功！');
     } catch (error) {
@@ -774,16 +780,19 @@ const ImportModal: React.FC<ImportModalProps> = ({
               <div className="border-2 border-dashed border-gray-300 rounded-lg p-6">
                 <input
                   type="file"
-                  accept=".xlsx,.xls"
+                  accept=".xlsx"
                   onChange={(e) => setSelectedFile(e.target.files?.[0] || null)}
                   className="w-full"
                 />
                 <p className="mt-2 text-sm text-gray-500">
-                  支持的格式：.xlsx, .xls
+                  支持的格式：.xlsx（旧版.xls请先在Excel中另存为.xlsx）
                 </p>
                 <p className="text-sm text-gray-500">
                   Excel列格式：{EXCEL_COLUMNS.map(col => col.label).join(', ')}
                 </p>
+                <p className="text-sm text-gray-500">
+                  {COVERAGE_RATE_NOTE}
+                </p>
               </div>
               <div className="mt-2">
                 <button
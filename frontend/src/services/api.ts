@@ -124,6 +124,39 @@ export interface UserUpdateData {
   password?: string;
 }
 
+export interface ExamPointPage {
+  items: ExamPoint[];
+  total: number;
+  page: number;
+  page_size: number;
+  pages: number;
+}
+
+export interface ImportJob {
+  id: string;
+  status: 'pending' | 'running' | 'completed' | 'failed';
+  total_rows: number | null;
+  processed_rows: number;
+  remaining_rows: number | null;
+  imported_count: number;
+  failed_count: number;
+  rows_per_second: number;
+  errors: { row: number; error: string }[];
+  message: string | null;
+}
+
+export interface DashboardSummary {
+  exam_point_count: number;
+  active_exam_point_count: number;
+  exam_paper_count: number;
+  exam_question_count: number;
+  user_count: number;
+  pending_user_count: number;
+  subject_count: number;
+  top_subjects: { subject: string; exam_point_count: number; exam_paper_count: number }[];
+  generated_at: string;
+}
+
 export interface ApproveUserData {
   is_approved: boolean;
 }
@@ -220,6 +253,14 @@ export const userAPI = {
   },
 };
 
+export const dashboardAPI = {
+  // 系统概览汇总指标，一次请求获取
+  getSummary: async (): Promise<DashboardSummary> => {
+    const response = await api.get('/dashboard/summary');
+    return response.data;
+  },
+};
+
 export const healthAPI = {
   check: async () => {
     const response = await api.get('/health');
@@ -230,11 +271,11 @@ export const healthAPI = {
 // 考点管理相关API
 export const examPointAPI = {
   // 获取考点列表
-  getExamPoints: async (query?: ExamPointQuery): Promise<ExamPoint[]> => {
+  getExamPoints: async (query?: ExamPointQuery): Promise<ExamPointPage> => {
     const params = new URLSearchParams();
     if (query) {
       Object.entries(query).forEach(([key, value]) => {
-        if (value) params.append(key, value);
+        if (value) params.append(key, String(value));
       });
     }
     const response = await api.get(`/exam-points?${params.toString()}`);
@@ -272,7 +313,7 @@ export const examPointAPI = {
   },
 
   // 上传Excel文件导入考点
-  uploadExcelFile: async (file: File): Promise<{ message: string; imported_count: number }> => {
+  uploadExcelFile: async (file: File): Promise<{ message: string; imported_count: number; failed_count: number; errors: { row: number; error: string }[] }> => {
     const formData = new FormData();
     formData.append('file', file);
     
@@ -284,12 +325,31 @@ export const examPointAPI = {
     return response.data;
   },
 
-  // 导出考点数据
-  exportExamPoints: async (query?: ExamPointQuery): Promise<Blob> => {
-    const params = new URLSearchParams();
+  // 提交后台导入任务（.ndjson/.jsonl/.csv/.xlsx）
+  submitImportJob: async (file: File): Promise<ImportJob> => {
+    const formData = new FormData();
+    formData.append('file', file);
+
+    const response = await api.post('/exam-points/import-jobs', formData, {
+      headers: {
+        'Content-Type': 'multipart/form-data',
+      },
+    });
+    return response.data;
+  },
+
+  // 查询后台导入任务进度
+  getImportJob: async (jobId: string): Promise<ImportJob> => {
+    const response = await api.get(`/exam-points/import-jobs/${jobId}`);
+    return response.data;
+  },
+
+  // 导出考点数据（服务端流式生成 xlsx/csv）
+  exportExamPoints: async (query?: ExamPointQuery, format: 'xlsx' | 'csv' = 'xlsx'): Promise<Blob> => {
+    const params = new URLSearchParams({ format });
     if (query) {
       Object.entries(query).forEach(([key, value]) => {
-        if (value) params.append(key, value);
+        if (value) params.append(key, String(value));
       });
     }
     const response = await api.get(`/exam-points/export?${params.toString()}`, {
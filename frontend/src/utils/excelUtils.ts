@@ -55,55 +55,8 @@ export const readExamPointsFromExcel = (file: File): Promise<ExamPoint[]> => {
   });
 };
 
-// 导出考点数据到Excel文件
-export const exportExamPointsToExcel = (examPoints: ExamPoint[], provinceList: {id:number, name:string}[], filename: string = '考点数据') => {
-  // 准备导出数据
-  const exportData = examPoints.map(point => ({
-    '省份': provinceList.find(p => p.id === point.province_id)?.name || '',
-    '科目': point.subject,
-    '年级': point.grade,
-    '学期': point.semester,
-    '一级考点': point.level1_point,
-    '二级考点': point.level2_point,
-    '三级考点': point.level3_point,
-    '考点描述': point.description,
-    '历年高考覆盖率': point.coverage_rate,
-    '添加人': point.added_by,
-    '添加日期': point.added_date,
-    '有效状态': point.is_active ? '是' : '否'
-  }));
-  
-  // 创建工作簿
-  const workbook = XLSX.utils.book_new();
-  const worksheet = XLSX.utils.json_to_sheet(exportData);
-  
-  // 设置列宽
-  const colWidths = [
-    { wch: 10 }, // 省份
-    { wch: 8 },  // 科目
-    { wch: 8 },  // 年级
-    { wch: 8 },  // 学期
-    { wch: 15 }, // 一级考点
-    { wch: 15 }, // 二级考点
-    { wch: 15 }, // 三级考点
-    { wch: 30 }, // 考点描述
-    { wch: 12 }, // 历年高考覆盖率
-    { wch: 10 }, // 添加人
-    { wch: 12 }, // 添加日期
-    { wch: 8 }   // 有效状态
-  ];
-  worksheet['!cols'] = colWidths;
-  
-  // 添加工作表到工作簿
-  XLSX.utils.book_append_sheet(workbook, worksheet, '考点数据');
-  
-  // 生成Excel文件
-  const excelBuffer = XLSX.write(workbook, { bookType: 'xlsx', type: 'array' });
-  const blob = new Blob([excelBuffer], { type: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' });
-  
-  // 下载文件
-  saveAs(blob, `${filename}_${new Date().toISOString().split('T')[0]}.xlsx`);
-};
+// 覆盖率填写规则，与后端 parse_exam_point_row 一致
+export const COVERAGE_RATE_NOTE = '历年高考覆盖率：带%的按百分数处理（如 1% 即1%）；不带%时大于1按百分数、不大于1按比例处理（如 0.85 即85%，1 即100%）';
 
 // 生成Excel模板
 export const generateExcelTemplate = () => {
@@ -118,7 +71,7 @@ export const generateExcelTemplate = () => {
       '二级考点': '基本初等函数',
       '三级考点': '指数函数',
       '考点描述': '指数函数的基本性质和应用',
-      '历年高考覆盖率': 85.5,
+      '历年高考覆盖率': '85.5%',
       '添加人': 'admin',
       '添加日期': '2024-01-15',
       '有效状态': '是'
@@ -145,6 +98,8 @@ export const generateExcelTemplate = () => {
     { wch: 8 }   // 有效状态
   ];
   worksheet['!cols'] = colWidths;
+  // 在覆盖率表头单元格上添加批注说明填写规则，表头文字保持不变以便导入时识别
+  worksheet['I1'].c = [{ a: '系统', t: COVERAGE_RATE_NOTE }];
   
   // 添加工作表到工作簿
   XLSX.utils.book_append_sheet(workbook, worksheet, '考点数据模板');
@@ -1,7 +1,7 @@
 #!/usr/bin/env bash
 
 # 全局一键管理脚本，提升开发执行体验
-# 用法： ./manage.sh [start|stop|test|import_provinces|status]
+# 用法： ./manage.sh [start|stop|test|import_provinces|migrate|status]
 
 # 项目路径
 FRONTEND_DIR="frontend"
@@ -79,6 +79,13 @@ function import_provinces() {
     fi
 }
 
+function migrate() {
+    activate_env
+    echo -e "${YELLOW}执行数据库结构迁移...${NC}"
+    cd $BACKEND_DIR && python migrate.py
+    cd - >/dev/null
+}
+
 function status() {
     echo -e "${YELLOW}服务状态检查:${NC}"
     pgrep -af "uvicorn main:app" && echo -e "${GREEN}后端运行中${NC}" || echo -e "${RED}后端未运行${NC}"
@@ -108,10 +115,13 @@ case "$1" in
     import_provinces)
         import_provinces
         ;;
+    migrate)
+        migrate
+        ;;
     status)
         status
         ;;
     *)
-        echo -e "${YELLOW}用法: $0 [start|stop|test|import_provinces|status]${NC}"
+        echo -e "${YELLOW}用法: $0 [start|stop|test|import_provinces|migrate|status]${NC}"
         ;;
 esac 
\ No newline at end of file